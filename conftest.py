@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Общие фикстуры тестов ядра SQL tools (временная база SQLite, выполнение заданий в потоке): python -m pytest -q"""
+
+import sqlite3, threading
+
+import pytest
+
+import sql_core
+
+
+@pytest.fixture(autouse=True)
+def no_timing_log(monkeypatch):
+    monkeypatch.setattr(sql_core, "timing_log", "")
+    yield
+    sql_core.closePools()
+
+
+@pytest.fixture
+def database(tmp_path):
+    # таблица t: id 0..1999, s - строка, v - число (NULL у каждой десятой строки)
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER, s TEXT, v REAL)")
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", [(i, "s" + str(i), None if i % 10 == 0 else i / 2) for i in range(2000)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def run_job():
+    def run(job, timeout=30):
+        # выполнение задания в отдельном потоке: зависание - ошибка теста, а не зависание всего запуска
+        messages = []
+        job.notify = lambda kind, payload: messages.append((kind, payload))
+        thread = threading.Thread(target=job.run, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        assert not thread.is_alive(), "задание не завершилось"
+        assert messages, "задание завершилось без сообщения"
+        return messages
+    return run
+
+
+@pytest.fixture
+def row_count():
+    def count(path, table="t"):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM " + table).fetchone()[0]
+        finally:
+            conn.close()
+    return count
@@ -0,0 +1,342 @@
+#!python3
+# -*- coding: utf-8 -*-
+
+import sys, os, json, time, random, datetime, sqlite3, subprocess, tempfile, statistics, argparse
+import sql_core
+
+# Каталог сгенерированных баз SQLite (база одной формы создается один раз)
+fixtures_dir = os.path.join(tempfile.gettempdir(), "sql_tools_bench")
+
+# Файл отчета по умолчанию
+report_file = "sql_tools_bench.json"
+
+# Запрос, время выполнения которого измеряется
+bench_sql = "SELECT * FROM bench"
+
+# Замеры: выборка в ResultSet, выгрузка ExportJob, таблица и экспорт в CSV в Qt (offscreen) и Tk
+bench_cases = ("fetch", "export", "qt", "tk")
+
+column_types = {"int": "INTEGER", "float": "REAL", "str": "TEXT", "date": "TEXT"}
+alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 абвгдежзийклмнопрстуфхцчшщъыьэюя"
+
+
+def fixturePath(rows: int, columns: int, types: list, str_len: int, nulls: float, seed: int) -> str:
+    name = "bench_%dx%d_%s_%d_%s_%d.sqlite" % (rows, columns, "-".join(types), str_len, nulls, seed)
+    return os.path.join(fixtures_dir, name)
+
+
+def generateFixture(path: str, rows: int, columns: int, types: list, str_len: int, nulls: float, seed: int) -> None:
+    # таблица bench: id и столбцы c1..cN с типами по кругу из types, значения зависят только от seed
+    rnd = random.Random(seed)
+    kinds = [types[j % len(types)] for j in range(columns)]
+    base = datetime.datetime(2000, 1, 1)
+
+    def value(kind: str):
+        if nulls and rnd.random() < nulls:
+            return None
+        if kind == "int":
+            return rnd.randint(-1000000, 1000000)
+        if kind == "float":
+            return round(rnd.uniform(-1000000, 1000000), 4)
+        if kind == "date":
+            return (base + datetime.timedelta(seconds=rnd.randrange(10 ** 9))).isoformat(" ")
+        return "".join(rnd.choices(alphabet, k=rnd.randint(1, str_len)))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = path + ".tmp"
+    if os.path.exists(temp):
+        os.remove(temp)
+    conn = sqlite3.connect(temp)
+    try:
+        conn.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, " +
+                     ", ".join("c%d %s" % (j + 1, column_types[kind]) for j, kind in enumerate(kinds)) + ")")
+        insert = "INSERT INTO bench VALUES (" + ", ".join("?" * (columns + 1)) + ")"
+        for start in range(0, rows, 10000):
+            conn.executemany(insert, [[i + 1] + [value(kind) for kind in kinds] for i in range(start, min(rows, start + 10000))])
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(temp, path)  # незавершенная генерация не оставляет базу
+
+
+def peakMemory():
+    # пиковый объем памяти процесса (в байтах), None - если недоступен
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class Counters(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                           [(name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize",
+                                                                 "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                                                                 "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                                                                 "PagefileUsage", "PeakPagefileUsage")]
+
+            counters = Counters()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                     ctypes.byref(counters), counters.cb)
+            return counters.PeakWorkingSetSize
+        except Exception:
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # в Linux - в килобайтах
+
+
+def measure(rows: int, wall: float, status: str = "") -> dict:
+    return {"wall": round(wall, 6), "rows": rows, "rows_per_s": int(rows / wall) if wall else 0,
+            "peak_memory": peakMemory(), "status": status}
+
+
+def caseFetch(db: str, sql: str, out: str) -> dict:
+    # путь выборки GUI без таблицы: QueryJob -> ResultSet
+    result = []
+
+    def notify(kind, payload):
+        if kind == "headers":
+            result.append(sql_core.ResultSet(payload))
+        elif kind == "batch":
+            result[0].extend(payload)
+        elif kind == "error":
+            raise sql_core.DatabaseError(payload)
+
+    time1 = time.perf_counter()
+    sql_core.QueryJob(sql, db, sqlite3, notify).run()
+    return {"fetch": measure(len(result[0]), time.perf_counter() - time1)}
+
+
+def caseExport(db: str, sql: str, out: str) -> dict:
+    # выгрузка в CSV напрямую, минуя таблицу
+    messages = []
+    job = sql_core.ExportJob(sql, db, out, sqlite3, lambda kind, payload: messages.append((kind, payload)))
+    time1 = time.perf_counter()
+    job.run()
+    wall = time.perf_counter() - time1
+    if messages[-1][0] == "error":
+        raise sql_core.DatabaseError(messages[-1][1])
+    return {"export": measure(job.rows_fetched, wall)}
+
+
+def caseQt(db: str, sql: str, out: str) -> dict:
+    # заполнение таблицы SQLWidget и экспорт exportCSV (платформа offscreen, без окна на экране)
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import QtCore, QtWidgets
+    import sql_tool_qt as gui
+    gui.database_URI, gui.DB, gui.row_limit, gui.filename = db, sqlite3, 0, out
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    widget = gui.SQLWidget()
+    widget.resize(900, 600)
+    widget.show()
+    tab = widget.tabs.currentWidget()
+    tab.textSQL.setPlainText(sql)
+    app.processEvents()
+
+    loop = QtCore.QEventLoop()
+    timer = QtCore.QTimer()
+    timer.timeout.connect(lambda: tab.job is None and loop.quit())  # запрос завершен, таблица заполнена
+    time1 = time.perf_counter()
+    tab.execSQL()
+    timer.start(10)
+    loop.exec()
+    timer.stop()
+    app.processEvents()
+    results = {"grid_qt": measure(len(tab.model.rows), time.perf_counter() - time1, tab.statusLabel.text())}
+
+    time1 = time.perf_counter()
+    tab.exportCSV()
+    results["export_qt"] = measure(len(tab.model.view), time.perf_counter() - time1, tab.statusLabel.text())
+    widget.close()
+    return results
+
+
+def caseTk(db: str, sql: str, out: str) -> dict:
+    # заполнение таблицы SQLToolsGUI и экспорт execCSV (нужен дисплей)
+    import tkinter
+    import sql_tool_tk as gui
+    gui.DATABASE_URI, gui.DB, gui.row_limit, gui.filename = db, sqlite3, 0, out
+
+    root = tkinter.Tk()
+    app = gui.SQLToolsGUI(root)
+    tab = app.tabs[app.notebook.select()]
+    tab.sqlText.delete(1.0, "end")
+    tab.sqlText.insert(1.0, sql)
+    root.update()
+
+    done = tkinter.BooleanVar(value=False)
+
+    def check():  # запрос завершен, таблица заполнена
+        if tab.job is None:
+            done.set(True)
+        else:
+            root.after(10, check)
+
+    time1 = time.perf_counter()
+    tab.beginSQL()
+    root.after(10, check)
+    root.wait_variable(done)
+    root.update()
+    results = {"grid_tk": measure(len(tab.dataset), time.perf_counter() - time1, tab.footer["text"])}
+
+    time1 = time.perf_counter()
+    tab.execCSV()
+    results["export_tk"] = measure(len(tab.resultView), time.perf_counter() - time1, tab.footer["text"])
+    app.closeWindow()
+    return results
+
+
+cases = {"fetch": caseFetch, "export": caseExport, "qt": caseQt, "tk": caseTk}
+
+
+def runCase(name: str, db: str, sql: str) -> dict:
+    # замер в отдельном процессе: пиковая память не зависит от предыдущих замеров
+    out = os.path.join(fixtures_dir, "bench_" + name + ".csv")
+    command = [sys.executable, os.path.abspath(__file__), "case", name, "--db", db, "--sql", sql, "--out", out]
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="replace")
+        lines = process.stdout.strip().splitlines()
+        if not lines:  # GUI-модуль не загружен (программа завершена в exitError) или процесс упал
+            return {"error": (process.stderr.strip() or "нет результата").splitlines()[-1]}
+        return json.loads(lines[-1])
+    finally:
+        if os.path.exists(out):
+            os.remove(out)
+
+
+def runBench(args) -> dict:
+    types = [kind.strip() for kind in args.types.split(",") if kind.strip()]
+    unknown = [kind for kind in types if kind not in column_types]
+    if unknown or not types:
+        raise SystemExit("Неизвестный тип столбца: " + ", ".join(unknown) + " (допустимы " + ", ".join(column_types) + ")")
+    path = fixturePath(args.rows, args.columns, types, args.str_len, args.nulls, args.seed)
+    if not os.path.exists(path):
+        time1 = time.perf_counter()
+        generateFixture(path, args.rows, args.columns, types, args.str_len, args.nulls, args.seed)
+        print("База:", path, "(" + str(round(time.perf_counter() - time1, 1)) + " сек)")
+
+    results, errors = {}, {}
+    for name in args.cases.split(","):
+        name = name.strip()
+        if name not in cases:
+            errors[name] = "неизвестный замер"
+            continue
+        runs = []
+        for _ in range(args.repeat):
+            run = runCase(name, path, args.sql)
+            if "error" in run:
+                errors[name] = run["error"]
+                break
+            runs.append(run)
+        for measurement in (runs[0] if runs else {}):
+            walls = [run[measurement]["wall"] for run in runs]
+            rows = runs[0][measurement]["rows"]
+            wall = round(statistics.median(walls), 6)
+            memory = [run[measurement]["peak_memory"] for run in runs if run[measurement]["peak_memory"] is not None]
+            results[measurement] = {"wall": wall, "walls": walls, "rows": rows, "rows_per_s": int(rows / wall) if wall else 0,
+                                    "peak_memory": max(memory) if memory else None}
+        if name in errors:
+            print(name + ": " + errors[name])
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"label": args.label or commit, "commit": commit, "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0], "platform": sys.platform, "sql": args.sql, "repeat": args.repeat,
+            "fixture": {"rows": args.rows, "columns": args.columns, "types": types, "str_len": args.str_len,
+                        "nulls": args.nulls, "seed": args.seed},
+            "results": results, "errors": errors}
+
+
+def memoryText(size) -> str:
+    return "-" if size is None else str(round(size / 1048576, 1)) + " MB"
+
+
+def printReport(report: dict) -> None:
+    print("%-10s %10s %12s %12s" % ("", "wall, s", "rows/s", "peak memory"))
+    for name, result in report["results"].items():
+        print("%-10s %10.3f %12d %12s" % (name, result["wall"], result["rows_per_s"], memoryText(result["peak_memory"])))
+
+
+def compareReports(before: dict, after: dict, threshold: float) -> int:
+    # изменение времени и памяти по каждому замеру; 1 - если время выросло больше threshold процентов
+    if before.get("fixture") != after.get("fixture"):
+        print("Внимание: отчеты получены на разных базах", before.get("fixture"), after.get("fixture"))
+    print("%-10s %10s %10s %8s %12s %12s" % ("", before.get("label", "before")[:10], after.get("label", "after")[:10],
+                                             "change", "memory", "change"))
+    regressed = False
+    for name in list(dict.fromkeys(list(before["results"]) + list(after["results"]))):
+        old, new = before["results"].get(name), after["results"].get(name)
+        if old is None or new is None:
+            print("%-10s %s" % (name, "нет в отчете " + ("до" if old is None else "после")))
+            continue
+        change = (new["wall"] - old["wall"]) / old["wall"] * 100 if old["wall"] else 0
+        memory = ""
+        if old["peak_memory"] and new["peak_memory"]:
+            memory = "%+.1f%%" % ((new["peak_memory"] - old["peak_memory"]) / old["peak_memory"] * 100)
+        print("%-10s %10.3f %10.3f %+7.1f%% %12s %12s" % (name, old["wall"], new["wall"], change,
+                                                          memoryText(new["peak_memory"]), memory))
+        if threshold and change > threshold:
+            regressed = True
+    return 1 if regressed else 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры выборки, таблицы и выгрузки в CSV на сгенерированной базе SQLite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="сгенерировать базу (если ее нет), выполнить замеры и записать отчет JSON")
+    run.add_argument("--rows", type=int, default=100000, help="количество строк")
+    run.add_argument("--columns", type=int, default=10, help="количество столбцов (кроме id)")
+    run.add_argument("--types", default="int,float,str,date", help="типы столбцов по кругу: int, float, str, date")
+    run.add_argument("--str-len", type=int, default=30, help="наибольшая длина строк")
+    run.add_argument("--nulls", type=float, default=0.05, help="доля NULL среди значений")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--sql", default=bench_sql)
+    run.add_argument("--cases", default=",".join(bench_cases), help="замеры через запятую: " + ", ".join(bench_cases))
+    run.add_argument("--repeat", type=int, default=3, help="количество повторов (в отчете медиана времени)")
+    run.add_argument("--label", default="", help="метка версии в отчете (по умолчанию - коммит git)")
+    run.add_argument("--out", default=report_file, help="файл отчета JSON")
+
+    compare = commands.add_parser("compare", help="сравнить два отчета (до и после изменения)")
+    compare.add_argument("before")
+    compare.add_argument("after")
+    compare.add_argument("--threshold", type=float, default=0, help="код возврата 1, если время выросло больше N процентов")
+
+    case = commands.add_parser("case", help="один замер в текущем процессе (вызывается из run)")
+    case.add_argument("name", choices=sorted(cases))
+    case.add_argument("--db", required=True)
+    case.add_argument("--sql", default=bench_sql)
+    case.add_argument("--out", required=True)
+
+    args = parser.parse_args(argv)
+    if args.command == "case":
+        sql_core.timing_log = ""  # замеры не пишутся в журнал времени запросов
+        try:
+            result = cases[args.name](args.db, args.sql, args.out)
+        except Exception as err:
+            result = {"error": type(err).__name__ + ": " + str(err)}
+        sql_core.closePools()
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+    if args.command == "compare":
+        reports = []
+        for path in (args.before, args.after):
+            with open(path, encoding="utf-8") as f:
+                reports.append(json.load(f))
+        return compareReports(reports[0], reports[1], args.threshold)
+
+    report = runBench(args)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    printReport(report)
+    print("Отчет:", args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
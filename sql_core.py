@@ -0,0 +1,2486 @@
+#!python3
+# -*- coding: utf-8 -*-
+
+"""Ядро SQL tools без GUI: соединения с БД, выполнение запросов, хранение результата, выгрузка в CSV.
+
+Используется обоими GUI (sql_tool_tk.py, sql_tool_qt.py) и запускается из командной строки:
+
+    python sql_core.py run report1.sql report2.sql --jobs 4 --out-dir exports
+"""
+
+import sys, os, re, io, csv, json, time, datetime, threading, queue, bisect, itertools, importlib
+from array import array
+from collections import OrderedDict, deque
+from decimal import Decimal, InvalidOperation
+# редко используемые модули (пул потоков, временные файлы, argparse) импортируются при первом использовании:
+# запуск GUI не ждет их загрузку
+
+# Модуль драйвера БД (cx_Oracle, pyodbc, sqlite3) и строка соединения для запуска из командной строки
+DATABASE_DRIVER = "cx_Oracle"
+DATABASE_URI = "user/password@IP:port/db_name"  # 'DRIVER={SQL Server};SERVER=tcp:IP,port;DATABASE=db_name;UID=user;PWD=password' для MS SQL Server
+
+# Путь для сохранения CSV и журналов
+dirname = os.path.expanduser("~\\Desktop")  # ссылка на рабочий стол
+
+# Разделитель строк в файле CSV
+end_line = "\n"
+
+# Разделитель полей в файле CSV
+separator = ";"
+
+# Кодировка текста
+text_codec = "cp1251"
+
+# Количество строк, получаемых из курсора за один раз
+fetch_size = 1000
+
+# Размер первой порции строк (для быстрого вывода первого экрана)
+first_fetch_size = 100
+
+# Подбор размера порции (arraysize): объем данных за одно обращение к серверу (в байтах), границы размера порции,
+# наибольшее время получения одной порции (в секундах)
+fetch_target_bytes = 512 * 1024
+fetch_min_size = 100
+fetch_max_size = 20000
+fetch_max_seconds = 0.5
+
+# Параметры выборки для отдельных соединений: строка соединения -> {"arraysize": ..., "prefetchrows": ..., "target_bytes": ...}
+# (arraysize из профиля не подстраивается), например {"user/password@IP:port/db_name": {"arraysize": 5000}}
+connection_profiles = {}
+
+# Размер буфера файла при выгрузке напрямую в CSV (в байтах)
+export_buffer_size = 1024 * 1024
+
+# Количество соединений при параллельной выгрузке по диапазонам ключа
+parallel_degree = 4
+
+# Сжатие при выгрузке в CSV: "" - без сжатия, "gzip" или "zstd" (модуль compression.zstd в Python 3.14 или zstandard)
+export_compression = ""
+
+# Количество процессов для кодирования и сжатия порций CSV (1 - в текущем потоке), строк в одной порции
+export_processes = os.cpu_count() or 1
+export_chunk_rows = 20000
+
+# Загрузка CSV в таблицу: строк в одном executemany, строк между фиксациями транзакции,
+# строк для определения типов столбцов
+import_batch_size = 5000
+import_commit_rows = 100000
+import_sample_rows = 1000
+
+# Копирование строк таблицы в буфер обмена: строк в одной порции текста, количество строк для предупреждения
+clipboard_chunk_rows = 10000
+clipboard_warn_rows = 100000
+
+# Постраничный просмотр: строк на странице, страниц, хранящихся в памяти
+page_size = 500
+page_cache_pages = 20
+
+# Журнал замеров времени запросов (JSON Lines), пустая строка - без журнала
+timing_log = os.path.join(dirname, "sql_tools_timing.jsonl")
+
+# Файл профиля cProfile (при запуске запроса с профилированием)
+profile_file = os.path.join(dirname, "sql_tools_profile.prof")
+
+# Папка для планов выполнения MS SQL Server (showplan XML, открываются в SSMS) и расхождение оценки количества строк
+# с фактическим (во сколько раз), после которого в замечаниях к плану выводится предупреждение
+plan_dir = os.path.join(dirname, "sql_tools_plans")
+plan_estimate_ratio = 10
+
+# Параметры пула соединений с БД: минимальное и максимальное количество соединений,
+# время простоя до закрытия соединения и до проверки соединения перед выдачей (в секундах)
+pool_min_size = 1
+pool_max_size = 4
+pool_idle_timeout = 600
+pool_ping_interval = 30
+
+# Ограничение памяти для результата запроса (в байтах), сверх него строки пишутся во временный файл, 0 - без ограничения
+memory_budget = 512 * 1024 * 1024
+
+# Количество страниц файла подкачки, хранящихся в памяти после чтения
+spill_cache_pages = 16
+
+# Кэш результатов SELECT-запросов: объем (в байтах), время жизни записи (в секундах)
+result_cache_size = 256 * 1024 * 1024
+result_cache_ttl = 300
+
+
+class DatabaseError(Exception):
+    """Пользовательский класс исключения для базы данных!"""
+    pass
+
+
+def getDriver(driver=None):
+    # модуль драйвера БД: уже загруженный модуль или имя модуля
+    if driver is None:
+        raise DatabaseError("Драйвер базы данных не загружен")
+    if isinstance(driver, str):
+        try:
+            return importlib.import_module(driver)
+        except ImportError as err:
+            raise DatabaseError(err)
+    return driver
+
+
+def paramMarker(driver, number: int) -> str:
+    # параметр запроса: ? для sqlite3 и pyodbc, :1 для cx_Oracle
+    return ":" + str(number) if getattr(driver, "paramstyle", "qmark") in ("named", "numeric") else "?"
+
+
+class ConnectionPool:
+    """Класс пула соединений с базой данных (соединения переиспользуются между запросами)!"""
+
+    def __init__(self, config: str, driver, min_size: int = pool_min_size, max_size: int = pool_max_size,
+                 idle_timeout: float = pool_idle_timeout, ping_interval: float = pool_ping_interval) -> None:
+        self.configuration = config
+        self.driver = driver
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.idle = []  # свободные соединения: [соединение, время возврата в пул]
+        self.size = 0  # количество открытых соединений (свободных и выданных)
+        self.pinned = 0  # соединения, закрепленные за сеансами вкладок (не занимают место в пуле)
+        self.condition = threading.Condition()
+
+    def connect(self):
+        if self.driver.__name__ == "sqlite3":  # соединение используется разными потоками пула
+            return self.driver.connect(self.configuration, check_same_thread=False)
+        return self.driver.connect(self.configuration)
+
+    def isAlive(self, conn) -> bool:
+        try:  # проверка соединения перед выдачей
+            if hasattr(conn, "ping"):  # cx_Oracle
+                conn.ping()
+            else:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def close(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self, pinned: bool = False):
+        # pinned - соединение для сеанса вкладки выдается без ожидания свободного места в пуле
+        while True:
+            with self.condition:
+                self.evictIdle()
+                while not pinned and not self.idle and self.size - self.pinned >= self.max_size:
+                    self.condition.wait()
+                if self.idle:
+                    conn, released = self.idle.pop()  # последнее возвращенное соединение
+                else:
+                    conn = None
+                    self.size += 1
+                if pinned:
+                    self.pinned += 1
+
+            if conn is None:  # новое соединение
+                try:
+                    return self.connect()
+                except Exception:
+                    self.discard(pinned)
+                    raise
+            if time.time() - released < self.ping_interval or self.isAlive(conn):
+                return conn
+            self.close(conn)  # разорванное соединение
+            self.discard(pinned)
+
+    def release(self, conn, check: bool = False, pinned: bool = False) -> None:
+        if check and not self.isAlive(conn):  # после ошибки соединение могло быть разорвано
+            self.close(conn)
+            self.discard(pinned)
+            return
+        with self.condition:
+            self.idle.append([conn, time.time()])
+            if pinned:
+                self.pinned -= 1
+            self.condition.notify()
+
+    def discard(self, pinned: bool = False) -> None:
+        with self.condition:
+            self.size -= 1
+            if pinned:
+                self.pinned -= 1
+            self.condition.notify()
+
+    def evictIdle(self) -> None:
+        # закрытие соединений, простаивающих дольше idle_timeout (не меньше min_size соединений остается)
+        now = time.time()
+        for item in list(self.idle):
+            if self.size <= self.min_size:
+                break
+            if now - item[1] > self.idle_timeout:
+                self.idle.remove(item)
+                self.size -= 1
+                self.close(item[0])
+
+    def closeAll(self) -> None:
+        with self.condition:
+            for conn, released in self.idle:
+                self.close(conn)
+            self.size -= len(self.idle)
+            self.idle = []
+
+
+pools = {}  # пулы соединений по драйверу и строке соединения
+pools_lock = threading.Lock()
+
+
+def getPool(config: str, driver) -> ConnectionPool:
+    with pools_lock:
+        key = (driver.__name__, config)
+        if key not in pools:
+            pools[key] = ConnectionPool(config, driver)
+        return pools[key]
+
+
+def closePools() -> None:
+    with pools_lock:
+        for pool in pools.values():
+            pool.closeAll()
+        for pool in process_pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)  # процессы завершаются до выхода (без ошибок atexit)
+        process_pools.clear()
+
+
+process_pools = {}  # пулы процессов кодирования CSV по количеству процессов (создаются при первой выгрузке со сжатием)
+
+
+def getProcessPool(processes: int):
+    # процессы запускаются один раз: при запуске (spawn в Windows) заново импортируется главный модуль программы;
+    # пул другого размера создается отдельно, а не заменяет пул, которым может пользоваться идущая выгрузка
+    from concurrent.futures import ProcessPoolExecutor
+    with pools_lock:
+        if processes not in process_pools:
+            process_pools[processes] = ProcessPoolExecutor(max_workers=processes)
+        return process_pools[processes]
+
+
+class Session:
+    """Класс сеанса вкладки: соединение из пула закрепляется за сеансом и сохраняет его состояние между запросами!"""
+
+    def __init__(self) -> None:
+        self.pool = None
+        self.conn = None
+        self.closed = False
+        self.lock = threading.Lock()  # запросы одного сеанса выполняются по очереди
+
+    def acquire(self, pool: ConnectionPool):
+        self.lock.acquire()
+        try:
+            if self.conn is not None and self.pool is not pool:  # сменились строка соединения или драйвер
+                self.pool.release(self.conn, pinned=True)
+                self.conn = None
+            if self.conn is None:
+                self.pool = pool
+                self.conn = pool.acquire(pinned=True)
+            return self.conn
+        except Exception:
+            self.lock.release()
+            raise
+
+    def release(self, check: bool = False) -> None:
+        try:
+            if check and not self.pool.isAlive(self.conn):  # разорванное соединение заменяется при следующем запросе
+                self.pool.close(self.conn)
+                self.pool.discard(pinned=True)
+                self.conn = None
+            elif self.closed:  # вкладка закрыта во время запроса
+                self.pool.release(self.conn, pinned=True)
+                self.conn = None
+        finally:
+            self.lock.release()
+
+    def close(self) -> None:
+        # соединение возвращается в пул сразу или по окончании выполняемого запроса (GUI не ждет запрос)
+        self.closed = True
+        if self.lock.acquire(blocking=False):
+            try:
+                if self.conn is not None:
+                    self.pool.release(self.conn, pinned=True)
+                    self.conn = None
+            finally:
+                self.lock.release()
+
+
+class UseDatabase:
+    """Класс диспетчера контекста для соединения с базой данных!"""
+
+    def __init__(self, config: str, driver=None, session: Session = None) -> None:
+        self.configuration = config
+        self.driver = getDriver(driver)
+        self.pool = getPool(config, self.driver)
+        self.session = session  # сеанс вкладки или None (соединение берется из пула на время запроса)
+        self.conn = None
+        self.connect_time = 0  # время получения соединения из пула
+
+    def __enter__(self) -> "cursor":
+        try:
+            time1 = time.perf_counter()
+            # соединение с базой данных из пула
+            self.conn = self.session.acquire(self.pool) if self.session is not None else self.pool.acquire()
+            self.connect_time = time.perf_counter() - time1
+            self.cursor1 = self.conn.cursor()
+            self.cursor2 = self.conn.cursor()
+            return self.cursor1, self.cursor2  # возвращаем два курсора (для ситуации когда курсор исп-ся в самом запросе)
+        except Exception as err:
+            if self.conn is not None:
+                self.release(check=True)
+            raise DatabaseError(err)
+
+    def __exit__(self, exc_type, exc_value, exc_trace) -> None:
+        try:
+            if exc_type:  # ошибка в блоке: незафиксированные изменения (например, часть загрузки) откатываются
+                self.conn.rollback()
+            else:
+                self.conn.commit()
+            self.cursor1.close()
+            self.cursor2.close()
+        except Exception as err:
+            self.release(check=True)
+            raise DatabaseError(err)
+        self.release(check=bool(exc_type))  # соединение возвращается в пул, а не закрывается
+        if exc_type:
+            raise DatabaseError(exc_value)  # если ошибка в SQL-запросе
+
+    def release(self, check: bool = False) -> None:
+        if self.session is not None:
+            self.session.release(check)
+        else:
+            self.pool.release(self.conn, check)
+
+
+def interruptQuery(conn, cursor) -> None:
+    # прерывание запроса на стороне сервера
+    try:
+        if hasattr(conn, "interrupt"):  # sqlite3
+            conn.interrupt()
+        elif hasattr(conn, "cancel"):  # cx_Oracle
+            conn.cancel()
+        elif cursor is not None:  # pyodbc
+            cursor.cancel()
+    except Exception:
+        pass
+
+
+class QueryTimer:
+    """Класс замера времени этапов выполнения запроса (connect, execute, fetch, render, export)!"""
+
+    phase_names = ("connect", "execute", "first_row", "fetch", "render", "export")
+
+    def __init__(self, sql: str = "", source: str = "query") -> None:
+        self.start = time.perf_counter()
+        self.phases = {}  # этап -> время (в секундах)
+        self.marks = {}  # начало незавершенных этапов
+        self.rows = 0
+        self.bytes = 0  # оценка объема полученных данных
+        self.round_trips = 0
+        self.record = {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "source": source, "sql": sql.strip()}
+
+    def begin(self, phase: str) -> None:
+        self.marks[phase] = time.perf_counter()
+
+    def end(self, phase: str) -> None:
+        self.add(phase, time.perf_counter() - self.marks.pop(phase))
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+    def mark(self, phase: str) -> None:
+        # время от начала запроса до события (например, получения первой строки)
+        if phase not in self.phases:
+            self.phases[phase] = time.perf_counter() - self.start
+
+    def addRows(self, rows: list) -> None:
+        if rows:  # объем порции оценивается по первой строке
+            self.rows += len(rows)
+            self.bytes += sum(sys.getsizeof(v) for v in rows[0]) * len(rows)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def summary(self) -> str:
+        parts = [name.replace("_", " ") + " = " + str(round(self.phases[name], 3)) for name in self.phase_names if name in self.phases]
+        fetch = self.phases.get("fetch")
+        if fetch and self.rows:
+            parts.append(str(int(self.rows / fetch)) + " rows/s, " + str(round(self.bytes / fetch / 1048576, 1)) + " MB/s")
+        if self.round_trips:
+            parts.append("round trips = " + str(self.round_trips) +
+                         (", arraysize = " + str(self.record["arraysize"]) if "arraysize" in self.record else ""))
+        return ", ".join(parts)
+
+    def save(self, status: str, path: str = None) -> None:
+        # запись замера в журнал (одна строка JSON на запуск)
+        path = timing_log if path is None else path
+        if not path:
+            return
+        record = dict(self.record, status=status, total=round(self.elapsed(), 6), rows=self.rows, bytes=self.bytes,
+                      round_trips=self.round_trips, phases={name: round(value, 6) for name, value in self.phases.items()})
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            pass
+
+
+class StartupTimer(QueryTimer):
+    """Класс замера времени запуска GUI (от начала выполнения скрипта до отрисовки окна и загрузки драйвера)!"""
+
+    phase_names = ("import", "window", "paint", "translator", "driver")
+
+    def __init__(self, start: float) -> None:
+        super().__init__(" ".join(sys.argv), "startup")
+        self.start = start  # time.perf_counter() в начале скрипта
+
+    def report(self, modules: list, top: int = 15) -> str:
+        # время этапов запуска и самые долгие импорты (как python -X importtime)
+        imports = importTimes(modules)[:top]
+        self.record["imports"] = [{"module": name, "self": own, "cumulative": total} for name, own, total in imports]
+        lines = ["Запуск: " + self.summary()]
+        if imports:
+            lines.append("Импорт модулей, сек (собственное / с зависимостями):")
+            lines += ["  %-40s %8.3f %8.3f" % item for item in imports]
+        return "\n".join(lines)
+
+
+def importTimes(modules: list) -> list:
+    # импорт модулей в отдельном процессе с -X importtime: [(модуль, собственное время, с зависимостями)] по убыванию
+    if getattr(sys, "frozen", False) or not modules:  # в приложении PyInstaller интерпретатора нет
+        return []
+    import subprocess
+    directory = os.path.dirname(os.path.abspath(sys.argv[0]))
+    try:
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                                 capture_output=True, text=True, cwd=directory, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    times = []
+    for line in process.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not line.startswith("import time:"):
+            continue
+        try:
+            own, total = int(parts[0].split(":")[1]), int(parts[1])
+        except ValueError:  # строка заголовка
+            continue
+        times.append((parts[2].strip(), own / 1e6, total / 1e6))
+    return sorted(times, key=lambda item: item[2], reverse=True)
+
+
+def loadModules(names: list, notify) -> threading.Thread:
+    # фоновая загрузка модулей (драйвер БД) после отрисовки окна; первый запрос дождется импорта, если он не завершен
+    def load():
+        time1 = time.perf_counter()
+        for name in names:
+            time2 = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                error = None
+            except Exception as err:
+                error = str(err)
+            notify("loaded", (name, time.perf_counter() - time2, error))
+        notify("done", time.perf_counter() - time1)
+
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def rowBytes(rows: list) -> int:
+    # средний размер строки по первым строкам порции (строки и байты по длине, остальное по 8 байт)
+    sample = rows[:10]
+    size = sum(len(v) if isinstance(v, (str, bytes)) else 8 for row in sample for v in row)
+    return max(1, size // len(sample))
+
+
+class FetchTuner:
+    """Класс подбора размера порции выборки (arraysize) по ширине строки и наблюдаемой скорости!"""
+
+    default_width = 32  # ширина столбца без размера в cursor.description (в байтах)
+    max_width = 4000  # ограничение ширины длинных строк и LOB
+
+    def __init__(self, config: str = "") -> None:
+        self.profile = connection_profiles.get(config, {})
+        self.target = self.profile.get("target_bytes", fetch_target_bytes)
+        self.fixed = "arraysize" in self.profile  # размер из профиля не подстраивается
+        self.size = self.profile.get("arraysize", fetch_size)
+
+    def clamp(self, size: float) -> int:
+        return int(max(fetch_min_size, min(fetch_max_size, size)))
+
+    def prepare(self, cursor) -> None:
+        # до выполнения запроса: первые строки приходят вместе с ответом на execute (cx_Oracle)
+        if hasattr(cursor, "prefetchrows"):
+            cursor.prefetchrows = self.profile.get("prefetchrows", first_fetch_size + 1)
+
+    def start(self, cursor) -> None:
+        # после выполнения запроса: размер порции по ширине строки из cursor.description
+        if not self.fixed:
+            width = sum(self.columnWidth(desc) for desc in cursor.description)
+            self.size = self.clamp(self.target // max(1, width))
+        self.apply(cursor)
+
+    def columnWidth(self, desc) -> int:
+        size = desc[3] or desc[2]  # internal_size или display_size
+        return min(size, self.max_width) if isinstance(size, int) and size > 0 else self.default_width
+
+    def apply(self, cursor) -> None:
+        try:
+            cursor.arraysize = self.size
+        except Exception:
+            pass
+
+    def observe(self, cursor, rows: list, seconds: float) -> None:
+        # подстройка по фактической ширине строк и скорости: порция не дольше fetch_max_seconds
+        if self.fixed or len(rows) < min(self.size, fetch_min_size):
+            return
+        size = self.target // rowBytes(rows)
+        if seconds > 0:
+            size = min(size, len(rows) / seconds * fetch_max_seconds)
+        size = self.clamp(size)
+        if size != self.size:
+            self.size = size
+            self.apply(cursor)
+
+
+showplan_ns = "{http://schemas.microsoft.com/sqlserver/2004/07/showplan}"  # пространство имен showplan XML
+
+
+def planRows(value: str) -> float:
+    # количество строк из плана Oracle (1000, 15K, 2M, 1G), None - нет значения
+    value = value.strip()
+    scale = {"K": 1e3, "M": 1e6, "G": 1e9}.get(value[-1:], 1)
+    try:
+        return float(value.rstrip("KMG")) * scale
+    except ValueError:
+        return None
+
+
+def findPlan(sql: str, dialect: str, path: str = None) -> dict:
+    # последний запуск запроса с планом из журнала замеров (для сравнения планов разных запусков)
+    path = timing_log if path is None else path
+    if not path:
+        return None
+    key, found = normalizeSQL(sql), None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if '"plan"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                plan = record.get("plan")
+                if isinstance(plan, dict) and plan.get("shape") and plan.get("dialect") == dialect and normalizeSQL(record.get("sql", "")) == key:
+                    found = record
+    except OSError:
+        pass
+    return found
+
+
+class PlanCapture:
+    """Класс получения плана выполнения и статистики сервера для запроса (SQLite, Oracle, MS SQL Server)!"""
+
+    def __init__(self, sql: str, params: list, driver, conn) -> None:
+        self.sql = sql
+        self.params = params
+        self.dialect = sqlDialect(driver)
+        self.conn = conn  # соединение запроса (параметры статистики действуют в пределах сеанса)
+        self.result = None  # курсор с результатом запроса
+        self.plan = []  # строки плана
+        self.shape = []  # операции плана без оценок и фактических значений (для сравнения запусков)
+        self.stats = {}  # статистика сервера
+        self.messages = []  # сообщения сервера (MS SQL Server)
+        self.notes = []  # замечания: полные просмотры таблиц, ошибки оценки количества строк
+        self.errors = []
+        self.file = None  # файл showplan XML (MS SQL Server)
+        self.previous = None  # предыдущий запуск запроса с планом из журнала замеров
+
+    def execute(self, sql: str, params: list = ()) -> list:
+        # служебный запрос в отдельном курсоре того же соединения
+        cursor = self.conn.cursor()
+        try:
+            if params:
+                cursor.execute(sql, params)
+            else:
+                cursor.execute(sql)
+            return cursor.fetchall() if cursor.description is not None else []
+        finally:
+            cursor.close()
+
+    def prepare(self) -> None:
+        # до выполнения запроса: план SQLite (без выполнения), включение сбора статистики Oracle и MS SQL Server
+        try:
+            if self.dialect == "sqlite":
+                self.sqlitePlan(self.execute("EXPLAIN QUERY PLAN " + self.sql, self.params))
+            elif self.dialect == "oracle":
+                self.execute("ALTER SESSION SET statistics_level = ALL")
+            else:
+                self.execute("SET STATISTICS IO ON; SET STATISTICS TIME ON; SET STATISTICS XML ON")
+        except Exception as err:
+            self.errors.append(str(err))
+
+    def executed(self, result) -> None:
+        self.result = result
+        self.collect(result)
+
+    def collect(self, cursor) -> None:
+        # сообщения MS SQL Server (STATISTICS IO, TIME) текущего набора результатов, pyodbc 4.0.31+
+        for message in getattr(cursor, "messages", None) or []:
+            self.messages.append(re.sub(r"^(\[[^\]]*\])+", "", message[1]).strip())
+
+    def finish(self) -> None:
+        # после выполнения запроса (в том числе после ошибки или отмены): план и статистика, сравнение с прошлым запуском
+        try:
+            if self.dialect == "oracle":
+                self.oraclePlan()
+            elif self.dialect == "mssql":
+                self.mssqlPlan()
+        except Exception as err:
+            self.errors.append(str(err))
+        finally:
+            self.reset()
+        self.previous = findPlan(self.sql, self.dialect)
+
+    def reset(self) -> None:
+        # соединение возвращается в пул: сбор статистики выключается
+        try:
+            if self.dialect == "oracle":
+                self.execute("ALTER SESSION SET statistics_level = TYPICAL")
+            elif self.dialect == "mssql":
+                self.execute("SET STATISTICS XML OFF; SET STATISTICS IO OFF; SET STATISTICS TIME OFF")
+        except Exception as err:
+            self.errors.append(str(err))
+
+    def check(self, line: str, full: bool, estimate: float = None, actual: float = None) -> None:
+        if full:
+            self.notes.append("полный просмотр: " + line.strip())
+        if estimate is not None and actual is not None:
+            low, high = sorted((max(estimate, 1), max(actual, 1)))
+            if high / low >= plan_estimate_ratio and high >= 1000:  # на малом количестве строк расхождение не важно
+                self.notes.append("оценка строк " + str(round(estimate)) + ", факт " + str(round(actual)) + ": " + line.strip())
+
+    def sqlitePlan(self, rows: list) -> None:
+        # EXPLAIN QUERY PLAN: id, parent, notused, detail
+        depth = {0: -1}
+        for row in rows:
+            depth[row[0]] = depth.get(row[1], -1) + 1
+            line = "  " * depth[row[0]] + row[3]
+            self.plan.append(line)
+            self.shape.append(line)
+            self.check(line, re.match(r"SCAN (TABLE )?\S+$", row[3]) is not None)
+            if "TEMP B-TREE" in row[3]:
+                self.notes.append("сортировка во временном B-дереве: " + row[3])
+            if "AUTOMATIC" in row[3]:  # индекс для соединения строится при каждом выполнении
+                self.notes.append("нет индекса для соединения: " + row[3])
+
+    def oraclePlan(self) -> None:
+        # план последнего запроса сеанса с фактическими значениями (DBMS_XPLAN) и статистика курсора (V$SQL)
+        sql_id, child = self.execute("SELECT prev_sql_id, prev_child_number FROM v$session "
+                                     "WHERE sid = SYS_CONTEXT('USERENV', 'SID')")[0]
+        self.plan = [row[0] or "" for row in self.execute("SELECT plan_table_output FROM "
+                                                          "TABLE(DBMS_XPLAN.DISPLAY_CURSOR(:1, :2, 'ALLSTATS LAST'))", [sql_id, child])]
+        header = None
+        for line in self.plan:
+            fields = line.split("|")[1:-1]
+            if not fields:
+                continue
+            if fields[0].strip() == "Id":
+                header = [field.strip() for field in fields]
+            elif header and len(fields) == len(header) and fields[0].strip(" *").isdigit():
+                values = dict(zip(header, fields))
+                operation = values.get("Operation", "").rstrip()[1:] + " " + values.get("Name", "").strip()
+                self.shape.append(operation.rstrip())
+                starts = planRows(values.get("Starts", "")) or 1
+                estimate = planRows(values.get("E-Rows", ""))
+                self.check(operation, "TABLE ACCESS" in operation and "FULL" in operation,
+                           estimate * starts if estimate is not None else None, planRows(values.get("A-Rows", "")))
+        rows = self.execute("SELECT plan_hash_value, executions, elapsed_time, cpu_time, buffer_gets, disk_reads, rows_processed "
+                            "FROM v$sql WHERE sql_id = :1 AND child_number = :2", [sql_id, child])
+        if rows:
+            names = ("plan_hash_value", "executions", "elapsed_time_us", "cpu_time_us", "buffer_gets", "disk_reads", "rows_processed")
+            self.stats = dict(zip(names, rows[0]), sql_id=sql_id)
+
+    def mssqlPlan(self) -> None:
+        # оставшиеся наборы результатов: showplan XML и сообщения STATISTICS IO, TIME
+        text = None
+        while self.result is not None and self.result.nextset():
+            self.collect(self.result)
+            if self.result.description is not None and self.result.description[0][0].endswith("Showplan"):
+                text = self.result.fetchone()[0]
+        messages = "\n".join(self.messages)
+        for table, counters in re.findall(r"Table '([^']+)'\. (.*)", messages):
+            io = self.stats.setdefault("io", {}).setdefault(table, {})
+            for name, value in re.findall(r"([A-Za-z -]+?) (\d+)", counters):
+                name = name.strip(" -").lower()
+                io[name] = io.get(name, 0) + int(value)
+        for phase, cpu, elapsed in re.findall(r"(parse and compile time|Execution Times):\s*CPU time = (\d+) ms,\s*"
+                                              r"elapsed time = (\d+) ms", messages):
+            prefix = "compile_" if phase.startswith("parse") else ""
+            self.stats[prefix + "cpu_ms"] = self.stats.get(prefix + "cpu_ms", 0) + int(cpu)
+            self.stats[prefix + "elapsed_ms"] = self.stats.get(prefix + "elapsed_ms", 0) + int(elapsed)
+        if text:
+            import tempfile
+            os.makedirs(plan_dir, exist_ok=True)
+            fd, self.file = tempfile.mkstemp(".sqlplan", time.strftime("%Y%m%d_%H%M%S_"), plan_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.showplan(text)
+
+    def showplan(self, text: str) -> None:
+        import xml.etree.ElementTree as ElementTree
+        root = ElementTree.fromstring(re.sub(r"^\s*<\?xml[^>]*\?>", "", text))
+        for plan in root.iter(showplan_ns + "QueryPlan"):
+            self.relops(plan, 0)
+
+    def relops(self, element, depth: int) -> None:
+        # дерево операторов плана: RelOp вложены в элементы операторов (NestedLoops, Hash, ...)
+        for child in element:
+            if child.tag != showplan_ns + "RelOp":
+                self.relops(child, depth)
+                continue
+            operation = child.get("PhysicalOp", "")
+            if child.get("LogicalOp") not in (None, operation):
+                operation += " (" + child.get("LogicalOp") + ")"
+            table = child.find("./*/" + showplan_ns + "Object")
+            if table is not None:
+                operation += " " + ".".join(table.get(key).strip("[]") for key in ("Table", "Index") if table.get(key))
+            line = "  " * depth + operation
+            executions = 1 + float(child.get("EstimateRebinds", 0)) + float(child.get("EstimateRewinds", 0))
+            estimate = float(child.get("EstimateRows", 0)) * executions
+            counters = child.findall(showplan_ns + "RunTimeInformation/" + showplan_ns + "RunTimeCountersPerThread")
+            actual = sum(int(counter.get("ActualRows", 0)) for counter in counters) if counters else None
+            self.shape.append(line)
+            self.plan.append(line + "  [оценка " + str(round(estimate)) + (", факт " + str(actual) if actual is not None else "") +
+                             ", стоимость " + child.get("EstimatedTotalSubtreeCost", "?") + "]")
+            self.check(line, child.get("PhysicalOp") in ("Table Scan", "Clustered Index Scan"), estimate, actual)
+            self.relops(child, depth + 1)
+
+    def record(self) -> dict:
+        # план для журнала замеров
+        return {"dialect": self.dialect, "plan": self.plan, "shape": self.shape, "stats": self.stats,
+                "messages": self.messages, "notes": self.notes, "file": self.file, "errors": self.errors}
+
+    def text(self) -> str:
+        # текст для панели плана
+        parts = ["План (" + self.dialect + "):"] + (self.plan or ["нет"])
+        if self.stats:
+            parts += ["", "Статистика сервера:"]
+            for name, value in self.stats.items():
+                if isinstance(value, dict):  # STATISTICS IO по таблицам
+                    parts += [name + " " + table + ": " + ", ".join(key + " = " + str(count) for key, count in counters.items() if count)
+                              for table, counters in value.items()]
+                else:
+                    parts.append(name + " = " + str(value))
+        if self.messages:
+            parts += ["", "Сообщения сервера:"] + self.messages
+        if self.notes:
+            parts += ["", "Замечания:"] + self.notes
+        if self.file:
+            parts += ["", "Showplan XML: " + self.file]
+        if self.errors:
+            parts += ["", "Ошибки получения плана:"] + self.errors
+        if self.previous is not None and self.shape:  # сравнение с прошлым запуском из журнала замеров
+            previous = self.previous["plan"]
+            if previous.get("shape") == self.shape:
+                parts += ["", "План не изменился с запуска " + self.previous.get("date", "?")]
+            else:
+                import difflib
+                parts += ["", "План изменился с запуска " + self.previous.get("date", "?") + ":"]
+                parts += list(difflib.unified_diff(previous.get("shape", []), self.shape, lineterm="", n=1))[2:]
+            parts += [name + ": " + str(previous["stats"][name]) + " -> " + str(value) for name, value in self.stats.items()
+                      if not isinstance(value, dict) and name in previous.get("stats", {}) and previous["stats"][name] != value]
+        return "\n".join(parts)
+
+
+class QueryJob:
+    """Класс выполнения SQL-запроса в фоновом потоке с возможностью отмены!"""
+
+    source = "query"  # вид записи в журнале замеров
+
+    def __init__(self, sql: str, config: str, driver=None, notify=None, use_cache: bool = False, limit: int = 0,
+                 params: list = (), session: Session = None) -> None:
+        self.sql = sql
+        self.configuration = config
+        self.driver = driver
+        self.session = session  # сеанс вкладки (None - соединение из пула на время запроса)
+        self.params = list(params)  # параметры SQL-запроса (для запросов к диапазонам ключа)
+        self.notify = notify  # функция notify(kind, payload), вызывается из фонового потока
+        self.cache_key = None  # ключ кэша результатов (только для SELECT-запросов без курсора)
+        if use_cache and isSelect(sql) and ":cr" not in sql:
+            self.cache_key = result_cache.key(driver, config, sql, params)
+        self.conn = None
+        self.cursor = None
+        self.cancelled = False
+        self.rows_fetched = 0
+        self.limit = limit  # строка, на которой выборка приостанавливается (0 - без ограничения)
+        self.condition = threading.Condition()
+        self.timer = QueryTimer(sql, self.source)
+        self.tuner = FetchTuner(config)
+        self.profile = False  # профилирование запуска (cProfile и tracemalloc)
+        self.explain = False  # план выполнения и статистика сервера (режим "План / Профиль")
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        with self.condition:
+            self.condition.notify_all()
+        interruptQuery(self.conn, self.cursor)
+
+    def fetchMore(self, count: int = 0) -> None:
+        with self.condition:
+            self.limit = self.rows_fetched + count if count else 0  # 0 - загрузить все
+            self.condition.notify_all()
+
+    def paused(self) -> bool:
+        return bool(self.limit) and self.rows_fetched >= self.limit
+
+    def consume(self, result, headers: list) -> None:
+        self.notify("headers", headers)
+        while not self.cancelled:
+            if self.paused():  # ожидание команды на загрузку следующих строк
+                if self.explain:  # для статистики сервера запрос выполняется до конца, строки сверх limit не передаются
+                    self.skip(result)
+                    break
+                self.notify("paused", (self.rows_fetched, str(round(self.timer.elapsed(), 3))))
+                with self.condition:
+                    while self.paused() and not self.cancelled:
+                        self.condition.wait()
+                continue
+            size = first_fetch_size if not self.rows_fetched else self.tuner.size
+            if self.limit:
+                size = min(size, self.limit - self.rows_fetched)
+            rows = self.fetch(result, size)
+            if not rows:
+                break
+            self.rows_fetched += len(rows)
+            self.notify("batch", rows)  # строки передаются в GUI порциями и не накапливаются в потоке
+
+    def skip(self, result) -> None:
+        while not self.cancelled and self.fetch(result, self.tuner.size):
+            pass
+
+    def fetch(self, result, size: int) -> list:
+        time1 = time.perf_counter()
+        rows = result.fetchmany(size)
+        seconds = time.perf_counter() - time1
+        self.timer.add("fetch", seconds)
+        self.timer.round_trips += 1
+        if rows:
+            self.timer.mark("first_row")
+            self.timer.addRows(rows)
+            self.tuner.observe(result, rows, seconds)
+            self.timer.record["arraysize"] = self.tuner.size
+        return rows
+
+    def run(self) -> None:
+        if not self.profile:
+            return self.runQuery()
+
+        # профилирование фонового потока запроса, итоговое сообщение отправляется после сохранения профиля
+        import cProfile, tracemalloc
+        notify, final = self.notify, []
+        self.notify = lambda kind, payload: final.append((kind, payload)) if kind not in ("headers", "batch", "paused") else notify(kind, payload)
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        profiler.enable()
+        try:
+            self.runQuery()
+        finally:
+            profiler.disable()
+            peak = tracemalloc.get_traced_memory()[1]
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            tracemalloc.stop()
+            try:
+                profiler.dump_stats(profile_file)
+            except OSError:
+                pass
+            self.timer.record["profile"] = {"file": profile_file, "memory_peak": peak, "memory_top": [str(stat) for stat in top]}
+            self.notify = notify
+            for kind, payload in final:
+                notify(kind, payload)
+
+    def runQuery(self) -> None:
+        if self.cache_key is not None:
+            cached = result_cache.get(self.cache_key)
+            if cached is not None:  # результат из кэша, без обращения к БД
+                self.notify("cached", cached)
+                return
+
+        is_cursor = True if ":cr" in self.sql else False  # Признак курсора в SQL-запросе
+        is_query = True  # Признак выборки
+
+        try:  # Запрос к БД
+            db = UseDatabase(self.configuration, self.driver, self.session)
+            with db as cursor:
+                self.conn = db.conn
+                self.cursor = cursor[0]
+                self.timer.add("connect", db.connect_time)
+                self.tuner.prepare(cursor[0])
+                self.tuner.prepare(cursor[1])
+                if self.explain:
+                    plan = PlanCapture(self.sql, self.params, db.driver, db.conn)
+                    plan.prepare()
+                try:
+                    self.timer.begin("execute")
+                    if is_cursor:  # SQL-запрос с курсором
+                        cursor[0].execute(self.sql, cr=cursor[1])
+                        result = cursor[1]
+                    elif self.params:  # SQL-запрос с параметрами
+                        cursor[0].execute(self.sql, self.params)
+                        result = cursor[0]
+                    else:  # Чистый SQL-запрос
+                        cursor[0].execute(self.sql)
+                        result = cursor[0]
+                    self.timer.end("execute")
+                    if self.explain:
+                        plan.executed(result)
+
+                    if result.description is None:  # SQL-запрос не на выборку (вставка, изменение, удаление)
+                        is_query = False
+                    else:
+                        self.tuner.start(result)
+                        self.consume(result, [desc[0].upper() for desc in result.description])
+                finally:
+                    if self.explain:  # план и статистика, в том числе после ошибки или отмены запроса
+                        plan.finish()
+                        self.timer.record["plan"] = plan.record()
+                        self.notify("plan", plan.text())
+        except DatabaseError as err:
+            self.notify("cancelled" if self.cancelled else "error", str(err))
+        else:
+            delta_time = str(round(self.timer.elapsed(), 3))  # время запроса (округление до трех знаков после запятой)
+            self.notify("finished", (is_query, delta_time, self.cancelled))
+
+
+compression_list = []  # доступные виды сжатия (проверяются один раз)
+
+
+def zstdCompress(data: bytes, level: int) -> bytes:
+    try:  # Python 3.14
+        from compression import zstd
+        return zstd.compress(data, level)
+    except ImportError:
+        import zstandard
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def compressions() -> list:
+    # доступные виды сжатия ("" - без сжатия)
+    if compression_list:
+        return compression_list
+    available = ["", "gzip"]
+    for name in ("compression.zstd", "zstandard"):
+        try:
+            importlib.import_module(name)
+            available.append("zstd")
+            break
+        except ImportError:
+            pass
+    compression_list.extend(available)
+    return compression_list
+
+
+def checkCompression(compression: str) -> None:
+    if compression and compression not in compressions():
+        raise DatabaseError("Сжатие " + compression + " недоступно (pip install zstandard)")
+
+
+def compressedName(filename: str, compression: str) -> str:
+    suffix = {"gzip": ".gz", "zstd": ".zst"}.get(compression, "")
+    return filename if filename.endswith(suffix) else filename + suffix
+
+
+def encodeChunk(rows: list, separator: str, end_line: str, text_codec: str, compression: str = "", newline: str = "\n") -> bytes:
+    # порция строк -> байты CSV в кодировке файла; сжатая порция - отдельный член gzip (кадр zstd),
+    # члены архива, записанные подряд, читаются gzip/zstd как один файл
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=separator, lineterminator=end_line).writerows(rows)
+    text = buffer.getvalue()
+    if newline != "\n":  # как при записи файла в текстовом режиме
+        text = text.replace("\n", newline)
+    data = text.encode(text_codec)
+    if compression == "gzip":
+        import gzip
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if compression == "zstd":
+        return zstdCompress(data, 3)
+    return data
+
+
+class ChunkWriter:
+    """Класс записи CSV порциями: порции кодируются и сжимаются в пуле процессов, в файл пишутся по порядку!"""
+
+    def __init__(self, file, separator: str = separator, end_line: str = end_line, text_codec: str = text_codec,
+                 compression: str = export_compression, processes: int = export_processes,
+                 chunk_rows: int = export_chunk_rows) -> None:
+        checkCompression(compression)
+        self.file = file  # файл, открытый в двоичном режиме
+        self.options = (separator, end_line, text_codec, compression, os.linesep)
+        # без сжатия кодирование в процессах не окупает передачу строк между процессами
+        self.pool = getProcessPool(processes) if compression and processes > 1 else None
+        self.max_pending = max(2, processes * 2)  # порций в работе (ограничение памяти)
+        self.chunk_rows = chunk_rows
+        self.buffer = []
+        self.pending = deque()  # [future, строки порции] в порядке записи
+        self.size = 0  # записано байт
+
+    def write(self, rows) -> None:
+        # rows - список или итератор строк (строки не собираются в памяти целиком)
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_rows - len(self.buffer)))
+            if not chunk:
+                break
+            self.buffer.extend(chunk)
+            if len(self.buffer) >= self.chunk_rows or not self.options[3]:  # без сжатия строки не накапливаются
+                self.submit()
+
+    def submit(self) -> None:
+        chunk, self.buffer = self.buffer, []
+        if self.pool is None:
+            self.output(encodeChunk(chunk, *self.options))
+            return
+        self.pending.append((self.pool.submit(encodeChunk, chunk, *self.options), chunk))
+        while self.pending and (len(self.pending) > self.max_pending or self.pending[0][0].done()):
+            self.writePending()
+
+    def writePending(self) -> None:
+        future, chunk = self.pending.popleft()
+        try:
+            data = future.result()
+        except (TypeError, AttributeError):  # значения, которые нельзя передать в процесс (LOB)
+            data = encodeChunk(chunk, *self.options)
+        self.output(data)
+
+    def output(self, data: bytes) -> None:
+        self.file.write(data)
+        self.size += len(data)
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.submit()
+        while self.pending:
+            self.writePending()
+
+    def append(self, other: "ChunkWriter") -> None:
+        # порции другого писателя (временный файл диапазона) после своих
+        import shutil
+        self.flush()
+        other.flush()
+        other.file.seek(0)
+        shutil.copyfileobj(other.file, self.file)
+        self.size += other.size
+
+
+class ExportJob(QueryJob):
+    """Класс выгрузки результата SQL-запроса напрямую в CSV-файл (без загрузки в таблицу)!"""
+
+    source = "export"
+
+    def __init__(self, sql: str, config: str, filename: str, driver=None, notify=None,
+                 separator: str = separator, end_line: str = end_line, text_codec: str = text_codec,
+                 session: Session = None, compression: str = export_compression, processes: int = export_processes) -> None:
+        super().__init__(sql, config, driver, notify, session=session)
+        self.filename = compressedName(filename, compression)
+        self.separator = separator
+        self.end_line = end_line
+        self.text_codec = text_codec
+        self.compression = compression
+        self.processes = processes
+        self.size = 0  # размер файла (в байтах)
+
+    def writer(self, file) -> ChunkWriter:
+        return ChunkWriter(file, self.separator, self.end_line, self.text_codec, self.compression, self.processes)
+
+    def consume(self, result, headers: list) -> None:
+        # строки записываются в файл порциями, пока сервер готовит следующую порцию, предыдущие кодируются и сжимаются
+        checkCompression(self.compression)
+        with open(self.filename, "wb", buffering=export_buffer_size) as f:
+            w = self.writer(f)
+            w.write([headers])
+            while not self.cancelled:
+                rows = self.fetch(result, self.tuner.size)
+                if not rows:
+                    break
+                self.timer.begin("export")
+                w.write(rows)
+                self.timer.end("export")
+                self.rows_fetched += len(rows)
+            self.timer.begin("export")
+            w.flush()
+            self.timer.end("export")
+            self.size = w.size
+
+
+class ParallelExportJob(ExportJob):
+    """Класс параллельной выгрузки в CSV по диапазонам ключа (каждый диапазон в своем соединении)!"""
+
+    def __init__(self, sql: str, config: str, filename: str, column: str, driver=None, notify=None,
+                 degree: int = parallel_degree, ordered: bool = False, method: str = "minmax",
+                 separator: str = separator, end_line: str = end_line, text_codec: str = text_codec,
+                 compression: str = export_compression, processes: int = export_processes) -> None:
+        super().__init__(sql, config, filename, driver, notify, separator, end_line, text_codec,
+                         compression=compression, processes=processes)
+        self.sql = trimSQL(sql)  # запрос используется как подзапрос
+        self.column = column  # столбец разбиения (число или дата)
+        self.degree = max(1, degree)
+        self.ordered = ordered  # строки в файле упорядочены по столбцу разбиения
+        self.method = method  # "minmax" - равные интервалы между MIN и MAX, "ntile" - квантили NTILE
+        self.parts = []  # запросы к диапазонам ключа
+
+    def cancel(self) -> None:
+        super().cancel()
+        for part in list(self.parts):
+            part.cancel()
+
+    def ranges(self, cursor) -> tuple:
+        # границы диапазонов, операторы сравнения с нижней и верхней границей
+        source = " FROM (" + self.sql + ") q"
+        if self.method != "ntile":
+            cursor.execute("SELECT MIN(" + self.column + "), MAX(" + self.column + ")" + source)
+            low, high = cursor.fetchone()
+            if low is None or low == high:
+                return [], ">=", "<"
+            try:
+                cuts = []
+                for k in range(1, self.degree):
+                    step = (high - low) * k
+                    cut = low + (step // self.degree if isinstance(step, int) else step / self.degree)
+                    if low < cut < high and cut not in cuts:
+                        cuts.append(cut)
+                return cuts, ">=", "<"
+            except TypeError:  # ключ без арифметики (например, даты строкой в SQLite) делится по NTILE
+                pass
+        cursor.execute("SELECT MAX(c) FROM (SELECT " + self.column + " AS c, NTILE(" + str(self.degree) + ") OVER (ORDER BY " +
+                       self.column + ") AS nt" + source + " WHERE " + self.column + " IS NOT NULL) t GROUP BY nt ORDER BY 1")
+        cuts = [row[0] for row in cursor.fetchall()][:-1]  # верхние границы всех диапазонов, кроме последнего
+        return sorted(set(cuts)), ">", "<="
+
+    def partitions(self, driver, cuts: list, lower: str, upper: str) -> list:
+        # запросы к диапазонам: строки с NULL в столбце разбиения попадают в первый диапазон
+        base = "SELECT * FROM (" + self.sql + ") q"
+        order = " ORDER BY " + self.column if self.ordered else ""
+        if not cuts:
+            return [(base + order, [])]
+        parts = []
+        for index in range(len(cuts) + 1):
+            conditions, params = [], []
+            if index:
+                params.append(cuts[index - 1])
+                conditions.append(self.column + " " + lower + " " + paramMarker(driver, len(params)))
+            if index < len(cuts):
+                params.append(cuts[index])
+                conditions.append(self.column + " " + upper + " " + paramMarker(driver, len(params)))
+            where = " AND ".join(conditions)
+            if not index:
+                where = "(" + where + " OR " + self.column + " IS NULL)"
+            parts.append((base + " WHERE " + where + order, params))
+        return parts
+
+    def runQuery(self) -> None:
+        try:
+            driver = getDriver(self.driver)
+            db = UseDatabase(self.configuration, driver)
+            db.pool.max_size = max(db.pool.max_size, self.degree)  # по соединению на каждый диапазон
+            with db as cursor:
+                self.conn = db.conn
+                self.cursor = cursor[0]
+                self.timer.add("connect", db.connect_time)
+                self.timer.begin("execute")
+                cuts, lower, upper = self.ranges(cursor[0])
+                self.timer.end("execute")
+            self.conn = self.cursor = None
+            if not self.cancelled:
+                self.exportParts(driver, self.partitions(driver, cuts, lower, upper))
+        except Exception as err:  # любая ошибка завершает выгрузку сообщением, GUI не остается в ожидании
+            self.notify("cancelled" if self.cancelled else "error", str(err))
+        else:
+            self.notify("finished", (True, str(round(self.timer.elapsed(), 3)), self.cancelled))
+
+    def exportParts(self, driver, parts: list) -> None:
+        # диапазоны выгружаются параллельно, порции пишутся в файл одним потоком по мере получения;
+        # при упорядочивании порции диапазонов, чья очередь еще не пришла, ждут во временных файлах
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        messages = queue.Queue(maxsize=self.degree * 4)
+        self.parts = [QueryJob(sql, self.configuration, driver, lambda kind, payload, index=index: messages.put((index, kind, payload)),
+                               params=params) for index, (sql, params) in enumerate(parts)]
+        if self.cancelled:
+            return
+        checkCompression(self.compression)
+        spools = {}  # писатели во временные файлы диапазонов, ожидающих своей очереди
+        done, errors, current, has_headers = set(), [], 0, False
+        time1 = time.perf_counter()
+        try:
+            with open(self.filename, "wb", buffering=export_buffer_size) as f, \
+                    ThreadPoolExecutor(max_workers=len(self.parts)) as executor:
+                w = self.writer(f)
+                for part in self.parts:
+                    executor.submit(part.run)
+                while len(done) < len(self.parts):  # сообщения читаются до конца, чтобы потоки не зависли на очереди
+                    index, kind, payload = messages.get()
+                    if errors and kind in ("headers", "batch"):  # после ошибки порции только вычитываются из очереди
+                        continue
+                    try:
+                        if kind == "headers":
+                            if not has_headers:
+                                w.write([payload])
+                                has_headers = True
+                        elif kind == "batch":
+                            self.timer.mark("first_row")
+                            self.timer.begin("export")
+                            if not self.ordered or index == current:
+                                w.write(payload)
+                            else:
+                                if index not in spools:
+                                    spools[index] = self.writer(tempfile.TemporaryFile())
+                                spools[index].write(payload)
+                            self.timer.end("export")
+                            self.rows_fetched += len(payload)
+                        else:
+                            done.add(index)
+                            if kind == "error" and not self.cancelled:  # ошибка в одном диапазоне отменяет остальные
+                                errors.append(payload)
+                                for part in self.parts:
+                                    part.cancel()
+                            while self.ordered and current in done:  # следующий по порядку диапазон
+                                current += 1
+                                spool = spools.pop(current, None)
+                                if spool is not None:
+                                    w.append(spool)
+                                    spool.file.close()
+                    except Exception as err:  # ошибка записи (например, кодирования значения) отменяет все диапазоны
+                        errors.append(str(err))
+                        for part in self.parts:
+                            part.cancel()
+                if not errors:
+                    w.flush()
+                    self.size = w.size
+        finally:
+            for spool in spools.values():
+                spool.file.close()
+        self.timer.add("fetch", time.perf_counter() - time1)
+        for part in self.parts:
+            self.timer.rows += part.timer.rows
+            self.timer.bytes += part.timer.bytes
+            self.timer.round_trips += part.timer.round_trips
+        if errors:
+            raise DatabaseError(errors[0])
+
+
+class ImportJob(QueryJob):
+    """Класс загрузки CSV-файла в таблицу пакетами executemany с фиксацией каждые N строк!"""
+
+    source = "import"
+
+    converters = {"int": int, "float": float, "date": datetime.datetime.fromisoformat, "str": str}
+    # запись числа, которая не меняется при обратном переводе в текст (без ведущих нулей, "+", "_" и пробелов)
+    number_text = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+
+    def __init__(self, filename: str, table: str, config: str, driver=None, notify=None, types: dict = None,
+                 batch_size: int = import_batch_size, commit_rows: int = import_commit_rows, reject_file: str = None,
+                 separator: str = separator, end_line: str = end_line, text_codec: str = text_codec,
+                 session: Session = None) -> None:
+        super().__init__("", config, driver, notify, session=session)
+        self.filename = filename
+        self.table = table
+        self.types = {name.upper(): kind for name, kind in (types or {}).items()}  # столбец -> int, float, date, str
+        self.batch_size = max(1, batch_size)
+        self.commit_rows = max(self.batch_size, commit_rows)
+        self.reject_file = reject_file or os.path.splitext(filename)[0] + "_rejected.csv"
+        self.separator = separator
+        self.end_line = end_line
+        self.text_codec = text_codec
+        self.rows_rejected = 0
+        self.rejects = None  # файл отклоненных строк, открывается при первой ошибке
+
+    def inferTypes(self, headers: list, sample: list, driver) -> list:
+        # тип столбца по первым строкам файла: int, float, date (кроме SQLite, где даты хранятся строкой), иначе str;
+        # пустой в образце столбец и коды вроде 001 остаются строками
+        kinds = []
+        for index, name in enumerate(headers):
+            kind = self.types.get(name.upper())
+            if kind is None:
+                values = [row[index] for row in sample if index < len(row) and row[index] != ""]
+                for kind in ("int", "float", "date", "str") if values else ("str",):
+                    if kind == "date" and driver.__name__ == "sqlite3":
+                        continue
+                    if kind in ("int", "float") and not all(self.number_text.fullmatch(value) for value in values):
+                        continue
+                    try:
+                        for value in values:
+                            self.converters[kind](value)
+                        break
+                    except (ValueError, TypeError):
+                        pass
+            kinds.append(kind)
+        return kinds
+
+    def convert(self, row: list, functions: list) -> tuple:
+        if len(row) != len(functions):
+            raise ValueError("количество полей " + str(len(row)) + " вместо " + str(len(functions)))
+        return tuple(None if value == "" else function(value) for value, function in zip(row, functions))
+
+    def reject(self, row: list, message: str) -> None:
+        if self.rejects is None:
+            self.rejects = open(self.reject_file, "w", encoding=self.text_codec, newline="")
+            self.rejects_writer = csv.writer(self.rejects, delimiter=self.separator, lineterminator=self.end_line)
+        self.rejects_writer.writerow(list(row) + [message])
+        self.rows_rejected += 1
+
+    def insert(self, cursor, batch: list, source: list) -> list:
+        # вставка пакета: cx_Oracle пропускает ошибочные строки (batcherrors), для остальных драйверов
+        # пакет с ошибкой повторяется построчно; возвращаются вставленные строки
+        time1 = time.perf_counter()
+        self.timer.round_trips += 1
+        try:
+            if hasattr(cursor, "getbatcherrors"):  # cx_Oracle, array DML
+                cursor.executemany(self.sql, batch, batcherrors=True)
+                failed = {error.offset: error.message for error in cursor.getbatcherrors()}
+                for offset, message in failed.items():
+                    self.reject(source[offset], message)
+                return [row for offset, row in enumerate(batch) if offset not in failed]
+            cursor.executemany(self.sql, batch)
+            return batch
+        except Exception:
+            return None
+        finally:
+            self.timer.add("execute", time.perf_counter() - time1)
+
+    def insertRows(self, cursor, batch: list, source: list) -> list:
+        inserted, message = [], ""
+        for row, line in zip(batch, source):
+            try:
+                cursor.execute(self.sql, row)
+                inserted.append(row)
+            except Exception as err:
+                message = str(err)
+                self.reject(line, message)
+        if not inserted and not self.rows_fetched:  # не вставилась ни одна строка первого пакета - ошибка в таблице или столбцах
+            raise DatabaseError(message)
+        return inserted
+
+    def runQuery(self) -> None:
+        try:
+            driver = getDriver(self.driver)
+            unknown = sorted(set(self.types.values()) - set(self.converters))
+            if unknown:
+                raise DatabaseError("Неизвестный тип столбца: " + ", ".join(unknown) + " (допустимы " + ", ".join(self.converters) + ")")
+            if os.path.exists(self.reject_file):  # отклоненные строки прошлой загрузки
+                os.remove(self.reject_file)
+            with open(self.filename, "r", encoding=self.text_codec, newline="") as f:
+                reader = csv.reader(f, delimiter=self.separator)
+                headers = next(reader, None)
+                if not headers:
+                    raise DatabaseError("Пустой файл: " + self.filename)
+                sample = list(itertools.islice(reader, import_sample_rows))
+                functions = [self.converters[kind] for kind in self.inferTypes(headers, sample, driver)]
+                self.sql = ("INSERT INTO " + self.table + " (" + ", ".join(headers) + ") VALUES (" +
+                            ", ".join(paramMarker(driver, number) for number in range(1, len(headers) + 1)) + ")")
+                self.timer.record["sql"] = self.sql
+
+                db = UseDatabase(self.configuration, driver, self.session)
+                with db as cursor:
+                    self.conn = db.conn
+                    self.cursor = cursor = cursor[0]
+                    self.timer.add("connect", db.connect_time)
+                    if hasattr(cursor, "fast_executemany"):  # pyodbc, параметры передаются массивом
+                        cursor.fast_executemany = True
+                    pending = []  # пакеты, вставленные после последней фиксации
+                    uncommitted = 0
+                    lines = itertools.chain(sample, reader)
+                    while not self.cancelled:
+                        time1 = time.perf_counter()
+                        chunk = list(itertools.islice(lines, self.batch_size))
+                        if not chunk:
+                            break
+                        batch, source = [], []
+                        for line in chunk:
+                            try:
+                                batch.append(self.convert(line, functions))
+                                source.append(line)
+                            except (ValueError, TypeError) as err:  # строка с неверным значением не отправляется в БД
+                                self.reject(line, str(err))
+                        self.timer.add("fetch", time.perf_counter() - time1)
+                        if not batch:
+                            continue
+                        inserted = self.insert(cursor, batch, source)
+                        if inserted is None:  # откат до последней фиксации, повтор успешных пакетов и построчная вставка
+                            self.conn.rollback()
+                            for rows in pending:
+                                cursor.executemany(self.sql, rows)
+                            inserted = self.insertRows(cursor, batch, source)
+                        pending.append(inserted)
+                        self.timer.addRows(inserted)
+                        self.rows_fetched += len(inserted)
+                        uncommitted += len(inserted)
+                        if uncommitted >= self.commit_rows:
+                            self.conn.commit()
+                            pending, uncommitted = [], 0
+                    if self.cancelled:  # при отмене остаются только зафиксированные строки
+                        self.conn.rollback()
+                        self.rows_fetched -= uncommitted
+        except (DatabaseError, OSError, UnicodeError, csv.Error, ValueError, KeyError) as err:  # в т.ч. слишком длинное поле CSV
+            self.notify("cancelled" if self.cancelled else "error", str(err))
+        else:
+            self.notify("finished", (False, str(round(self.timer.elapsed(), 3)), self.cancelled))
+        finally:
+            if self.rejects is not None:
+                self.rejects.close()
+
+
+float_exact = 2 ** 53  # целые до 2**53 по модулю точно представимы в float
+
+
+class ResultColumn:
+    """Класс столбца результата: числа в array, строки в словаре значений, NULL в битовой маске!"""
+
+    dictionary_check = 10000  # после скольких значений проверяется число разных строк
+    dictionary_ratio = 0.5  # доля разных строк, при которой словарь перестает быть выгодным
+
+    def __init__(self) -> None:
+        self.kind = None  # "int", "float", "decimal" (целые * 10**exponent), "str" (коды словаря) или "object" (список значений)
+        self.data = None
+        self.exponent = 0  # общий порядок Decimal столбца
+        self.strings = None  # словарь строк: код -> строка
+        self.lookup = None  # строка -> код
+        self.nulls = bytearray()  # битовая маска NULL
+        self.has_nulls = False
+        self.count = 0
+        self.size = 0  # размер строк/объектов, на которые ссылается столбец (в байтах)
+
+    def detect(self, values: list) -> None:
+        for v in values:
+            if v is not None:
+                if type(v) is int:
+                    self.kind, self.data = "int", array("q")
+                elif type(v) is float:
+                    self.kind, self.data = "float", array("d")
+                elif type(v) is str:
+                    self.kind, self.data = "str", array("I")
+                    self.strings, self.lookup = [], {}
+                elif type(v) is Decimal and v.is_finite():
+                    self.kind, self.data = "decimal", array("q")
+                    self.exponent = v.as_tuple().exponent
+                else:
+                    self.kind, self.data = "object", []
+                return
+
+    def toObject(self) -> None:
+        # столбец со смешанными типами хранится списком значений
+        values = list(self.values())
+        self.size = sum(sys.getsizeof(v) for v in values)
+        self.kind, self.data, self.strings, self.lookup = "object", values, None, None
+
+    @staticmethod
+    def exact(values) -> bool:
+        # целые числа точно представимы в float
+        return all(-float_exact <= v <= float_exact for v in values)
+
+    def toDecimal(self, value: int) -> Decimal:
+        return Decimal(value).scaleb(self.exponent)
+
+    def extend(self, values: list) -> None:
+        start = self.count
+        if self.kind is None:
+            self.detect(values)
+            if self.kind is None:  # пока только NULL
+                self.kind, self.data = "object", []
+
+        self.nulls.extend(bytes((start + len(values) + 7) // 8 - len(self.nulls)))
+        nulls = [i for i, v in enumerate(values) if v is None]
+        for i in nulls:
+            self.nulls[(start + i) >> 3] |= 1 << ((start + i) & 7)
+        if nulls:
+            self.has_nulls = True
+
+        if self.kind in ("int", "float"):
+            filled = [0 if v is None else v for v in values] if nulls else values
+            types = set(map(type, filled))
+            if self.kind == "int" and float in types and self.exact(self.data):
+                # NUMBER без масштаба: целые и дробные числа вперемешку, столбец переводится в array("d")
+                self.kind, self.data = "float", array("d", self.data)
+            if self.kind == "int":
+                exact = types <= {int}
+            else:  # целые в дробном столбце принимаются, если float хранит их точно
+                exact = types <= {int, float} and (int not in types or self.exact(v for v in filled if type(v) is int))
+            if exact:
+                try:
+                    self.data.extend(filled)
+                except OverflowError:  # число не помещается в 64 бита
+                    del self.data[start:]
+                    self.toObject()
+            else:
+                self.toObject()
+        elif self.kind == "decimal":
+            exponent = self.exponent
+            if all(v is None or type(v) is Decimal and v.as_tuple().exponent == exponent for v in values):
+                try:
+                    self.data.extend([0 if v is None else int(v.scaleb(-exponent)) for v in values])
+                except OverflowError:
+                    del self.data[start:]
+                    self.toObject()
+            else:
+                self.toObject()  # другой масштаб или тип значений
+        elif self.kind == "str":
+            if all(type(v) is str or v is None for v in values):
+                lookup, strings, codes = self.lookup, self.strings, []
+                for v in values:
+                    code = lookup.get(v)
+                    if code is None:
+                        if v is None:
+                            code = 0
+                        else:
+                            code = lookup[v] = len(strings)
+                            strings.append(v)
+                            self.size += sys.getsizeof(v)
+                    codes.append(code)
+                self.data.extend(codes)
+                if len(strings) > self.dictionary_check and len(strings) > (start + len(values)) * self.dictionary_ratio:
+                    self.count = start + len(values)
+                    self.toObject()  # почти все строки разные - словарь только занимает память
+                    return
+            else:
+                self.toObject()
+
+        if self.kind == "object":
+            if len(self.data) == start:
+                self.data.extend(values)
+                self.size += sum(sys.getsizeof(v) for v in values if v is not None)
+        self.count = start + len(values)
+
+    def isNull(self, index: int) -> bool:
+        return self.has_nulls and bool(self.nulls[index >> 3] & (1 << (index & 7)))
+
+    def nullRows(self) -> list:
+        # индексы строк с NULL по битовой маске (байты без NULL пропускаются)
+        if not self.has_nulls:
+            return []
+        return [(k << 3) + b for k, byte in enumerate(self.nulls) if byte for b in range(8)
+                if byte >> b & 1 and (k << 3) + b < self.count]
+
+    def value(self, index: int):
+        if self.isNull(index):
+            return None
+        if self.kind == "str":
+            return self.strings[self.data[index]]
+        if self.kind == "decimal":
+            return self.toDecimal(self.data[index])
+        return self.data[index]
+
+    def values(self, start: int = 0, stop: int = None):
+        # итератор значений столбца (без построения строк результата)
+        stop = self.count if stop is None else min(stop, self.count)
+        if self.kind is None or start >= stop:
+            return iter(())
+        if self.kind == "str":
+            values = map(self.strings.__getitem__, self.data[start:stop])
+        elif self.kind == "decimal":
+            values = map(self.toDecimal, self.data[start:stop])
+        else:
+            values = self.data[start:stop] if start or stop != self.count else self.data
+        if not self.has_nulls or self.kind == "object":
+            return iter(values)
+        return (None if self.isNull(i) else v for i, v in enumerate(values, start))
+
+    def nbytes(self) -> int:
+        size = len(self.nulls) + self.size
+        if self.kind == "object":
+            return size + sys.getsizeof(self.data)
+        if self.data is not None:
+            size += self.data.itemsize * len(self.data)
+        if self.strings is not None:
+            size += sys.getsizeof(self.strings) + sys.getsizeof(self.lookup)
+        return size
+
+
+class SpillFile:
+    """Класс файла подкачки результата: страницы строк во временном файле, чтение через mmap!"""
+
+    def __init__(self, cache_pages: int = spill_cache_pages) -> None:
+        import tempfile
+        self.file = tempfile.TemporaryFile(prefix="sql_tools_")
+        self.pages = []  # страницы: (смещение, длина)
+        self.starts = []  # номер первой строки каждой страницы
+        self.count = 0
+        self.size = 0  # размер файла (в байтах)
+        self.map = None
+        self.cache = OrderedDict()  # последние прочитанные страницы
+        self.cache_pages = cache_pages
+        self.lock = threading.Lock()
+
+    def append(self, rows: list) -> None:
+        import pickle
+        data = pickle.dumps([tuple(row) for row in rows], protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.file.seek(self.size)
+            self.file.write(data)
+            self.pages.append((self.size, len(data)))
+            self.starts.append(self.count)
+            self.size += len(data)
+            self.count += len(rows)
+
+    def page(self, index: int) -> list:
+        import pickle, mmap
+        with self.lock:
+            if index in self.cache:
+                self.cache.move_to_end(index)
+                return self.cache[index]
+            offset, length = self.pages[index]
+            if self.map is None or len(self.map) < offset + length:  # файл вырос - отображение создается заново
+                self.file.flush()
+                if self.map is not None:
+                    self.map.close()
+                self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            rows = pickle.loads(self.map[offset:offset + length])
+            self.cache[index] = rows
+            if len(self.cache) > self.cache_pages:
+                self.cache.popitem(last=False)
+            return rows
+
+    def row(self, index: int) -> tuple:
+        k = bisect.bisect_right(self.starts, index) - 1
+        return self.page(k)[index - self.starts[k]]
+
+    def rows(self, start: int = 0, stop: int = None):
+        # итератор строк с start по stop, страницы читаются по одной
+        stop = self.count if stop is None else min(stop, self.count)
+        k = max(0, bisect.bisect_right(self.starts, start) - 1)
+        while start < stop and k < len(self.pages):
+            page = self.page(k)
+            first = self.starts[k]
+            yield from page[start - first:stop - first]
+            start = first + len(page)
+            k += 1
+
+    def close(self) -> None:
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.cache.clear()
+            self.file.close()
+
+
+class ResultSet:
+    """Класс результата SQL-запроса, хранящегося по столбцам (сверх memory_budget - в файле подкачки)!"""
+
+    def __init__(self, headers=(), budget: int = memory_budget) -> None:
+        self.headers = list(headers)
+        self.columns = [ResultColumn() for _ in self.headers]
+        self.count = 0
+        self.memory_count = 0  # количество строк в памяти, остальные в self.spill
+        self.budget = budget
+        self.spill = None
+        self.indexes = {}  # индексы столбцов для сортировки, фильтра и поиска (строятся по запросу)
+
+    def extend(self, rows: list) -> None:
+        self.indexes.clear()
+        if self.spill is not None:
+            self.spill.append(rows)
+        else:
+            for j, column in enumerate(self.columns):
+                column.extend([row[j] for row in rows])
+            self.memory_count += len(rows)
+            if self.budget and self.nbytes() > self.budget:  # следующие порции строк пишутся на диск
+                self.spill = SpillFile()
+        self.count += len(rows)
+
+    def spilled(self) -> int:
+        return self.count - self.memory_count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            rows = self.rows(start, stop)
+            return rows if step == 1 else rows[::step]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("ResultSet index out of range")
+        if index >= self.memory_count:
+            return self.spill.row(index - self.memory_count)
+        return tuple(column.value(index) for column in self.columns)
+
+    def __iter__(self):
+        rows = zip(*[column.values() for column in self.columns]) if self.columns else iter(())
+        if self.spill is not None:
+            rows = itertools.chain(rows, self.spill.rows())
+        return rows
+
+    def value(self, index: int, column: int):
+        if index >= self.memory_count:
+            return self.spill.row(index - self.memory_count)[column]
+        return self.columns[column].value(index)
+
+    def rows(self, start: int, stop: int) -> list:
+        rows = []
+        if start < self.memory_count and self.columns:
+            rows = list(zip(*[column.values(start, stop) for column in self.columns]))
+        if self.spill is not None and stop > self.memory_count:
+            rows.extend(self.spill.rows(max(start, self.memory_count) - self.memory_count, stop - self.memory_count))
+        return rows
+
+    def column(self, index: int, start: int = 0, stop: int = None):
+        stop = self.count if stop is None else min(stop, self.count)
+        values = self.columns[index].values(start, stop)
+        if self.spill is not None and stop > self.memory_count:
+            spilled = self.spill.rows(max(start, self.memory_count) - self.memory_count, stop - self.memory_count)
+            values = itertools.chain(values, (row[index] for row in spilled))
+        return values
+
+    def nbytes(self) -> int:
+        # размер строк в памяти (файл подкачки не учитывается)
+        return sum(column.nbytes() for column in self.columns)
+
+    def close(self) -> None:
+        if self.spill is not None:
+            self.spill.close()
+
+    def sortIndex(self, j: int) -> array:
+        # перестановка строк по возрастанию значений столбца, NULL первыми
+        key = ("sort", j)
+        if key not in self.indexes:
+            column = self.columns[j]
+            nulls = column.nullRows() if not self.spilled() else None
+            if column.kind == "str" and nulls is not None:  # сортируются только разные строки словаря
+                rank = array("I", bytes(4 * len(column.strings)))
+                for r, code in enumerate(sorted(range(len(column.strings)), key=column.strings.__getitem__)):
+                    rank[code] = r
+                values = [rank[code] for code in column.data]
+                rows = range(self.count)
+                if nulls:
+                    null_set = set(nulls)
+                    rows = [i for i in rows if i not in null_set]
+            else:
+                values = list(self.column(j))
+                nulls = [i for i, v in enumerate(values) if v is None]
+                rows = [i for i, v in enumerate(values) if v is not None] if nulls else range(self.count)
+            try:
+                rows = sorted(rows, key=values.__getitem__)
+            except TypeError:  # разные типы в одном столбце сравниваются как строки
+                rows = sorted(rows, key=lambda i: str(values[i]))
+            order = array("I", nulls)
+            order.extend(rows)
+            self.indexes[key] = order
+        return self.indexes[key]
+
+    def sortedValues(self, j: int) -> tuple:
+        # количество NULL и значения без NULL в порядке sortIndex (для поиска диапазона через bisect)
+        key = ("values", j)
+        if key not in self.indexes:
+            order = self.sortIndex(j)
+            nulls = len(self.columns[j].nullRows()) if not self.spilled() else sum(1 for v in self.column(j) if v is None)
+            self.indexes[key] = nulls, [self.value(i, j) for i in order[nulls:]]
+        return self.indexes[key]
+
+    def hashIndex(self, j: int) -> dict:
+        # значение -> индексы строк (для условия равенства)
+        key = ("hash", j)
+        if key not in self.indexes:
+            index = {}
+            for i, v in enumerate(self.column(j)):
+                try:
+                    index.setdefault(v, []).append(i)
+                except TypeError:  # нехешируемое значение ищется по строке
+                    index.setdefault(str(v), []).append(i)
+            self.indexes[key] = index
+        return self.indexes[key]
+
+    def literal(self, j: int, text: str):
+        # значение условия фильтра в типе столбца
+        kind = self.columns[j].kind
+        for convert in ((int,) if kind == "int" else (float,) if kind == "float" else (Decimal,) if kind == "decimal"
+                        else (str,) if kind == "str" else (int, float, datetime.datetime.fromisoformat, str)):
+            try:
+                return convert(text)
+            except (ValueError, InvalidOperation):
+                pass
+        return text
+
+    def matchRows(self, j: int, op: str, text: str) -> list:
+        # индексы строк (по возрастанию), значения которых удовлетворяют условию op text
+        if op == "like":
+            return self.searchRows(j, text.lower())
+        if text.upper() == "NULL" and op in ("=", "<>", "!="):
+            nulls = set(i for i, v in enumerate(self.column(j)) if v is None)
+            return sorted(nulls) if op == "=" else [i for i in range(self.count) if i not in nulls]
+        value = self.literal(j, text)
+        if op == "=":
+            return self.hashIndex(j).get(value, [])
+        if op in ("<>", "!="):
+            equal = set(self.hashIndex(j).get(value, []))
+            return [i for i, v in enumerate(self.column(j)) if v is not None and i not in equal]
+        nulls, values = self.sortedValues(j)
+        try:
+            if op in (">", ">="):
+                start, stop = (bisect.bisect_right if op == ">" else bisect.bisect_left)(values, value), len(values)
+            else:
+                start, stop = 0, (bisect.bisect_left if op == "<" else bisect.bisect_right)(values, value)
+        except TypeError:  # значение другого типа - сравнение строк
+            compare = {">": str.__gt__, ">=": str.__ge__, "<": str.__lt__, "<=": str.__le__}[op]
+            return [i for i, v in enumerate(self.column(j)) if v is not None and compare(str(v), text)]
+        return sorted(self.sortIndex(j)[nulls + start:nulls + stop])
+
+    def searchRows(self, j: int, text: str, rows: list = None) -> list:
+        # индексы строк, где значение содержит text (без учета регистра); rows - строки-кандидаты
+        column = self.columns[j]
+        if column.kind == "str" and not self.spilled():  # проверяются только разные строки словаря
+            codes = set(code for code, v in enumerate(column.strings) if text in v.lower())
+            data = column.data
+            candidates = range(self.count) if rows is None else rows
+            return [i for i in candidates if data[i] in codes and not column.isNull(i)]
+        if rows is None:
+            return [i for i, v in enumerate(self.column(j)) if v is not None and text in str(v).lower()]
+        return [i for i in rows if text in str(self.value(i, j)).lower()] if text else list(rows)
+
+
+class ResultView:
+    """Класс представления результата через перестановку строк (сортировка, фильтр) без копирования строк!"""
+
+    def __init__(self, result) -> None:
+        self.result = result
+        self.order = None  # индексы строк результата в порядке вывода, None - все строки по порядку
+        self.sort_column = None
+        self.descending = False
+        self.filters = {}  # столбец -> условие фильтра
+        self.search = {}  # столбец -> (текст, строки) последнего поиска
+
+    @property
+    def headers(self) -> list:
+        return self.result.headers
+
+    def active(self) -> bool:
+        return self.order is not None
+
+    def reset(self) -> None:
+        self.order, self.sort_column, self.descending, self.filters, self.search = None, None, False, {}, {}
+
+    def sort(self, j, descending: bool = False) -> None:
+        self.sort_column, self.descending = j, descending
+        self.apply()
+
+    def filter(self, j: int, condition: str) -> None:
+        if condition.strip():
+            self.filters[j] = condition.strip()
+        else:
+            self.filters.pop(j, None)
+        self.apply()
+
+    @staticmethod
+    def parseFilter(condition: str) -> list:
+        # условие: =, <>, !=, >, >=, <, <= значение, диапазон "a..b", иначе поиск подстроки
+        if ".." in condition:
+            low, high = condition.split("..", 1)
+            return [(">=", low.strip()), ("<=", high.strip())]
+        for op in (">=", "<=", "<>", "!=", "=", ">", "<"):
+            if condition.startswith(op):
+                return [(op, condition[len(op):].strip())]
+        return [("like", condition)]
+
+    def apply(self) -> None:
+        rows = None  # None - без фильтра
+        for j, condition in self.filters.items():
+            for op, text in self.parseFilter(condition):
+                matched = self.result.matchRows(j, op, text)
+                if rows is None:
+                    rows = matched
+                else:
+                    matched = set(matched)
+                    rows = [i for i in rows if i in matched]
+        if self.sort_column is not None:
+            order = self.result.sortIndex(self.sort_column)
+            if rows is not None:
+                mask = bytearray(len(self.result))
+                for i in rows:
+                    mask[i] = 1
+                order = array("I", (i for i in order if mask[i]))
+            else:
+                order = array("I", order)
+            if self.descending:
+                order.reverse()
+            self.order = order
+        else:
+            self.order = None if rows is None else array("I", rows)
+        self.search = {}
+
+    def index(self, i: int) -> int:
+        return i if self.order is None else self.order[i]
+
+    def __len__(self) -> int:
+        return len(self.result) if self.order is None else len(self.order)
+
+    def __getitem__(self, index):
+        if self.order is None:
+            return self.result[index]
+        if isinstance(index, slice):
+            return [self.result[i] for i in self.order[index]]
+        return self.result[self.order[index]]
+
+    def __iter__(self):
+        if self.order is None:
+            return iter(self.result)
+        return (self.result[i] for i in self.order)
+
+    def value(self, i: int, j: int):
+        return self.result.value(self.index(i), j)
+
+    def rows(self, start: int, stop: int) -> list:
+        return self[start:stop]
+
+    def column(self, j: int, start: int = 0, stop: int = None):
+        if self.order is None:
+            return self.result.column(j, start, stop)
+        return (self.result.value(i, j) for i in self.order[start:stop])
+
+    def matches(self, j: int, text: str) -> list:
+        # строки, содержащие text; при дописывании текста проверяются только найденные прежде строки
+        previous = self.search.get(j)
+        rows = previous[1] if previous and text.startswith(previous[0]) else None
+        rows = self.result.searchRows(j, text, rows)
+        self.search[j] = (text, rows)
+        return rows
+
+    def find(self, text: str, start: int = 0, columns=None) -> int:
+        # поиск по мере ввода: позиция первой строки представления начиная со start, где значение содержит text
+        text = text.lower()
+        count = len(self)
+        if not text or not count:
+            return -1
+        if columns is None:  # по всем столбцам - просмотр строк порциями до первого совпадения
+            for low, high in ((start, count), (0, min(start, count))):
+                for first in range(low, high, 1000):
+                    for k, row in enumerate(self[first:min(first + 1000, high)]):
+                        if any(v is not None and text in str(v).lower() for v in row):
+                            return first + k
+            return -1
+        mask = bytearray(len(self.result))
+        for j in columns:
+            for i in self.matches(j, text):
+                mask[i] = 1
+        for position in itertools.chain(range(start, count), range(0, min(start, count))):
+            if mask[self.index(position)]:
+                return position
+        return -1
+
+
+sql_tokens = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|\[[^\]]*\]|--[^\n]*|/\*.*?\*/|\s+|[^'\"\[\s/-]+|.", re.S)
+
+
+def normalizeSQL(sql: str) -> str:
+    # нормализация текста запроса для ключа кэша: без комментариев, лишних пробелов и регистра вне кавычек
+    parts = []
+    for token in sql_tokens.findall(sql):
+        if token[0] in "'\"[":
+            parts.append(token)
+        elif token.isspace() or token.startswith("--") or token.startswith("/*"):
+            parts.append(" ")
+        else:
+            parts.append(token.lower())
+    return re.sub(r" +", " ", "".join(parts)).strip().rstrip(";").strip()
+
+
+def trimSQL(sql: str) -> str:
+    # текст запроса без завершающих комментариев, пробелов и ";" (запрос дополняется условиями или становится подзапросом)
+    tokens = sql_tokens.findall(sql)
+    while tokens:
+        last = tokens[-1]
+        if last.isspace() or last.startswith(("--", "/*")):
+            tokens.pop()
+        elif last.endswith(";") and last[0] not in "'\"[":
+            tokens[-1] = last.rstrip(";")
+            if not tokens[-1]:
+                tokens.pop()
+        else:
+            break
+    return "".join(tokens).strip()
+
+
+def hasOrderBy(sql: str) -> bool:
+    # ORDER BY самого запроса: вне кавычек, комментариев и скобок (подзапросов, OVER (ORDER BY ...))
+    depth, previous = 0, None
+    for token in sql_tokens.findall(sql):
+        if token[0] in "'\"[" or token.isspace() or token.startswith(("--", "/*")):
+            continue
+        for word in re.findall(r"[()]|\w+", token.lower()):
+            if word == "(":
+                depth += 1
+            elif word == ")":
+                depth -= 1
+            elif depth == 0:
+                if previous == "order" and word == "by":
+                    return True
+                previous = word
+                continue
+            previous = None
+    return False
+
+
+def isSelect(sql: str) -> bool:
+    return normalizeSQL(sql).startswith(("select ", "select*", "with "))
+
+
+class ResultCache:
+    """Класс кэша результатов SELECT-запросов (вытеснение по LRU в пределах объема и по времени жизни)!"""
+
+    def __init__(self, max_bytes: int = result_cache_size, ttl: float = result_cache_ttl) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # ключ -> [результат, время создания, размер]
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def key(self, driver, config: str, sql: str, params=()) -> tuple:
+        # драйвер в ключе, как у пула соединений: одна строка соединения у разных драйверов - разные базы
+        name = driver if driver is None or isinstance(driver, str) else driver.__name__
+        return name, config, normalizeSQL(sql), tuple(params)
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry[1]
+            if age > self.ttl:  # устаревшая запись
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[0], age
+
+    def put(self, key: tuple, result: ResultSet) -> None:
+        if result.spilled():  # результат, не поместившийся в память, не кэшируется
+            return
+        size = result.nbytes()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            while self.entries and self.size + size > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+            self.entries[key] = [result, time.time(), size]
+            self.size += size
+
+    def remove(self, key: tuple) -> None:
+        self.size -= self.entries.pop(key)[2]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+result_cache = ResultCache()
+
+
+tsv_clean = str.maketrans("\t\r\n", "   ")  # табуляция и переводы строк внутри значений
+
+
+def tsvText(rows, headers: list = None, columns: list = None, chunk_size: int = clipboard_chunk_rows) -> str:
+    # строки в текст с табуляцией для буфера обмена (вставка в Excel): одно объединение на порцию строк
+    def cell(v):
+        return "" if v is None else (v if type(v) is str else str(v)).translate(tsv_clean)
+
+    chunks = []
+    if headers:
+        chunks.append("\t".join(cell(headers[j]) for j in columns) if columns is not None else "\t".join(map(cell, headers)))
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        if columns is not None:
+            chunk = [[row[j] for j in columns] for row in chunk]
+        chunks.append("\n".join(["\t".join([cell(v) for v in row]) for row in chunk]))
+    return "\n".join(chunks) + "\n" if chunks else ""
+
+
+def sqlDialect(driver) -> str:
+    # диалект SQL по модулю драйвера БД
+    name = driver.__name__
+    if name == "sqlite3":
+        return "sqlite"
+    if name in ("cx_Oracle", "oracledb"):
+        return "oracle"
+    return "mssql"
+
+
+class PagedQuery:
+    """Класс постраничного просмотра SELECT-запроса: страницы запрашиваются у сервера по мере прокрутки!"""
+
+    placeholder = "..."  # значение ячейки еще не загруженной страницы
+
+    def __init__(self, sql: str, config: str, driver=None, notify=None, key: str = None,
+                 page_size: int = page_size, cache_pages: int = page_cache_pages) -> None:
+        self.sql = trimSQL(sql)
+        self.configuration = config
+        self.driver = driver
+        self.notify = notify  # функция notify(kind, payload), вызывается из фонового потока
+        self.key = key  # уникальный столбец без NULL для выборки по ключу (keyset), без него - по OFFSET
+        self.page_size = max(1, page_size)
+        self.cache_pages = max(2, cache_pages)
+        self.headers = []
+        self.pages = OrderedDict()  # номер страницы -> строки, вытеснение по LRU
+        self.keys = {}  # номер страницы -> ключ последней строки (начало следующей страницы)
+        self.loading = set()
+        self.last_page = -1  # последняя загруженная страница
+        self.count = None  # количество строк по COUNT(*)
+        self.end = None  # количество строк, если получена последняя страница
+        self.size = 0  # количество строк в таблице GUI (меняется только в потоке GUI)
+        self.lock = threading.Lock()
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(max_workers=3)  # COUNT(*), запрошенная страница и упреждающая загрузка
+        self.closed = False
+        self.running = set()  # выполняемые запросы (соединение, курсор), прерываются при закрытии просмотра
+        self.timer = QueryTimer(sql, "page")
+
+    def start(self) -> None:
+        self.executor.submit(self.countRows)
+        self.request(0)
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            self.pages.clear()
+            running = list(self.running)
+        self.executor.shutdown(wait=False)
+        for conn, cursor in running:  # COUNT(*) и загрузка страниц не занимают соединения пула после закрытия
+            interruptQuery(conn, cursor)
+
+    def track(self, conn, cursor, active: bool) -> None:
+        with self.lock:
+            if not active:
+                self.running.discard((conn, cursor))
+            elif self.closed:
+                raise DatabaseError("Постраничный просмотр закрыт")
+            else:
+                self.running.add((conn, cursor))
+
+    def keyIndex(self):
+        name = (self.key or "").split(".")[-1].strip('"[]`').upper()
+        return self.headers.index(name) if name and name in self.headers else None
+
+    def pageSQL(self, driver, index: int) -> tuple:
+        # запрос страницы: LIMIT/OFFSET для SQLite, OFFSET ... FETCH для MS SQL Server и Oracle 12c+,
+        # по ключу - условие key > последнего ключа предыдущей страницы вместо OFFSET
+        dialect = sqlDialect(driver)
+        offset, params = index * self.page_size, []
+        if self.key:
+            sql = "SELECT * FROM (" + self.sql + ") q"
+            if index and (index - 1) in self.keys:
+                sql += " WHERE " + self.key + " > " + paramMarker(driver, 1)
+                offset, params = 0, [self.keys[index - 1]]
+            sql += " ORDER BY " + self.key
+        else:
+            sql = self.sql
+            if dialect == "mssql" and not hasOrderBy(sql):  # OFFSET требует ORDER BY
+                sql += " ORDER BY (SELECT NULL)"
+        if dialect == "sqlite":
+            sql += " LIMIT " + str(self.page_size) + " OFFSET " + str(offset)
+        else:
+            sql += " OFFSET " + str(offset) + " ROWS FETCH NEXT " + str(self.page_size) + " ROWS ONLY"
+        return sql, params
+
+    def request(self, index: int) -> None:
+        with self.lock:
+            if self.closed or index < 0 or index in self.pages or index in self.loading:
+                return
+            if self.end is not None and index * self.page_size >= self.end:
+                return
+            self.loading.add(index)
+        self.executor.submit(self.load, index)
+
+    def load(self, index: int) -> None:
+        try:
+            driver = getDriver(self.driver)
+            sql, params = self.pageSQL(driver, index)
+            db = UseDatabase(self.configuration, driver)
+            with db as cursor:
+                if hasattr(cursor[0], "prefetchrows"):  # страница целиком за одно обращение к серверу (cx_Oracle)
+                    cursor[0].prefetchrows = self.page_size + 1
+                cursor[0].arraysize = self.page_size
+                self.track(db.conn, cursor[0], True)
+                try:
+                    time1 = time.perf_counter()
+                    if params:
+                        cursor[0].execute(sql, params)
+                    else:
+                        cursor[0].execute(sql)
+                    headers = [desc[0].upper() for desc in cursor[0].description]
+                    rows = cursor[0].fetchall()
+                    elapsed = time.perf_counter() - time1
+                finally:
+                    self.track(db.conn, cursor[0], False)
+        except DatabaseError as err:
+            with self.lock:
+                self.loading.discard(index)
+                closed = self.closed
+            if not closed:
+                self.notify("error", str(err))
+            return
+
+        with self.lock:
+            self.loading.discard(index)
+            if self.closed:
+                return
+            self.headers = headers
+            self.pages[index] = rows
+            while len(self.pages) > self.cache_pages:  # в памяти остаются последние использованные страницы
+                self.pages.popitem(last=False)
+            self.last_page = max(self.last_page, index)
+            key_index = self.keyIndex()
+            if key_index is not None and len(rows) == self.page_size:
+                self.keys[index] = rows[-1][key_index]
+            if len(rows) < self.page_size:
+                self.end = index * self.page_size + len(rows)
+        self.timer.add("connect", db.connect_time)
+        self.timer.add("fetch", elapsed)
+        self.timer.mark("first_row")
+        self.timer.addRows(rows)
+        self.timer.round_trips += 1
+        self.notify("page", index)
+
+    def countRows(self) -> None:
+        try:
+            db = UseDatabase(self.configuration, getDriver(self.driver))
+            with db as cursor:
+                self.track(db.conn, cursor[0], True)
+                try:
+                    cursor[0].execute("SELECT COUNT(*) FROM (" + self.sql + ") q")
+                    count = cursor[0].fetchone()[0]
+                finally:
+                    self.track(db.conn, cursor[0], False)
+        except DatabaseError:  # количество строк определяется по мере загрузки страниц
+            return
+        with self.lock:
+            if self.closed:
+                return
+            self.count = count
+        self.notify("count", count)
+
+    def available(self) -> int:
+        # количество строк для таблицы: по COUNT(*), по последней странице или на страницу больше загруженных
+        with self.lock:
+            if self.count is not None and self.end is not None:
+                return min(self.count, self.end)
+            if self.count is not None:
+                return self.count
+            if self.end is not None:
+                return self.end
+            return (self.last_page + 2) * self.page_size if self.last_page >= 0 else 0
+
+    def resize(self, size: int) -> None:
+        self.size = size
+
+    def update(self) -> int:
+        self.size = self.available()
+        return self.size
+
+    def row(self, i: int) -> tuple:
+        index = i // self.page_size
+        with self.lock:
+            rows = self.pages.get(index)
+            if rows is not None:
+                self.pages.move_to_end(index)
+        if rows is None:
+            self.request(index)
+        self.request(index + 1)  # упреждающая загрузка следующей страницы
+        i -= index * self.page_size
+        if rows is None or i >= len(rows):
+            return (self.placeholder,) * len(self.headers)
+        return rows[i]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.row(index)
+
+    def value(self, i: int, j: int):
+        return self.row(i)[j]
+
+    def rows(self, start: int = 0, stop: int = None) -> list:
+        return self[start:stop]
+
+    def column(self, j: int, start: int = 0, stop: int = None) -> list:
+        return [row[j] for row in self[start:stop]]
+
+    def loaded(self) -> int:
+        return len(self.pages)
+
+    def loadedRows(self, indexes) -> list:
+        # строки с номерами indexes из загруженных страниц, без запросов к серверу (копирование выделенных строк)
+        rows = []
+        with self.lock:
+            for i in indexes:
+                page = self.pages.get(i // self.page_size)
+                if page is not None and i % self.page_size < len(page):
+                    rows.append(page[i % self.page_size])
+        return rows
+
+    def nbytes(self) -> int:
+        with self.lock:
+            return sum(sum(sys.getsizeof(v) for v in rows[0]) * len(rows) for rows in self.pages.values() if rows)
+
+    def spilled(self) -> int:
+        return 0
+
+
+
+def splitScript(text: str) -> list:
+    # SQL-запросы скрипта разделяются строкой из одного символа "/" (Oracle) или "GO" (MS SQL Server)
+    statements, lines = [], []
+    for line in text.splitlines():
+        if line.strip().upper() in ("/", "GO"):
+            statements.append("\n".join(lines))
+            lines = []
+        else:
+            lines.append(line)
+    statements.append("\n".join(lines))
+    return [sql for sql in statements if sql.strip()]
+
+
+def runScript(path: str, args, lock: threading.Lock) -> bool:
+    # запросы одного файла выполняются последовательно, каждый результат выгружается в свой CSV-файл
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with open(path, "r", encoding=args.encoding) as f:
+            statements = splitScript(f.read())
+    except (OSError, UnicodeError) as err:
+        with lock:
+            print(path + ": " + str(err), file=sys.stderr)
+        return False
+
+    ok = True
+    for number, sql in enumerate(statements, 1):
+        filename = os.path.join(args.out_dir, name + ("_" + str(number) if len(statements) > 1 else "") + ".csv")
+        options = dict(separator=args.separator, text_codec=args.encoding, compression=args.compress or "", processes=args.processes)
+        messages = []
+        notify = lambda kind, payload: messages.append((kind, payload))
+        if args.partition_column:  # параллельная выгрузка по диапазонам ключа
+            job = ParallelExportJob(sql, args.uri, filename, args.partition_column, args.driver, notify, degree=args.degree,
+                                    ordered=args.ordered, method=args.method, **options)
+        else:
+            job = ExportJob(sql, args.uri, filename, args.driver, notify, **options)
+        job.run()
+        kind, payload = messages[-1]
+        if kind == "finished":
+            status = "ok"
+            text = (job.filename + ", строк: " + str(job.rows_fetched) + ", " + str(round(job.size / 1048576, 1)) + " MB"
+                    if payload[0] else "выполнено")
+        else:
+            status, ok = "error", False
+            text = "ошибка: " + payload
+        job.timer.save(status)
+        with lock:
+            print(path + " [" + str(number) + "]: " + text + " (" + job.timer.summary() + ")",
+                  file=sys.stdout if status == "ok" else sys.stderr)
+    return ok
+
+
+def runImport(args) -> int:
+    types = dict(item.split("=", 1) for item in args.type)  # формат и типы проверены в main
+    job = ImportJob(args.file, args.table, args.uri, args.driver, lambda kind, payload: messages.append((kind, payload)),
+                    types=types, batch_size=args.batch, commit_rows=args.commit, separator=args.separator, text_codec=args.encoding)
+    messages = []
+    progress = threading.Thread(target=job.run)
+    progress.start()
+    while progress.is_alive():  # прогресс загрузки
+        progress.join(1)
+        print("\rстрок: " + str(job.rows_fetched) + ", отклонено: " + str(job.rows_rejected), end="", file=sys.stderr)
+    print(file=sys.stderr)
+    kind, payload = messages[-1] if messages else ("error", "загрузка прервана без сообщения")
+    job.timer.save("ok" if kind == "finished" else "error")
+    if kind != "finished":
+        print(args.file + ": ошибка: " + payload, file=sys.stderr)
+        return 1
+    print(args.file + " -> " + args.table + ", строк: " + str(job.rows_fetched) + ", отклонено: " + str(job.rows_rejected) +
+          (" (" + job.reject_file + ")" if job.rows_rejected else "") + " (" + job.timer.summary() + ")")
+    return 0
+
+
+def main(argv: list = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="sql_core", description="SQL tools без GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="выполнить SQL-файлы и выгрузить результаты в CSV")
+    run.add_argument("files", nargs="+", help="файлы с SQL-запросами")
+    run.add_argument("--uri", default=DATABASE_URI, help="строка соединения с БД")
+    run.add_argument("--driver", default=DATABASE_DRIVER, help="модуль драйвера БД (cx_Oracle, pyodbc, sqlite3)")
+    run.add_argument("--jobs", type=int, default=pool_max_size, help="количество файлов, выполняемых одновременно")
+    run.add_argument("--out-dir", default=dirname, help="папка для CSV-файлов")
+    run.add_argument("--separator", default=separator, help="разделитель полей CSV")
+    run.add_argument("--encoding", default=text_codec, help="кодировка SQL- и CSV-файлов")
+    run.add_argument("--partition-column", help="столбец разбиения для параллельной выгрузки по диапазонам (число или дата)")
+    run.add_argument("--degree", type=int, default=parallel_degree, help="количество диапазонов (соединений) на запрос")
+    run.add_argument("--method", choices=("minmax", "ntile"), default="minmax", help="границы диапазонов: по MIN/MAX или NTILE")
+    run.add_argument("--ordered", action="store_true", help="упорядочить строки в файле по столбцу разбиения")
+    run.add_argument("--arraysize", type=int, help="постоянный размер порции выборки (без подбора)")
+    run.add_argument("--compress", choices=("gzip", "zstd"), default=export_compression or None, help="сжатие CSV-файлов")
+    run.add_argument("--processes", type=int, default=export_processes, help="процессов для кодирования и сжатия CSV")
+    load = commands.add_parser("import", help="загрузить CSV-файл в таблицу")
+    load.add_argument("file", help="CSV-файл со строкой заголовков (имена столбцов таблицы)")
+    load.add_argument("--table", required=True, help="таблица для загрузки")
+    load.add_argument("--uri", default=DATABASE_URI, help="строка соединения с БД")
+    load.add_argument("--driver", default=DATABASE_DRIVER, help="модуль драйвера БД (cx_Oracle, pyodbc, sqlite3)")
+    load.add_argument("--type", action="append", default=[], metavar="COLUMN=TYPE",
+                      help="тип столбца (int, float, date, str), по умолчанию определяется по первым строкам")
+    load.add_argument("--batch", type=int, default=import_batch_size, help="строк в одном executemany")
+    load.add_argument("--commit", type=int, default=import_commit_rows, help="строк между фиксациями транзакции")
+    load.add_argument("--separator", default=separator, help="разделитель полей CSV")
+    load.add_argument("--encoding", default=text_codec, help="кодировка CSV-файла")
+    args = parser.parse_args(argv)
+
+    try:
+        args.driver = getDriver(args.driver)
+    except DatabaseError as err:
+        print(err, file=sys.stderr)
+        return 1
+    for item in getattr(args, "type", []):
+        if item.partition("=")[2] not in ImportJob.converters:
+            parser.error("--type " + item + ": ожидается COLUMN=TYPE, TYPE - " + ", ".join(ImportJob.converters))
+    if getattr(args, "arraysize", None):
+        connection_profiles.setdefault(args.uri, {})["arraysize"] = args.arraysize
+    if args.command == "import":
+        try:
+            return runImport(args)
+        finally:
+            closePools()
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = max(1, args.jobs)
+    getPool(args.uri, args.driver).max_size = max(jobs * (max(1, args.degree) if args.partition_column else 1), pool_max_size)
+
+    from concurrent.futures import ThreadPoolExecutor
+    lock = threading.Lock()
+    time1 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(lambda path: runScript(path, args, lock), args.files))
+    finally:
+        closePools()
+    print("Всего: " + str(round(time.perf_counter() - time1, 3)) + " сек, файлов: " + str(len(results)) +
+          ", с ошибками: " + str(results.count(False)))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # процессы кодирования CSV в собранном PyInstaller приложении
+    sys.exit(main())
@@ -1,234 +1,937 @@
-#!python3
-# -*- coding: utf-8 -*-
-
-import sys, os, csv, time
-
-# Returns path containing content - either locally or in pyinstaller tmp file
-def resourcePath():
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS)
-    return os.path.abspath(os.path.dirname(__file__))
-
-# Строка соединения с БД
-database_URI = 'DRIVER={SQL Server};SERVER=tcp:IP,port;database=db_name;UID=user;PWD=password'  # MS SQL Server
-# 'user/password@IP:port/db_name'  # Oracle
-# 'filename.sqlite'  # SQLite
-
-# Переменные окружения (при необходимости)
-#os.environ["NLS_LANG"] = "RUSSIAN_CIS.CL8MSWIN1251"
-
-# Путь для сохранения CSV
-dirname = os.path.expanduser("~\Desktop")  # ссылка на рабочий стол
-
-# Имя файла CSV
-filename = os.path.join(dirname, "export.csv")
-
-# Разделитель строк в файле CSV
-end_line = '\n'
-
-# Разделитель полей в файле CSV
-separator = ';'
-
-# Кодировка текста
-text_codec = 'cp1251'
-
-# Функция прерывания программы в случае критической ошибки
-def exitError(err):
-    print('ERROR:', str(err))
-    return sys.exit(0)
-
-# Импорт модуля GUI
-try:
-    from PySide6 import QtCore, QtWidgets, QtGui
-except Exception as e:
-    exitError(e)
-
-# для тестирования GUI без модуля драйвера базы данных
-try:
-    import pyodbc as DB  # cx_Oracle, sqlite3
-    INFO_TEXT = "Строка статуса"
-except Exception as e:
-    INFO_TEXT = str(e)
-    DB = None
-
-
-class databaseError(Exception):
-    '''Пользовательский класс исключения для базы данных!'''
-    pass
-
-
-class Usedatabase:
-    '''Класс диспетчера контекста для соединения с базой данных!'''
-
-    def __init__(self, config: str) -> None:
-        self.configuration = config
-
-    def __enter__(self) -> 'cursor':
-        try:
-            self.conn = DB.connect(self.configuration)  # соединение с базой данных
-            self.cursor1 = self.conn.cursor()
-            self.cursor2 = self.conn.cursor()
-            return self.cursor1, self.cursor2  # возвращаем два курсора (для ситуации когда курсор исп-ся в самом запросе)
-        except Exception as err:
-            raise databaseError(err)
-
-    def __exit__(self, exc_type, exc_value, exc_trace) -> None:
-        self.conn.commit()
-        self.cursor1.close()
-        self.cursor2.close()
-        self.conn.close()
-        if exc_type:
-            raise databaseError(exc_value)  # если ошибка в SQL-запросе
-
-
-# GUI
-class SQLWidget(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
-        
-        self.setWindowIcon(QtGui.QIcon(os.path.join(resourcePath(), 'pyinstaller.ico')))
-        
-        self.trans = QtCore.QTranslator(self)
-        self.trans.load('qt_' + QtCore.QLocale.system().name(), QtCore.QLibraryInfo.location(QtCore.QLibraryInfo.TranslationsPath))
-        QtWidgets.QApplication.instance().installTranslator(self.trans)
-        
-        self.data = None  # Результат SQL-запроса
-        self.headers = None  # Заголовки столбцов
-        
-        self.gboxSQL = QtWidgets.QGroupBox("SQL-запрос | :cr для курсора")
-        self.gboxSQL.setStyleSheet('QGroupBox {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
-        
-        self.textSQL = QtWidgets.QTextEdit("select count(*) from sys.dm_exec_connections \n --select * from block")
-        self.textSQL.setStyleSheet('QTextEdit {color: "#1565c0"; font-family: "Consolas", "Courier New", monospace; font-size: 16px;}')
-        
-        self.buttonSQL = QtWidgets.QPushButton('Выполнить запрос')
-        self.buttonSQL.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
-        
-        self.vboxSQL = QtWidgets.QVBoxLayout()
-        self.vboxSQL.addWidget(self.textSQL)
-        self.vboxSQL.addWidget(self.buttonSQL)
-        self.gboxSQL.setLayout(self.vboxSQL)
-        
-        self.gboxCSV = QtWidgets.QGroupBox("Данные результата запроса")
-        self.gboxCSV.setStyleSheet('QGroupBox {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
-        
-        self.tableCSV = QtWidgets.QTableWidget()
-        self.tableCSV.setStyleSheet('QTableWidget {color: "#333333"; font-family: "Consolas", "Courier New", monospace; font-size: 16px;}')
-        
-        self.buttonCSV = QtWidgets.QPushButton('Экспортировать данные')
-        self.buttonCSV.setEnabled(False)
-        self.buttonCSV.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
-        
-        self.vboxCSV = QtWidgets.QVBoxLayout()
-        self.vboxCSV.addWidget(self.tableCSV)
-        self.vboxCSV.addWidget(self.buttonCSV)
-        self.gboxCSV.setLayout(self.vboxCSV)
-        
-        self.statusLabel = QtWidgets.QLabel(INFO_TEXT)
-        self.statusLabel.setWordWrap(True)
-        self.statusLabel.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
-        self.statusLabel.setStyleSheet('QLabel {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
-        self.statusLabel.setAlignment(QtCore.Qt.AlignRight)
-        
-        self.splitter =  QtWidgets.QSplitter()
-        self.splitter.addWidget(self.gboxSQL)
-        self.splitter.addWidget(self.gboxCSV)
-        self.splitter.setOrientation(QtCore.Qt.Vertical)
-        self.splitter.setHandleWidth(5)
-        
-        self.layout = QtWidgets.QVBoxLayout()
-        self.layout.addWidget(self.splitter)
-        self.layout.addWidget(self.statusLabel)
-        self.layout.insertSpacing(1, 5)
-        self.setLayout(self.layout)
-        
-        self.buttonSQL.clicked.connect(self.execSQL)
-        self.buttonCSV.clicked.connect(self.exportCSV)
-    
-    
-    def execSQL(self):
-        self.setCursor(QtCore.Qt.WaitCursor)
-        self.tableCSV.clear()
-        
-        _SQL = self.textSQL.toPlainText()
-        
-        self.data = None  # Результат SQL-запроса
-        self.headers = None  # Заголовки столбцов
-        self.buttonCSV.setEnabled(False)
-        
-        is_cursor = True if ':cr' in _SQL else False  # Признак курсора в SQL-запросе
-        is_query = True  # Признак выборки
-        
-        time1 = time.time()  # время начала запроса
-        
-        try:  # Запрос к БД
-            with Usedatabase(database_URI) as cursor:
-                if is_cursor:  # SQL-запрос с курсором
-                    cursor[0].execute(_SQL, cr=cursor[1])
-                    try:
-                        self.data = cursor[1].fetchall()
-                        self.headers = [ desc[0].upper() for desc in cursor[1].description ]
-                    except:
-                        is_query = False
-                else:  # Чистый SQL-запрос
-                    cursor[0].execute(_SQL)
-                    try:
-                        self.data = cursor[0].fetchall()
-                        self.headers = [ desc[0].upper() for desc in cursor[0].description ]
-                    except:
-                        is_query = False
-        except databaseError as err:
-            self.statusLabel.setText(str(err))
-        else:
-            time2 = time.time()  # время окончания запроса
-            delta_time = str(round(time2 - time1, 3))  # время запроса (округление до трех знаков после запятой)
-            self.statusLabel.setText('Успешно  ( time = ' + delta_time + ' )')  # для SQL-запроса не на выборку (вставка, изменение, удаление)
-            
-            # Вывод результата SQL-запроса
-            if is_query:
-                if self.headers:
-                    self.tableCSV.setColumnCount(len(self.headers))
-                    self.tableCSV.setHorizontalHeaderLabels(self.headers)
-                    self.statusLabel.setText('Данных по запросу нет  ( time = ' + delta_time + ' )')
-                if self.data:
-                    self.tableCSV.setRowCount(len(self.data))
-                    for index_row, row in enumerate(self.data):
-                        for index_field, field in enumerate(row):
-                            self.tableCSV.setItem(index_row, index_field, QtWidgets.QTableWidgetItem(str(field)))
-                    self.statusLabel.setText('Успешно  ( time = ' + delta_time + ' )')
-                    self.buttonCSV.setEnabled(True)
-                
-                self.tableCSV.resizeColumnsToContents()
-        
-        self.setCursor(QtCore.Qt.ArrowCursor)
-    
-    
-    def exportCSV(self):
-        self.setCursor(QtCore.Qt.WaitCursor)
-        
-        # Экспорт в CSV-файл
-        if self.data or self.headers:
-            try:  # Запись CSV-файла
-                with open(filename, 'w', encoding=text_codec) as f:
-                    w = csv.writer(f, delimiter=separator, lineterminator=end_line)
-                    if self.headers:
-                        w.writerows([self.headers])  # для правильного отображения заголовков в одну строку CSV файла
-                    if self.data:
-                        w.writerows(self.data)
-                    self.statusLabel.setText("Успешно ( " + filename + " )")
-            except Exception as err:
-                self.statusLabel.setText(str(err))
-        elif not self.data:
-            self.statusLabel.setText('Нет данных для экспорта')
-        
-        self.setCursor(QtCore.Qt.ArrowCursor)
-
-
-# Выполнение программы
-if __name__ == '__main__':
-    app = QtWidgets.QApplication([])
-    widget = SQLWidget()
-    widget.setWindowTitle('SQL tools')
-    widget.resize(900, 600)
-    widget.show()
-    sys.exit(app.exec_())
+#!python3
+# -*- coding: utf-8 -*-
+
+import sys, os, time
+startup_time = time.perf_counter()  # начало запуска (отчет --startup-report)
+from sql_core import StartupTimer, loadModules, Session, QueryTimer, QueryJob, ExportJob, ParallelExportJob, ImportJob, ResultSet, ResultView, PagedQuery, isSelect, tsvText, result_cache, closePools, parallel_degree, clipboard_warn_rows, ChunkWriter, compressedName, export_compression
+
+# Returns path containing content - either locally or in pyinstaller tmp file
+def resourcePath():
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS)
+    return os.path.abspath(os.path.dirname(__file__))
+
+# Строка соединения с БД
+database_URI = 'DRIVER={SQL Server};SERVER=tcp:IP,port;database=db_name;UID=user;PWD=password'  # MS SQL Server
+# 'user/password@IP:port/db_name'  # Oracle
+# 'filename.sqlite'  # SQLite
+
+# Переменные окружения (при необходимости)
+#os.environ["NLS_LANG"] = "RUSSIAN_CIS.CL8MSWIN1251"
+
+# Путь для сохранения CSV
+dirname = os.path.expanduser("~\Desktop")  # ссылка на рабочий стол
+
+# Имя файла CSV
+filename = os.path.join(dirname, "export.csv")
+
+# Разделитель строк в файле CSV
+end_line = '\n'
+
+# Разделитель полей в файле CSV
+separator = ';'
+
+# Кодировка текста
+text_codec = 'cp1251'
+
+# Ограничение количества загружаемых строк (остальные по запросу), 0 - без ограничения
+row_limit = 10000
+
+# Кэш результатов SELECT-запросов: включен ли по умолчанию (объем и время жизни записи задаются в sql_core.py)
+result_cache_enabled = False
+
+# Количество строк для расчета ширины столбцов таблицы
+sample_rows = 100
+
+# Максимальная ширина столбца таблицы (в пикселях)
+max_column_width = 400
+
+# Функция прерывания программы в случае критической ошибки
+def exitError(err):
+    print('ERROR:', str(err))
+    return sys.exit(0)
+
+# Импорт модуля GUI
+try:
+    from PySide6 import QtCore, QtWidgets, QtGui
+except Exception as e:
+    exitError(e)
+
+# Модуль драйвера базы данных (cx_Oracle, sqlite3) загружается в фоновом потоке после отрисовки окна
+DB = 'pyodbc'
+INFO_TEXT = "Строка статуса"  # ошибка загрузки драйвера (для тестирования GUI без модуля драйвера базы данных)
+
+
+class QueryRunnerSignals(QtCore.QObject):
+    '''Сигналы фонового выполнения SQL-запроса!'''
+    message = QtCore.Signal(str, object)
+
+
+class QueryRunner(QtCore.QRunnable):
+    '''Обертка QueryJob для запуска в QThreadPool!'''
+
+    def __init__(self, job: QueryJob) -> None:
+        super().__init__()
+        self.job = job
+        self.signals = QueryRunnerSignals()
+        self.job.notify = self.signals.message.emit  # сигнал передается в поток GUI через очередь событий
+
+    def run(self) -> None:
+        self.job.run()
+
+
+class ResultModel(QtCore.QAbstractTableModel):
+    '''Модель результата SQL-запроса (значения форматируются только для видимых ячеек)!'''
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.headers = []  # Заголовки столбцов
+        self.rows = ResultSet()  # Строки результата, хранящиеся по столбцам
+        self.view = ResultView(self.rows)  # Порядок вывода строк (сортировка и фильтр)
+
+    def setHeaders(self, headers: list) -> None:
+        self.beginResetModel()
+        self.rows.close()  # удаление файла подкачки предыдущего результата
+        self.headers = list(headers)
+        self.rows = ResultSet(self.headers)
+        self.view = ResultView(self.rows)
+        self.endResetModel()
+
+    def setResult(self, result: ResultSet) -> None:
+        self.beginResetModel()
+        self.rows.close()
+        self.headers = list(result.headers)
+        self.rows = result
+        self.view = ResultView(self.rows)
+        self.endResetModel()
+
+    def sortBy(self, column, descending: bool = False) -> None:
+        self.beginResetModel()
+        self.view.sort(column, descending)
+        self.endResetModel()
+
+    def filterBy(self, column: int, condition: str) -> None:
+        self.beginResetModel()
+        self.view.filter(column, condition)
+        self.endResetModel()
+        self.headerDataChanged.emit(QtCore.Qt.Horizontal, column, column)
+
+    def resetView(self) -> None:
+        self.beginResetModel()
+        self.view.reset()
+        self.endResetModel()
+
+    def appendRows(self, rows: list) -> None:
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def updateRows(self) -> None:
+        # постраничный результат: количество строк меняется по мере загрузки страниц и подсчета COUNT(*)
+        old, new = len(self.rows), self.rows.available()
+        if new > old:
+            self.beginInsertRows(QtCore.QModelIndex(), old, new - 1)
+            self.rows.resize(new)
+            self.endInsertRows()
+        elif new < old:
+            self.beginRemoveRows(QtCore.QModelIndex(), new, old - 1)
+            self.rows.resize(new)
+            self.endRemoveRows()
+        if new and self.headers:  # перерисовка видимых ячеек загруженной страницы
+            self.dataChanged.emit(self.index(0, 0), self.index(new - 1, len(self.headers) - 1))
+
+    def clear(self) -> None:
+        self.setHeaders([])
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.view)
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and index.isValid():
+            return str(self.view.value(index.row(), index.column()))
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole:
+            if orientation == QtCore.Qt.Horizontal:
+                if section >= len(self.headers):
+                    return None
+                return self.headers[section] + (' *' if section in self.view.filters else '')  # отмечены столбцы с фильтром
+            return str(self.view.index(section) + 1)  # номер строки в результате запроса
+        return None
+
+
+def memoryText(size):
+    return str(round(size / 1048576, 1)) + ' MB'
+
+
+# GUI
+class SQLTab(QtWidgets.QWidget):
+    '''Вкладка рабочей области: свой редактор, результат и сеанс базы данных!'''
+    
+    def __init__(self, title):
+        super().__init__()
+        
+        self.title = title  # Название вкладки
+        self.data = None  # Результат SQL-запроса
+        self.headers = None  # Заголовки столбцов
+        
+        self.session = Session()  # Соединение вкладки (сохраняет состояние сеанса между запросами)
+        self.job = None  # Выполняемый SQL-запрос
+        self.runner = None
+        self.paged = None  # Постраничный просмотр результата
+        self.pagedSignals = None
+        self.time_start = 0  # время начала запроса
+        self.timer = QtCore.QTimer(self)  # обновление строки статуса во время выполнения запроса
+        self.timer.setInterval(200)
+        
+        self.gboxSQL = QtWidgets.QGroupBox("SQL-запрос | :cr для курсора")
+        self.gboxSQL.setStyleSheet('QGroupBox {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
+        
+        self.textSQL = QtWidgets.QTextEdit("select count(*) from sys.dm_exec_connections \n --select * from block")
+        self.textSQL.setStyleSheet('QTextEdit {color: "#1565c0"; font-family: "Consolas", "Courier New", monospace; font-size: 16px;}')
+        
+        self.buttonSQL = QtWidgets.QPushButton('Выполнить запрос')
+        self.buttonSQL.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonExplain = QtWidgets.QPushButton('План / Профиль')
+        self.buttonExplain.setToolTip('Выполнить запрос с планом выполнения и статистикой сервера (сохраняются в журнале замеров)')
+        self.buttonExplain.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonCancel = QtWidgets.QPushButton('Отменить')
+        self.buttonCancel.setEnabled(False)
+        self.buttonCancel.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonDirect = QtWidgets.QPushButton('Выгрузить в CSV напрямую')
+        self.buttonDirect.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.checkCache = QtWidgets.QCheckBox('Кэш')
+        self.checkCache.setChecked(result_cache_enabled)
+        self.checkCache.setToolTip('Повторные SELECT-запросы берутся из кэша результатов')
+        self.checkCache.setStyleSheet('QCheckBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.checkProfile = QtWidgets.QCheckBox('Профиль')
+        self.checkProfile.setToolTip('Следующий запуск выполняется с cProfile и tracemalloc')
+        self.checkProfile.setStyleSheet('QCheckBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.checkPaged = QtWidgets.QCheckBox('Постранично')
+        self.checkPaged.setToolTip('Страницы результата запрашиваются у сервера при прокрутке таблицы')
+        self.checkPaged.setStyleSheet('QCheckBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.editKey = QtWidgets.QLineEdit()
+        self.editKey.setPlaceholderText('ключ')
+        self.editKey.setToolTip('Уникальный столбец для постраничной выборки по ключу (без него - по OFFSET)')
+        self.editKey.setMaximumWidth(120)
+        self.editKey.setStyleSheet('QLineEdit {color: "#1565c0"; font-family: "Consolas", "Courier New", monospace; font-size: 14px;}')
+        
+        self.hboxSQL = QtWidgets.QHBoxLayout()
+        self.hboxSQL.addWidget(self.checkCache)
+        self.hboxSQL.addWidget(self.checkProfile)
+        self.hboxSQL.addWidget(self.checkPaged)
+        self.hboxSQL.addWidget(self.editKey)
+        self.hboxSQL.addWidget(self.buttonSQL, 1)
+        self.hboxSQL.addWidget(self.buttonExplain)
+        self.hboxSQL.addWidget(self.buttonDirect)
+        self.hboxSQL.addWidget(self.buttonCancel)
+        
+        self.labelPartition = QtWidgets.QLabel('Выгрузка по диапазонам столбца:')
+        self.labelPartition.setStyleSheet('QLabel {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.editPartition = QtWidgets.QLineEdit()
+        self.editPartition.setToolTip('Столбец (число или дата), по диапазонам которого запрос выгружается в нескольких соединениях')
+        self.editPartition.setStyleSheet('QLineEdit {color: "#1565c0"; font-family: "Consolas", "Courier New", monospace; font-size: 14px;}')
+        
+        self.spinDegree = QtWidgets.QSpinBox()
+        self.spinDegree.setRange(1, 32)
+        self.spinDegree.setValue(parallel_degree)
+        self.spinDegree.setSuffix(' соед.')
+        self.spinDegree.setStyleSheet('QSpinBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.checkOrdered = QtWidgets.QCheckBox('По порядку')
+        self.checkOrdered.setToolTip('Строки в файле упорядочены по столбцу разбиения')
+        self.checkOrdered.setStyleSheet('QCheckBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.comboCompress = QtWidgets.QComboBox()
+        for text, compression in (('CSV', ''), ('CSV.gz', 'gzip'), ('CSV.zst', 'zstd')):
+            self.comboCompress.addItem(text, compression)
+        self.comboCompress.setCurrentIndex(max(0, self.comboCompress.findData(export_compression)))
+        self.comboCompress.setToolTip('Сжатие файла выгрузки (порции кодируются и сжимаются в нескольких процессах)')
+        self.comboCompress.setStyleSheet('QComboBox {color: "#333333"; font-family: sans-serif; font-size: 14px;}')
+        
+        self.hboxDirect = QtWidgets.QHBoxLayout()
+        self.hboxDirect.addWidget(self.comboCompress)
+        self.hboxDirect.addStretch(1)
+        self.hboxDirect.addWidget(self.labelPartition)
+        self.hboxDirect.addWidget(self.editPartition)
+        self.hboxDirect.addWidget(self.spinDegree)
+        self.hboxDirect.addWidget(self.checkOrdered)
+        
+        self.vboxSQL = QtWidgets.QVBoxLayout()
+        self.vboxSQL.addWidget(self.textSQL)
+        self.vboxSQL.addLayout(self.hboxSQL)
+        self.vboxSQL.addLayout(self.hboxDirect)
+        self.gboxSQL.setLayout(self.vboxSQL)
+        
+        self.gboxCSV = QtWidgets.QGroupBox("Данные результата запроса")
+        self.gboxCSV.setStyleSheet('QGroupBox {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
+        
+        self.model = ResultModel(self)
+        self.tableCSV = QtWidgets.QTableView()
+        self.tableCSV.setModel(self.model)
+        self.tableCSV.setStyleSheet('QTableView {color: "#333333"; font-family: "Consolas", "Courier New", monospace; font-size: 16px;}')
+        self.tableCSV.ensurePolished()
+        self.tableCSV.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)  # высота строк не пересчитывается по содержимому
+        self.tableCSV.verticalHeader().setDefaultSectionSize(self.tableCSV.fontMetrics().height() + 6)
+        self.tableCSV.horizontalHeader().setSortIndicatorShown(False)
+        self.tableCSV.horizontalHeader().setSectionsClickable(True)
+        
+        self.actionCopy = QtGui.QAction('Копировать', self.tableCSV)
+        self.actionCopy.setShortcut(QtGui.QKeySequence.Copy)
+        self.actionCopy.setShortcutContext(QtCore.Qt.WidgetShortcut)
+        self.actionCopyHeaders = QtGui.QAction('Копировать с заголовками', self.tableCSV)
+        self.actionCopyHeaders.setShortcut(QtGui.QKeySequence('Ctrl+Shift+C'))
+        self.actionCopyHeaders.setShortcutContext(QtCore.Qt.WidgetShortcut)
+        self.tableCSV.addAction(self.actionCopy)
+        self.tableCSV.addAction(self.actionCopyHeaders)
+        self.tableCSV.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
+        self.tableCSV.horizontalHeader().setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.tableCSV.horizontalHeader().setToolTip('Щелчок - сортировка, правая кнопка - фильтр по столбцу')
+        
+        self.editFind = QtWidgets.QLineEdit()
+        self.editFind.setPlaceholderText('Поиск')
+        self.editFind.setToolTip('Поиск по мере ввода в текущем столбце (без выделенной ячейки - во всех), Enter - следующая строка')
+        self.editFind.setMaximumWidth(200)
+        self.editFind.setStyleSheet('QLineEdit {color: "#1565c0"; font-family: "Consolas", "Courier New", monospace; font-size: 14px;}')
+        
+        self.buttonCSV = QtWidgets.QPushButton('Экспортировать данные')
+        self.buttonCSV.setEnabled(False)
+        self.buttonCSV.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonMore = QtWidgets.QPushButton('Загрузить еще')
+        self.buttonMore.setEnabled(False)
+        self.buttonMore.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonAll = QtWidgets.QPushButton('Загрузить все')
+        self.buttonAll.setEnabled(False)
+        self.buttonAll.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.buttonImport = QtWidgets.QPushButton('Загрузить CSV в таблицу')
+        self.buttonImport.setStyleSheet('QPushButton {color: "#333333"; font-family: sans-serif; font-size: 14px; height: 25px;}')
+        
+        self.hboxCSV = QtWidgets.QHBoxLayout()
+        self.hboxCSV.addWidget(self.editFind)
+        self.hboxCSV.addWidget(self.buttonCSV, 1)
+        self.hboxCSV.addWidget(self.buttonMore)
+        self.hboxCSV.addWidget(self.buttonAll)
+        self.hboxCSV.addWidget(self.buttonImport)
+        
+        self.textPlan = QtWidgets.QPlainTextEdit()
+        self.textPlan.setReadOnly(True)
+        self.textPlan.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.textPlan.setStyleSheet('QPlainTextEdit {color: "#333333"; font-family: "Consolas", "Courier New", monospace; font-size: 14px;}')
+        self.textPlan.hide()  # панель плана показывается после запуска "План / Профиль"
+        
+        self.splitterCSV = QtWidgets.QSplitter()
+        self.splitterCSV.addWidget(self.tableCSV)
+        self.splitterCSV.addWidget(self.textPlan)
+        self.splitterCSV.setHandleWidth(5)
+        
+        self.vboxCSV = QtWidgets.QVBoxLayout()
+        self.vboxCSV.addWidget(self.splitterCSV)
+        self.vboxCSV.addLayout(self.hboxCSV)
+        self.gboxCSV.setLayout(self.vboxCSV)
+        
+        self.statusLabel = QtWidgets.QLabel(INFO_TEXT)
+        self.statusLabel.setWordWrap(True)
+        self.statusLabel.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+        self.statusLabel.setStyleSheet('QLabel {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
+        self.statusLabel.setAlignment(QtCore.Qt.AlignRight)
+        
+        self.splitter =  QtWidgets.QSplitter()
+        self.splitter.addWidget(self.gboxSQL)
+        self.splitter.addWidget(self.gboxCSV)
+        self.splitter.setOrientation(QtCore.Qt.Vertical)
+        self.splitter.setHandleWidth(5)
+        
+        self.layout = QtWidgets.QVBoxLayout()
+        self.layout.addWidget(self.splitter)
+        self.layout.addWidget(self.statusLabel)
+        self.layout.insertSpacing(1, 5)
+        self.setLayout(self.layout)
+        
+        self.buttonSQL.clicked.connect(lambda: self.execSQL())
+        self.buttonExplain.clicked.connect(lambda: self.execSQL(True))
+        self.buttonDirect.clicked.connect(self.exportDirect)
+        self.buttonCancel.clicked.connect(self.cancelSQL)
+        self.buttonMore.clicked.connect(self.fetchMore)
+        self.buttonAll.clicked.connect(self.fetchAll)
+        self.buttonCSV.clicked.connect(self.exportCSV)
+        self.buttonImport.clicked.connect(self.importCSV)
+        self.actionCopy.triggered.connect(lambda: self.copySelection(False))
+        self.actionCopyHeaders.triggered.connect(lambda: self.copySelection(True))
+        self.tableCSV.horizontalHeader().sectionClicked.connect(self.sortColumn)
+        self.tableCSV.horizontalHeader().customContextMenuRequested.connect(self.filterColumn)
+        self.editFind.textEdited.connect(lambda text: self.findRow(0))
+        self.editFind.returnPressed.connect(lambda: self.findRow(1))
+        self.timer.timeout.connect(self.progressSQL)
+    
+    
+    def execSQL(self, explain=False):
+        if self.job:  # закрытие предыдущего запроса, ожидающего загрузки строк
+            self.job.cancel()
+        
+        self.setCursor(QtCore.Qt.BusyCursor)
+        self.model.clear()
+        self.tableCSV.horizontalHeader().setSortIndicatorShown(False)
+        
+        self.data = self.model.rows  # Результат SQL-запроса
+        self.headers = None  # Заголовки столбцов
+        self.buttonCSV.setEnabled(False)
+        if self.paged is not None:  # просмотр закрывается, даже если первая страница еще не получена
+            self.paged.close()
+        self.paged = None
+        self.textPlan.clear()
+        self.textPlan.setVisible(explain)
+        
+        sql = self.textSQL.toPlainText()
+        if self.checkPaged.isChecked() and isSelect(sql) and ':cr' not in sql and not explain:
+            self.startPaged(sql)
+            return
+        
+        # Запуск запроса в фоновом потоке (с планом - без кэша, запрос выполняется до конца)
+        job = QueryJob(sql, database_URI, DB, use_cache=self.checkCache.isChecked() and not explain, limit=row_limit, session=self.session)
+        job.explain = explain
+        if explain:
+            self.textPlan.setPlainText('Получение плана ...')
+        self.startJob(job)
+    
+    
+    def startPaged(self, sql):
+        # Постраничный просмотр: в памяти только последние просмотренные страницы, следующая загружается заранее
+        self.paged = PagedQuery(sql, database_URI, DB, key=self.editKey.text().strip() or None)
+        self.pagedSignals = QueryRunnerSignals()
+        self.paged.notify = self.pagedSignals.message.emit
+        self.pagedSignals.message.connect(self.messagePage)
+        self.time_start = time.time()
+        self.statusLabel.setText('Ожидание первой страницы ...')
+        self.paged.start()
+    
+    
+    def messagePage(self, kind, payload):
+        if self.paged is None or self.sender() is not self.pagedSignals:  # сообщение закрытого просмотра
+            return
+        
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        if kind == 'error':
+            self.statusLabel.setText(payload)
+            return
+        
+        if self.model.rows is not self.paged or self.model.headers != self.paged.headers:  # первая страница
+            self.model.setResult(self.paged)
+            self.headers = self.paged.headers
+            self.data = self.paged
+            self.model.updateRows()
+            self.resizeColumns()
+        else:
+            self.model.updateRows()
+        
+        count = str(self.paged.count) if self.paged.count is not None else '?'
+        first = self.paged.timer.phases.get('first_row')
+        self.statusLabel.setText('Постранично  ( rows = ' + count + ', pages in memory = ' + str(self.paged.loaded()) +
+                                 (', first page = ' + str(round(first, 3)) if first is not None else '') + ' )')
+    
+    
+    def exportDirect(self):
+        if self.job:  # закрытие предыдущего запроса, ожидающего загрузки строк (загруженные строки остаются в таблице)
+            self.job.cancel()
+        
+        self.setCursor(QtCore.Qt.BusyCursor)
+        
+        # Выгрузка результата запроса в CSV-файл в фоновом потоке, минуя таблицу
+        column = self.editPartition.text().strip()
+        if column:  # диапазоны ключа выгружаются в отдельных соединениях параллельно
+            self.startJob(ParallelExportJob(self.textSQL.toPlainText(), database_URI, filename, column, DB,
+                                            degree=self.spinDegree.value(), ordered=self.checkOrdered.isChecked(),
+                                            separator=separator, end_line=end_line, text_codec=text_codec,
+                                            compression=self.comboCompress.currentData()))
+        else:
+            self.startJob(ExportJob(self.textSQL.toPlainText(), database_URI, filename, DB,
+                                    separator=separator, end_line=end_line, text_codec=text_codec, session=self.session,
+                                    compression=self.comboCompress.currentData()))
+    
+    
+    def importCSV(self):
+        path = QtWidgets.QFileDialog.getOpenFileName(self, 'CSV-файл для загрузки', dirname, 'CSV (*.csv);;Все файлы (*)')[0]
+        if not path:
+            return
+        table, ok = QtWidgets.QInputDialog.getText(self, 'Загрузка CSV', 'Таблица (столбцы - по строке заголовков файла):')
+        if not ok or not table.strip():
+            return
+        if self.job:
+            self.job.cancel()
+        
+        self.setCursor(QtCore.Qt.BusyCursor)
+        
+        # Загрузка CSV-файла в таблицу в фоновом потоке пакетами executemany
+        self.startJob(ImportJob(path, table.strip(), database_URI, DB,
+                                separator=separator, end_line=end_line, text_codec=text_codec, session=self.session))
+    
+    
+    def startJob(self, job):
+        self.buttonCSV.setEnabled(False)
+        self.buttonSQL.setEnabled(False)
+        self.buttonExplain.setEnabled(False)
+        self.buttonDirect.setEnabled(False)
+        self.buttonImport.setEnabled(False)
+        self.buttonCancel.setEnabled(True)
+        self.buttonMore.setEnabled(False)
+        self.buttonAll.setEnabled(False)
+        
+        self.job = job
+        self.job.profile = self.checkProfile.isChecked()
+        self.checkProfile.setChecked(False)  # профилируется только один запуск
+        self.runner = QueryRunner(self.job)
+        self.runner.signals.message.connect(self.messageSQL)
+        self.time_start = time.time()
+        self.progressSQL()
+        self.timer.start()
+        QtCore.QThreadPool.globalInstance().start(self.runner)
+    
+    
+    def cancelSQL(self):
+        if self.job:
+            self.buttonCancel.setEnabled(False)
+            self.statusLabel.setText('Отмена запроса ...')
+            self.job.cancel()
+    
+    
+    def fetchMore(self):
+        self.fetchRows(row_limit)
+    
+    
+    def fetchAll(self):
+        self.fetchRows(0)
+    
+    
+    def fetchRows(self, count):
+        if self.job:
+            if self.model.view.active():  # новые строки выводятся без сортировки и фильтра
+                self.model.resetView()
+                self.tableCSV.horizontalHeader().setSortIndicatorShown(False)
+            self.setCursor(QtCore.Qt.BusyCursor)
+            self.buttonSQL.setEnabled(False)
+            self.buttonExplain.setEnabled(False)
+            self.buttonDirect.setEnabled(False)
+            self.buttonMore.setEnabled(False)
+            self.buttonAll.setEnabled(False)
+            self.job.fetchMore(count)
+            self.timer.start()
+    
+    
+    def progressSQL(self):
+        if self.job and not self.job.cancelled:
+            delta_time = str(round(time.time() - self.time_start, 1))
+            if isinstance(self.job, ImportJob):
+                action = 'Загрузка ...  ( rejected = ' + str(self.job.rows_rejected) + ', '
+            else:
+                action = ('Выгрузка ...' if isinstance(self.job, ExportJob) else 'Ожидание ...') + '  ( '
+            self.statusLabel.setText(action + 'rows = ' + str(self.job.rows_fetched) +
+                                     ', round trips = ' + str(self.job.timer.round_trips) + ', time = ' + delta_time + ' )')
+    
+    
+    def messageSQL(self, kind, payload):
+        if self.runner is None or self.sender() is not self.runner.signals:  # сообщение от закрытого запроса
+            return
+        
+        if kind == 'headers':
+            self.headers = payload
+            self.model.setHeaders(self.headers)
+            self.data = self.model.rows
+            self.resizeColumns()
+            return
+        
+        if kind == 'batch':  # вывод очередной порции строк
+            self.job.timer.begin('render')
+            is_first = not self.data
+            self.model.appendRows(payload)
+            if is_first:  # ширина столбцов по первой порции строк
+                self.resizeColumns()
+            self.job.timer.end('render')
+            self.buttonCSV.setEnabled(True)
+            return
+        
+        if kind == 'plan':  # план выполнения и статистика сервера
+            self.textPlan.setPlainText(payload)
+            self.textPlan.show()
+            return
+        
+        self.timer.stop()
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        self.buttonSQL.setEnabled(True)
+        self.buttonExplain.setEnabled(True)
+        self.buttonDirect.setEnabled(True)
+        self.buttonImport.setEnabled(True)
+        
+        if kind == 'paused':  # соединение остается открытым до загрузки остальных строк
+            rows_fetched, delta_time = payload
+            self.statusLabel.setText('Загружено строк: ' + str(rows_fetched) + ', есть еще данные  ( time = ' + delta_time + ' )')
+            self.buttonMore.setEnabled(True)
+            self.buttonAll.setEnabled(True)
+            return
+        
+        job, self.job = self.job, None
+        self.runner = None
+        self.buttonCancel.setEnabled(False)
+        self.buttonMore.setEnabled(False)
+        self.buttonAll.setEnabled(False)
+        
+        if kind == 'cached':  # результат из кэша
+            result, age = payload
+            self.model.setResult(result)
+            self.headers = result.headers
+            self.data = result
+            self.resizeColumns()
+            self.statusLabel.setText('Успешно  ( rows = ' + str(len(self.data)) + ', cache = hit, age = ' + str(round(age, 1)) + ' )')
+        elif kind == 'finished' and isinstance(job, ExportJob):
+            is_query, delta_time, cancelled = payload
+            result = 'Выгрузка отменена' if cancelled else 'Успешно'
+            self.statusLabel.setText(result + '  ( ' + job.filename + ', rows = ' + str(job.rows_fetched) + ', size = ' + memoryText(job.size) +
+                                     ', time = ' + delta_time + ', ' + job.timer.summary() + ' )')
+        elif kind == 'finished' and isinstance(job, ImportJob):
+            is_query, delta_time, cancelled = payload
+            result = 'Загрузка отменена' if cancelled else 'Успешно'
+            rejected = ', rejected = ' + str(job.rows_rejected) + ' (' + job.reject_file + ')' if job.rows_rejected else ''
+            self.statusLabel.setText(result + '  ( ' + job.table + ', rows = ' + str(job.rows_fetched) + rejected + ', time = ' + delta_time + ', ' + job.timer.summary() + ' )')
+        elif kind == 'error':
+            self.statusLabel.setText(payload)
+        elif kind == 'cancelled':
+            self.statusLabel.setText('Запрос отменен  ( ' + payload + ' )')
+        elif kind == 'finished':
+            is_query, delta_time, cancelled = payload
+            times = 'time = ' + delta_time + ', ' + job.timer.summary()  # время по этапам выполнения запроса
+            if job.explain:  # строки сверх загруженных прочитаны для статистики сервера
+                times += ', read = ' + str(job.timer.rows)
+            if job.cache_key is not None and is_query and not cancelled:
+                result_cache.put(job.cache_key, self.data)
+                times += ', cache = miss'
+            self.statusLabel.setText('Успешно  ( ' + times + ' )')  # для SQL-запроса не на выборку (вставка, изменение, удаление)
+            
+            if is_query:
+                if not self.data:
+                    self.statusLabel.setText('Данных по запросу нет  ( ' + times + ' )')
+                else:
+                    rows = str(len(self.data)) + (', spilled = ' + str(self.data.spilled()) if self.data.spilled() else '')
+                    self.statusLabel.setText('Успешно  ( rows = ' + rows + ', ' + times + ' )')
+                if cancelled:
+                    self.statusLabel.setText('Запрос отменен  ( rows = ' + str(len(self.data)) + ', ' + times + ' )')
+        
+        job.timer.save('cancelled' if job.cancelled else kind)
+        self.buttonCSV.setEnabled(bool(self.data or self.headers))
+    
+    
+    def viewReady(self):
+        # сортировка и фильтр по загруженным строкам (не во время загрузки и не в постраничном режиме)
+        if self.paged is not None:
+            self.statusLabel.setText('В постраничном режиме сортировка и фильтр задаются в SQL-запросе')
+            return False
+        if self.job and not self.job.paused():
+            self.statusLabel.setText('Сортировка и фильтр доступны после загрузки строк')
+            return False
+        return bool(self.headers)
+    
+    
+    def showView(self, action, time_start):
+        self.statusLabel.setText(action + '  ( rows = ' + str(len(self.model.view)) + ' из ' + str(len(self.model.rows)) +
+                                 ', time = ' + str(round(time.perf_counter() - time_start, 3)) + ' )')
+    
+    
+    def sortColumn(self, column):
+        if not self.viewReady():
+            return
+        # по возрастанию, по убыванию, исходный порядок
+        view = self.model.view
+        header = self.tableCSV.horizontalHeader()
+        time_start = time.perf_counter()
+        self.setCursor(QtCore.Qt.WaitCursor)
+        if view.sort_column != column:
+            self.model.sortBy(column)
+            header.setSortIndicator(column, QtCore.Qt.AscendingOrder)
+        elif not view.descending:
+            self.model.sortBy(column, True)
+            header.setSortIndicator(column, QtCore.Qt.DescendingOrder)
+        else:
+            self.model.sortBy(None)
+        header.setSortIndicatorShown(view.sort_column is not None)
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        self.showView('Сортировка', time_start)
+    
+    
+    def filterColumn(self, pos):
+        column = self.tableCSV.horizontalHeader().logicalIndexAt(pos)
+        if column < 0 or not self.viewReady():
+            return
+        condition, ok = QtWidgets.QInputDialog.getText(self, 'Фильтр по столбцу ' + self.headers[column],
+                                                       'Условие: =, <>, >, >=, <, <= значение, a..b, = NULL или подстрока\n(пустое - без фильтра)',
+                                                       text=self.model.view.filters.get(column, ''))
+        if not ok:
+            return
+        time_start = time.perf_counter()
+        self.setCursor(QtCore.Qt.WaitCursor)
+        self.model.filterBy(column, condition)
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        self.showView('Фильтр', time_start)
+    
+    
+    def findRow(self, step):
+        # поиск с текущей строки при вводе текста, со следующей - по Enter
+        text = self.editFind.text()
+        current = self.tableCSV.currentIndex()
+        if not text or self.paged is not None or not self.model.rowCount():
+            return
+        start = current.row() + step if current.isValid() else 0
+        columns = [current.column()] if current.isValid() else None
+        row = self.model.view.find(text, start % self.model.rowCount(), columns)
+        if row < 0:
+            self.statusLabel.setText('Не найдено: ' + text)
+            return
+        index = self.model.index(row, current.column() if current.isValid() else 0)
+        self.tableCSV.setCurrentIndex(index)
+        self.tableCSV.scrollTo(index)
+    
+    
+    def copySelection(self, headers):
+        # выделенные ячейки в буфер обмена текстом с табуляцией (вставка в Excel), строки берутся из результата
+        rows, columns = set(), set()
+        for selected in self.tableCSV.selectionModel().selection():
+            rows.update(range(selected.top(), selected.bottom() + 1))
+            columns.update(range(selected.left(), selected.right() + 1))
+        if not rows:
+            return
+        if len(rows) > clipboard_warn_rows:
+            answer = QtWidgets.QMessageBox.question(self, 'Копирование', 'Скопировать в буфер обмена строк: ' + str(len(rows)) +
+                                                    '?\nДля больших объемов быстрее выгрузка в CSV')
+            if answer != QtWidgets.QMessageBox.Yes:
+                return
+        self.setCursor(QtCore.Qt.WaitCursor)
+        time_start = time.perf_counter()
+        if self.paged is not None:  # только строки загруженных страниц, без запросов к серверу
+            selected = self.paged.loadedRows(sorted(rows))
+        else:
+            view = self.model.view
+            selected = [view[i] for i in sorted(rows)]
+        text = tsvText(selected, self.headers if headers else None, sorted(columns))
+        QtWidgets.QApplication.clipboard().setText(text)
+        self.setCursor(QtCore.Qt.ArrowCursor)
+        copied = str(len(selected)) + (' из ' + str(len(rows)) + ' (только загруженные страницы)' if len(selected) < len(rows) else '')
+        self.statusLabel.setText('Скопировано строк: ' + copied + '  ( time = ' + str(round(time.perf_counter() - time_start, 3)) + ' )')
+    
+    
+    def resizeColumns(self):
+        # ширина столбцов по заголовкам и выборке первых строк (без просмотра всех ячеек)
+        metrics = self.tableCSV.fontMetrics()
+        for index_field, header in enumerate(self.headers or []):
+            width = metrics.horizontalAdvance(header)
+            for field in self.data.column(index_field, 0, sample_rows):
+                width = max(width, metrics.horizontalAdvance(str(field)))
+            self.tableCSV.horizontalHeader().resizeSection(index_field, min(width + 20, max_column_width))
+    
+    
+    def exportCSV(self):
+        self.setCursor(QtCore.Qt.WaitCursor)
+        
+        # Экспорт в CSV-файл
+        if self.paged is not None:  # постраничный результат выгружается только напрямую
+            self.statusLabel.setText('Для постраничного просмотра используйте выгрузку в CSV напрямую')
+        elif self.data or self.headers:
+            timer = QueryTimer(source='grid')
+            timer.begin('export')
+            compression = self.comboCompress.currentData()
+            path = compressedName(filename, compression)
+            try:  # Запись CSV-файла (порции кодируются и сжимаются в пуле процессов)
+                with open(path, 'wb') as f:
+                    w = ChunkWriter(f, separator, end_line, text_codec, compression)
+                    if self.headers:
+                        w.write([self.headers])  # для правильного отображения заголовков в одну строку CSV файла
+                    if self.data:
+                        w.write(self.model.view)  # строки в порядке сортировки, с учетом фильтра
+                    w.flush()
+                timer.end('export')
+                timer.rows = len(self.model.view)
+                timer.save('finished')
+                self.statusLabel.setText("Успешно ( " + path + ", size = " + memoryText(w.size) + ", " + timer.summary() + " )")
+            except Exception as err:
+                self.statusLabel.setText(str(err))
+        elif not self.data:
+            self.statusLabel.setText('Нет данных для экспорта')
+        
+        self.setCursor(QtCore.Qt.ArrowCursor)
+    
+    
+    def memoryUsage(self):
+        # объем результата вкладки в памяти (строки в файле подкачки не учитываются)
+        return self.data.nbytes() if self.data is not None else 0
+    
+    
+    def closeTab(self):
+        self.timer.stop()
+        if self.job:  # прерывание выполняемого запроса при закрытии вкладки
+            self.job.cancel()
+        if self.paged:
+            self.paged.close()
+        self.job = self.runner = self.paged = None  # сообщения закрытых запросов не обрабатываются
+        self.model.clear()  # удаление файла подкачки результата
+        self.data = None
+        self.session.close()
+
+
+class SQLWidget(QtWidgets.QWidget):
+    '''Рабочая область: запросы вкладок выполняются одновременно в фоновых потоках!'''
+    
+    def __init__(self, startup=None):
+        super().__init__()
+        
+        self.setWindowIcon(QtGui.QIcon(os.path.join(resourcePath(), 'pyinstaller.ico')))
+        
+        self.startup = startup or StartupTimer(time.perf_counter())  # замер времени запуска
+        self.trans = None  # переводчик Qt загружается после отрисовки окна
+        self.loaderSignals = None
+        self.tab_number = 0  # номер последней открытой вкладки
+        
+        self.tabs = QtWidgets.QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.setMovable(True)
+        self.tabs.setStyleSheet('QTabBar {color: "#333333"; font-family: sans-serif; font-size: 13px;}')
+        
+        self.buttonTab = QtWidgets.QToolButton()
+        self.buttonTab.setText('+')
+        self.buttonTab.setToolTip('Новая вкладка (Ctrl+T)')
+        self.tabs.setCornerWidget(self.buttonTab, QtCore.Qt.TopRightCorner)
+        
+        self.memoryLabel = QtWidgets.QLabel()
+        self.memoryLabel.setStyleSheet('QLabel {color: "#757575"; font-family: sans-serif; font-size: 12px;}')
+        self.memoryLabel.setAlignment(QtCore.Qt.AlignRight)
+        
+        self.layout = QtWidgets.QVBoxLayout()
+        self.layout.addWidget(self.tabs)
+        self.layout.addWidget(self.memoryLabel)
+        self.setLayout(self.layout)
+        
+        self.memoryTimer = QtCore.QTimer(self)  # обновление объема памяти вкладок
+        self.memoryTimer.setInterval(1000)
+        
+        self.buttonTab.clicked.connect(self.addTab)
+        self.tabs.tabCloseRequested.connect(self.closeTab)
+        self.shortcutNew = QtGui.QShortcut(QtGui.QKeySequence('Ctrl+T'), self)
+        self.shortcutNew.activated.connect(self.addTab)
+        self.shortcutClose = QtGui.QShortcut(QtGui.QKeySequence('Ctrl+W'), self)
+        self.shortcutClose.activated.connect(lambda: self.closeTab(self.tabs.currentIndex()))
+        self.memoryTimer.timeout.connect(self.updateMemory)
+        
+        self.addTab()
+        self.memoryTimer.start()
+    
+    
+    def addTab(self):
+        self.tab_number += 1
+        tab = SQLTab('Запрос ' + str(self.tab_number))
+        self.tabs.setCurrentIndex(self.tabs.addTab(tab, tab.title))
+        tab.textSQL.setFocus()
+        # приостановленный запрос занимает поток пула до загрузки остальных строк
+        pool = QtCore.QThreadPool.globalInstance()
+        pool.setMaxThreadCount(max(pool.maxThreadCount(), self.tabs.count() + QtCore.QThread.idealThreadCount()))
+    
+    
+    def closeTab(self, index):
+        tab = self.tabs.widget(index)
+        if tab is None:
+            return
+        tab.closeTab()
+        self.tabs.removeTab(index)
+        tab.deleteLater()
+        if not self.tabs.count():
+            self.addTab()
+        self.updateMemory()
+    
+    
+    def updateMemory(self):
+        # объем результата каждой вкладки в ее заголовке, * - выполняется запрос
+        total, largest = 0, None
+        for index in range(self.tabs.count()):
+            tab = self.tabs.widget(index)
+            size = tab.memoryUsage()
+            total += size
+            if size and (largest is None or size > largest.memoryUsage()):
+                largest = tab
+            running = ' *' if tab.job is not None and not tab.job.paused() else ''
+            self.tabs.setTabText(index, tab.title + running + ('  [' + memoryText(size) + ']' if size else ''))
+            spilled = tab.data.spilled() if tab.data is not None else 0
+            self.tabs.setTabToolTip(index, 'rows = ' + str(len(tab.data) if tab.data is not None else 0) +
+                                    ', memory = ' + memoryText(size) + (', spilled = ' + str(spilled) if spilled else ''))
+        self.memoryLabel.setText('Память результатов: ' + memoryText(total) +
+                                 (' (больше всего - ' + largest.title + ')' if largest is not None else '') +
+                                 ', кэш: ' + memoryText(result_cache.size))
+    
+    
+    def startDeferred(self):
+        # после первой отрисовки окна: заставка PyInstaller, переводчик Qt, драйвер БД в фоновом потоке
+        self.startup.mark('paint')
+        try:  # заставка сборки PyInstaller с --splash
+            import pyi_splash
+            pyi_splash.close()
+        except ImportError:
+            pass
+        
+        self.startup.begin('translator')
+        self.trans = QtCore.QTranslator(self)
+        self.trans.load('qt_' + QtCore.QLocale.system().name(), QtCore.QLibraryInfo.location(QtCore.QLibraryInfo.TranslationsPath))
+        QtWidgets.QApplication.instance().installTranslator(self.trans)
+        self.startup.end('translator')
+        
+        self.loaderSignals = QueryRunnerSignals()
+        self.loaderSignals.message.connect(self.moduleLoaded)
+        loadModules([DB] if isinstance(DB, str) else [], self.loaderSignals.message.emit)
+    
+    
+    def moduleLoaded(self, kind, payload):
+        global INFO_TEXT
+        if kind == 'loaded':
+            name, seconds, error = payload
+            if error:  # ошибка в строке статуса всех вкладок (и новых)
+                INFO_TEXT = error
+                for index in range(self.tabs.count()):
+                    self.tabs.widget(index).statusLabel.setText(error)
+            return
+        
+        self.startup.mark('driver')
+        if '--startup-report' in sys.argv:
+            print(self.startup.report(['sql_tool_qt'] + ([DB] if isinstance(DB, str) else [])))
+            self.tabs.currentWidget().statusLabel.setText('Запуск: ' + self.startup.summary())
+        self.startup.save('finished')
+    
+    
+    def closeEvent(self, event):
+        for index in range(self.tabs.count()):  # прерывание выполняемых запросов при закрытии окна
+            self.tabs.widget(index).closeTab()
+        super().closeEvent(event)
+
+
+# Выполнение программы
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()  # процессы кодирования CSV в собранном PyInstaller приложении
+    startup = StartupTimer(startup_time)
+    startup.mark('import')
+    app = QtWidgets.QApplication([])
+    widget = SQLWidget(startup)
+    widget.setWindowTitle('SQL tools')
+    widget.resize(900, 600)
+    widget.show()
+    startup.mark('window')
+    QtCore.QTimer.singleShot(0, widget.startDeferred)  # переводчик и драйвер загружаются после отрисовки окна
+    code = app.exec_()
+    closePools()
+    sys.exit(code)
@@ -1,330 +1,1000 @@
-#!python3
-# -*- coding: utf-8 -*-
-
-from tkinter import *
-from tkinter import ttk
-import os, csv, time
-
-# для тестирования GUI без модуля драйвера базы данных
-try:
-    import cx_Oracle as DB  # pyodbc для MS SQL Server
-    INFO_TEXT = "Строка статуса"
-except Exception as e:
-    INFO_TEXT = str(e)
-    DB = None
-
-# Строка соединения с БД
-DATABASE_URI = 'user/password@IP:port/db_name'  # 'DRIVER={SQL Server};SERVER=tcp:IP,port;DATABASE=db_name;UID=user;PWD=password' для MS SQL Server
-
-# Переменные окружения (при необходимости)
-os.environ["NLS_LANG"] = "RUSSIAN_CIS.CL8MSWIN1251"
-
-# Путь для сохранения CSV
-dirname = os.path.expanduser("~\\Desktop")  # ссылка на рабочий стол
-
-# Имя файла CSV
-filename = os.path.join(dirname, "export.csv")
-
-# Разделитель строк в файле CSV
-end_line = "\n"
-
-# Разделитель полей в файле CSV
-separator = ";"
-
-# Кодировка текста
-text_codec = "cp1251"
-
-
-class DatabaseError(Exception):
-    """Пользовательский класс исключения для базы данных!"""
-    pass
-
-
-class UseDatabase:
-    """Класс диспетчера контекста для соединения с базой данных!"""
-
-    def __init__(self, config: str) -> None:
-        self.configuration = config
-
-    def __enter__(self) -> "cursor":
-        try:
-            self.conn = DB.connect(self.configuration)  # соединение с базой данных
-            self.cursor1 = self.conn.cursor()
-            self.cursor2 = self.conn.cursor()
-            return self.cursor1, self.cursor2  # возвращаем два курсора (для ситуации когда курсор исп-ся в самом запросе)
-        except Exception as err:
-            raise DatabaseError(err)
-
-    def __exit__(self, exc_type, exc_value, exc_trace) -> None:
-        self.conn.commit()
-        self.cursor1.close()
-        self.cursor2.close()
-        self.conn.close()
-        if exc_type:
-            raise DatabaseError(exc_value)  # если ошибка в SQL-запросе
-
-
-class SQLToolsGUI:
-    def __init__(self, root):
-        self.root = root
-        root.title("SQL tools")
-        root.minsize(width=600, height=375)
-        root.geometry("920x575-10+10")
-
-        self.dataset = None
-        self.headers = None
-
-        # create a menu
-        self.popup_label = Menu(root, tearoff=0)
-        self.popup_label.add_command(label="Копировать", command=self.copy_label)
-        self.popup_tree = Menu(root, tearoff=0)
-        self.popup_tree.add_command(label="Копировать", command=self.copy_tree)
-        self.popup_text = Menu(root, tearoff=0)
-        self.popup_text.add_command(label="Копировать", command=self.copy_text)
-        self.popup_text.add_separator()
-        self.popup_text.add_command(label="Вставить", command=self.paste_text)
-
-        self.labelframe_style = ttk.Style()
-        self.labelframe_style.configure("Gray.TLabelframe.Label", font="Consolas 10", foreground="#808080")
-        self.tree_style = ttk.Style()
-        self.tree_style.configure("Gray.Treeview", font="Consolas 12", foreground="#333333")
-        self.btn_style = ttk.Style()
-        self.btn_style.configure("Gray.TButton", font="Consolas 12", foreground="#333333")
-
-        self.content = ttk.Frame(root, padding=(10, 10, 10, 0))
-        self.pw = ttk.Panedwindow(self.content, orient=VERTICAL, height=50)
-        self.sqlFrame = ttk.Labelframe(self.pw, text="SQL-запрос | :cr для курсора",
-                                       style="Gray.TLabelframe", padding=(10, 10, 10, 0))
-        self.sqlText = Text(self.sqlFrame, height=20, font="Consolas 12", foreground="#333333")
-        self.sqlText.bind("<Control-Key>", self.selectText)
-        self.sqlText.bind("<Button-3>", self.do_popup_text)
-        self.sqlText["wrap"] = "none"
-        self.sbX = Scrollbar(self.sqlFrame, orient=HORIZONTAL, command=self.sqlText.xview)
-        self.sqlText.configure(xscrollcommand=self.sbX.set)
-        self.sbY = Scrollbar(self.sqlFrame, orient=VERTICAL, command=self.sqlText.yview)
-        self.sqlText.configure(yscrollcommand=self.sbY.set)
-        self.sqlButton = ttk.Button(self.sqlFrame, text="Выполнить запрос", style="Gray.TButton", command=self.beginSQL)
-        self.dataFrame = ttk.Labelframe(self.pw, text="Данные результата запроса", style="Gray.TLabelframe",
-                                        padding=(10, 10, 10, 0))
-        self.sqlResult = ttk.Treeview(self.dataFrame, height=25, style="Gray.Treeview")
-        self.sqlResult.bind("<Control-Key>", self.selectTree)
-        self.sqlResult.bind("<Button-3>", self.do_popup_tree)
-        self.sbXR = Scrollbar(self.dataFrame, orient=HORIZONTAL, command=self.sqlResult.xview)
-        self.sqlResult.configure(xscrollcommand=self.sbXR.set)
-        self.sbYR = Scrollbar(self.dataFrame, orient=VERTICAL, command=self.sqlResult.yview)
-        self.sqlResult.configure(yscrollcommand=self.sbYR.set)
-        self.csvButton = ttk.Button(self.dataFrame, text="Экспортировать данные", style="Gray.TButton", command=self.beginCSV)
-        self.footer = ttk.Label(self.content, text=INFO_TEXT, font="Consolas 10", justify="right", foreground="#808080")
-        self.footer.bind("<Button-3>", self.do_popup_label)
-        self.pw.add(self.sqlFrame, weight=1)
-        self.pw.add(self.dataFrame, weight=1)
-
-        self.content.grid(column=0, row=0, sticky=(N, S, E, W))
-        self.pw.grid(column=0, row=0, sticky=(N, S, E, W))
-        self.sqlText.grid(column=0, row=0, sticky=(N, S, E, W))
-        self.sbX.grid(column=0, row=1, columnspan=2, sticky=(E, W))
-        self.sbY.grid(column=1, row=0, sticky=(N, S))
-        self.sqlButton.grid(column=0, row=2, columnspan=2, sticky=(E, W), pady=10)
-        self.sqlResult.grid(column=0, row=0, sticky=(N, S, E, W))
-        self.sbXR.grid(column=0, row=1, columnspan=2, sticky=(E, W))
-        self.sbYR.grid(column=1, row=0, sticky=(N, S))
-        self.csvButton.grid(column=0, row=2, columnspan=2, sticky=(E, W), pady=10)
-        self.footer.grid(column=0, row=1, sticky=(E,), pady=5)
-
-        root.columnconfigure(0, weight=1)
-        root.rowconfigure(0, weight=1)
-        self.content.columnconfigure(0, weight=1)
-        self.content.rowconfigure(0, weight=1)
-        self.sqlFrame.columnconfigure(0, weight=1)
-        self.sqlFrame.rowconfigure(0, weight=1)
-        self.dataFrame.columnconfigure(0, weight=1)
-        self.dataFrame.rowconfigure(0, weight=1)
-
-        self.csvButton["state"] = "disabled"
-        self.sqlResult.heading("#0", text="№")
-        self.sqlText.insert(1.0, "SELECT SYSDATE FROM DUAL")  # "SELECT CONVERT(VARCHAR, GETDATE(), 20) AS SYSDATE" для MS SQL Server
-        self.sqlText.focus()
-        
-        if INFO_TEXT != "Строка статуса":  # копирование ошибки в буфер обмена
-            self.root.clipboard_clear()
-            self.root.clipboard_append(INFO_TEXT)
-            self.root.update()
-
-    def do_popup_label(self, event):
-        # display the popup menu
-        try:
-            self.popup_label.tk_popup(event.x_root, event.y_root, 0)
-        finally:
-            # make sure to release the grab (Tk 8.0a1 only)
-            self.popup_label.grab_release()
-
-    def copy_label(self):
-        self.root.clipboard_clear()
-        self.root.clipboard_append(self.footer["text"])
-        self.root.update()
-
-    def do_popup_tree(self, event):
-        # display the popup menu
-        try:
-            self.popup_tree.tk_popup(event.x_root, event.y_root, 0)
-        finally:
-            # make sure to release the grab (Tk 8.0a1 only)
-            self.popup_tree.grab_release()
-
-    def copy_tree(self):
-        try:
-            text_copy = [self.sqlResult.item(x)["values"] for x in self.sqlResult.selection()]
-        except:
-            text_copy = ""
-        finally:
-            self.root.clipboard_clear()
-            self.root.clipboard_append(text_copy)
-            self.root.update()
-
-    def do_popup_text(self, event):
-        # display the popup menu
-        try:
-            self.popup_text.tk_popup(event.x_root, event.y_root, 0)
-        finally:
-            # make sure to release the grab (Tk 8.0a1 only)
-            self.popup_text.grab_release()
-
-    def copy_text(self):
-        try:
-            text_copy = self.sqlText.selection_get()
-        except:
-            text_copy = ""
-        finally:
-            self.root.clipboard_clear()
-            self.root.clipboard_append(text_copy)
-            self.root.update()
-
-    def paste_text(self):
-        self.sqlText.insert("insert", self.root.clipboard_get())
-
-    def selectText(self, event):  # для русской раскладки (для английской и так работает)
-        if event.keycode == 67 and event.keysym == "??":  # копирование выделенного текста в буфер обмена
-            try:
-                text_copy = self.sqlText.selection_get()
-            except:
-                text_copy = ""
-            finally:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(text_copy)
-                self.root.update()
-        elif event.keycode == 86 and event.keysym == "??":  # вставка текста из буфера обмена
-            self.sqlText.insert("insert", self.root.clipboard_get())
-
-    def selectTree(self, event):  # для любой раскладки
-        if event.keysym == "c" or (event.keycode == 67 and event.keysym == "??"):  # копирование выделенных строк в буфер обмена
-            try:
-                text_copy = [self.sqlResult.item(x)["values"] for x in self.sqlResult.selection()]
-            except:
-                text_copy = ""
-            finally:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(text_copy)
-                self.root.update()
-
-    def beginSQL(self):
-        self.dataset = None
-        self.headers = None
-        self.csvButton["state"] = "disabled"
-        self.footer["text"] = "Ожидание ..."  # self.footer.update()
-        self.root.config(cursor="wait")  # self.root.update()
-
-        # очистка таблицы
-        for item in self.sqlResult.get_children():
-            self.sqlResult.delete(item)
-        self.sqlResult["columns"] = ()
-
-        self.root.after(150, self.execSQL)  # обновляется GUI до запуска следующей задачи
-
-    def execSQL(self):
-        _SQL = self.sqlText.get(1.0, "end")
-        is_cursor = True if ':cr' in _SQL else False  # Признак курсора в SQL-запросе
-        is_query = True  # Признак выборки
-        time1 = time.time()  # время начала запроса
-
-        try:  # Запрос к БД
-            with UseDatabase(DATABASE_URI) as cursor:
-                if is_cursor:  # SQL-запрос с курсором
-                    cursor[0].execute(_SQL, cr=cursor[1])
-                    try:
-                        self.dataset = cursor[1].fetchall()
-                        self.headers = [desc[0].upper() for desc in cursor[1].description]
-                    except:
-                        is_query = False
-                else:  # Чистый SQL-запрос
-                    cursor[0].execute(_SQL)
-                    try:
-                        self.dataset = cursor[0].fetchall()
-                        self.headers = [desc[0].upper() for desc in cursor[0].description]
-                    except:
-                        is_query = False
-        except DatabaseError as err:
-            self.footer["text"] = str(err)
-            self.root.clipboard_clear()
-            self.root.clipboard_append(str(err))
-            self.root.update()  # остается в буфере обмена после закрытия приложения
-        else:
-            time2 = time.time()  # время окончания запроса
-            delta_time = str(round(time2 - time1, 3))  # время запроса (округление до трех знаков после запятой)
-            self.footer[
-                "text"] = "Успешно (time = " + delta_time + ")"  # для SQL-запроса не на выборку (вставка, изменение, удаление)
-
-            # Вывод результата SQL-запроса
-            if is_query:
-                max_first_width = 50  # ширина первого столбца "#0"
-                max_col_width = []  # ширина основных столбцов
-
-                if self.headers:
-                    self.sqlResult["columns"] = list(self.headers)
-                    max_col_width = [(len(str(w)) * 10) + 10 for w in self.headers]
-                    for head in self.headers:
-                        self.sqlResult.heading(head, text=head)
-                    self.footer["text"] = "Данных по запросу нет (time = " + delta_time + ")"
-                if self.dataset:
-                    for i, line in enumerate(self.dataset):
-                        self.sqlResult.insert("", "end", text=i+1, values=[str(l) for l in line])
-                        index = (len(str(i + 1)) * 10) + 40
-                        if index > max_first_width: max_first_width = index
-                        for j, cell in enumerate(line):
-                            word = (len(str(cell)) * 10) + 10
-                            if word > max_col_width[j]: max_col_width[j] = word
-                    self.footer["text"] = "Успешно (time = " + delta_time + ")"
-
-                # устанавливаем ширину столбцов
-                if self.headers:
-                    self.sqlResult.column("#0", width=max_first_width, anchor="w")
-                    for h, header in enumerate(self.headers):
-                        self.sqlResult.column(header, width=max_col_width[h], anchor="w")
-
-        self.csvButton["state"] = "normal" if self.dataset else "disabled"
-        self.root.config(cursor="")
-
-    def beginCSV(self):
-        self.footer["text"] = "Ожидание ..."  # self.footer.update()
-        self.root.config(cursor="wait")  # self.root.update()
-
-        self.root.after(150, self.execCSV)  # обновляется GUI до запуска следующей задачи
-
-    def execCSV(self):
-        try:  # Запись CSV-файла
-            with open(filename, 'w', encoding=text_codec) as f:
-                w = csv.writer(f, delimiter=separator, lineterminator=end_line)
-                if self.headers:
-                    w.writerows([self.headers])  # для правильного отображения заголовков в одну строку CSV файла
-                if self.dataset:
-                    w.writerows(self.dataset)
-                self.footer["text"] = "Успешно (" + filename + ")"
-        except Exception as err:
-            self.footer["text"] = str(err)
-
-        self.root.config(cursor="")
-
-
-if __name__ == '__main__':
-    app = Tk()
-    gui = SQLToolsGUI(app)
-    app.mainloop()
+#!python3
+# -*- coding: utf-8 -*-
+
+import time
+startup_time = time.perf_counter()  # начало запуска (отчет --startup-report)
+from tkinter import *
+from tkinter import ttk, filedialog, simpledialog, messagebox
+import sys, os, threading, queue
+from sql_core import StartupTimer, loadModules, Session, QueryTimer, QueryJob, ExportJob, ParallelExportJob, ImportJob, ResultSet, ResultView, PagedQuery, isSelect, tsvText, result_cache, closePools, parallel_degree, clipboard_warn_rows, ChunkWriter, compressedName, export_compression
+
+# Модуль драйвера базы данных (pyodbc для MS SQL Server) загружается в фоновом потоке после отрисовки окна
+DB = "cx_Oracle"
+INFO_TEXT = "Строка статуса"  # ошибка загрузки драйвера (для тестирования GUI без модуля драйвера базы данных)
+
+# Строка соединения с БД
+DATABASE_URI = 'user/password@IP:port/db_name'  # 'DRIVER={SQL Server};SERVER=tcp:IP,port;DATABASE=db_name;UID=user;PWD=password' для MS SQL Server
+
+# Переменные окружения (при необходимости)
+os.environ["NLS_LANG"] = "RUSSIAN_CIS.CL8MSWIN1251"
+
+# Путь для сохранения CSV
+dirname = os.path.expanduser("~\\Desktop")  # ссылка на рабочий стол
+
+# Имя файла CSV
+filename = os.path.join(dirname, "export.csv")
+
+# Разделитель строк в файле CSV
+end_line = "\n"
+
+# Разделитель полей в файле CSV
+separator = ";"
+
+# Кодировка текста
+text_codec = "cp1251"
+
+# Ограничение количества загружаемых строк (остальные по запросу), 0 - без ограничения
+row_limit = 10000
+
+# Кэш результатов SELECT-запросов: включен ли по умолчанию (объем и время жизни записи задаются в sql_core.py)
+result_cache_enabled = False
+
+# Количество строк для расчета ширины столбцов таблицы
+sample_rows = 100
+
+# Максимальная ширина столбца таблицы (в пикселях)
+max_column_width = 400
+
+
+class VirtualTreeview:
+    """Класс виртуальной прокрутки ttk.Treeview: элементы создаются только для видимых строк!"""
+
+    def __init__(self, tree, scrollbar, margin: int = 1) -> None:
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.margin = margin  # дополнительные строки ниже видимой области (частично видимая строка)
+        self.dataset = []  # строки результата (любая последовательность)
+        self.offset = 0  # индекс первой видимой строки
+        self.page = 25  # количество видимых строк
+        self.items = []  # переиспользуемые элементы Treeview
+        self.selected = set()  # индексы выделенных строк в self.dataset
+        self.measured = False
+
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind("<Configure>", self.resize)
+        self.tree.bind("<<TreeviewSelect>>", self.select)
+        self.tree.bind("<MouseWheel>", self.wheel)  # Windows, macOS
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))  # Linux
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Up>", lambda event: self.moveFocus(-1))
+        self.tree.bind("<Down>", lambda event: self.moveFocus(1))
+        self.tree.bind("<Prior>", lambda event: self.moveFocus(-self.page))
+        self.tree.bind("<Next>", lambda event: self.moveFocus(self.page))
+        self.tree.bind("<Control-Home>", lambda event: self.moveFocus(-len(self.dataset)))
+        self.tree.bind("<Control-End>", lambda event: self.moveFocus(len(self.dataset)))
+
+    def setData(self, dataset) -> None:
+        self.dataset = dataset
+        self.offset = 0
+        self.selected = set()
+        self.render()
+
+    def refresh(self) -> None:
+        # вызывается после добавления строк в self.dataset
+        if len(self.items) < self.page + self.margin:
+            self.render()
+        else:
+            self.updateScrollbar()
+
+    def render(self) -> None:
+        count = max(0, min(self.page + self.margin, len(self.dataset) - self.offset))
+        while len(self.items) < count:
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+
+        selection = []
+        rows = self.dataset[self.offset:self.offset + count]
+        numbers = self.dataset.index if isinstance(self.dataset, ResultView) else int  # номер строки в результате запроса
+        for k, iid in enumerate(self.items):
+            index = self.offset + k
+            self.tree.item(iid, text=numbers(index) + 1, values=[str(cell) for cell in rows[k]])
+            if index in self.selected:
+                selection.append(iid)
+        self.tree.selection_set(selection)
+        self.tree.yview_moveto(0)  # собственная прокрутка Treeview не используется
+        self.updateScrollbar()
+        if not self.measured and self.items:  # размер страницы по первой отрисованной строке
+            self.measured = True
+            self.tree.after_idle(self.resize)
+
+    def updateScrollbar(self) -> None:
+        total = len(self.dataset)
+        if total <= self.page:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.page) / total)
+
+    def scrollTo(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self.dataset) - self.page))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll(self, count: int) -> str:
+        self.scrollTo(self.offset + count)
+        return "break"
+
+    def yview(self, *args) -> None:
+        # команда полосы прокрутки: позиция переводится в индекс строки self.dataset
+        if args[0] == "moveto":
+            self.scrollTo(int(float(args[1]) * len(self.dataset)))
+        elif args[0] == "scroll":
+            count = int(args[1])
+            self.scroll(count * self.page if args[2] == "pages" else count)
+
+    def wheel(self, event) -> str:
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def resize(self, event=None) -> None:
+        bbox = self.tree.bbox(self.items[0]) if self.items else None
+        if bbox:  # высота заголовка и строки по первому элементу
+            page = max(1, (self.tree.winfo_height() - bbox[1]) // bbox[3])
+            if page != self.page:
+                self.page = page
+                self.offset = max(0, min(self.offset, len(self.dataset) - self.page))
+                self.render()
+
+    def select(self, event) -> None:
+        selection = self.tree.selection()
+        for k, iid in enumerate(self.items):
+            if iid in selection:
+                self.selected.add(self.offset + k)
+            else:
+                self.selected.discard(self.offset + k)
+        self.tree.yview_moveto(0)
+
+    def moveFocus(self, count: int) -> str:
+        if not self.dataset:
+            return "break"
+        focus = self.tree.focus()
+        index = self.offset + self.items.index(focus) if focus in self.items else self.offset
+        index = max(0, min(index + count, len(self.dataset) - 1))
+        if index < self.offset:
+            self.scrollTo(index)
+        elif index >= self.offset + self.page:
+            self.scrollTo(index - self.page + 1)
+        self.selected = {index}
+        self.render()
+        iid = self.items[index - self.offset]
+        self.tree.focus(iid)
+        return "break"
+
+    def current(self) -> int:
+        focus = self.tree.focus()
+        return self.offset + self.items.index(focus) if focus in self.items else -1
+
+    def showRow(self, index: int) -> None:
+        # прокрутка к строке с ее выделением (результат поиска)
+        if not self.offset <= index < self.offset + self.page:
+            self.scrollTo(index - self.page // 2)
+        self.selected = {index}
+        self.render()
+        if 0 <= index - self.offset < len(self.items):
+            self.tree.focus(self.items[index - self.offset])
+
+    def selectAll(self) -> str:
+        self.selected = set(range(len(self.dataset)))
+        self.render()
+        return "break"
+
+    def selectedCount(self) -> int:
+        return len(self.selected)
+
+    def selectedRows(self):
+        # итератор выделенных строк по порядку (строки берутся из self.dataset по мере чтения)
+        count = len(self.dataset)
+        return (self.dataset[i] for i in sorted(self.selected) if i < count)
+
+
+def memoryText(size):
+    return str(round(size / 1048576, 1)) + " MB"
+
+
+class SQLTab:
+    """Класс вкладки рабочей области: свой редактор, результат и сеанс базы данных!"""
+
+    def __init__(self, root, notebook, title):
+        self.root = root
+        self.title = title
+
+        self.dataset = None
+        self.headers = None
+        self.resultView = None  # порядок вывода строк (сортировка и фильтр)
+
+        self.job = None  # выполняемый SQL-запрос
+        self.messages = None  # сообщения фонового потока для GUI
+        self.paged = None  # постраничный просмотр результата
+        self.time_start = 0  # время начала запроса
+        self.session = Session()  # соединение вкладки (сохраняет состояние сеанса между запросами)
+
+        # create a menu
+        self.popup_label = Menu(root, tearoff=0)
+        self.popup_label.add_command(label="Копировать", command=self.copy_label)
+        self.popup_tree = Menu(root, tearoff=0)
+        self.popup_tree.add_command(label="Копировать", command=self.copy_tree)
+        self.popup_tree.add_command(label="Копировать с заголовками", command=lambda: self.copyRows(True))
+        self.popup_tree.add_command(label="Выделить все", command=self.view_select_all)
+        self.popup_text = Menu(root, tearoff=0)
+        self.popup_text.add_command(label="Копировать", command=self.copy_text)
+        self.popup_text.add_separator()
+        self.popup_text.add_command(label="Вставить", command=self.paste_text)
+
+        self.content = ttk.Frame(notebook, padding=(10, 10, 10, 0))
+        self.pw = ttk.Panedwindow(self.content, orient=VERTICAL, height=50)
+        self.sqlFrame = ttk.Labelframe(self.pw, text="SQL-запрос | :cr для курсора",
+                                       style="Gray.TLabelframe", padding=(10, 10, 10, 0))
+        self.sqlText = Text(self.sqlFrame, height=20, font="Consolas 12", foreground="#333333")
+        self.sqlText.bind("<Control-Key>", self.selectText)
+        self.sqlText.bind("<Button-3>", self.do_popup_text)
+        self.sqlText["wrap"] = "none"
+        self.sbX = Scrollbar(self.sqlFrame, orient=HORIZONTAL, command=self.sqlText.xview)
+        self.sqlText.configure(xscrollcommand=self.sbX.set)
+        self.sbY = Scrollbar(self.sqlFrame, orient=VERTICAL, command=self.sqlText.yview)
+        self.sqlText.configure(yscrollcommand=self.sbY.set)
+        self.sqlButtons = ttk.Frame(self.sqlFrame)
+        self.useCache = BooleanVar(value=result_cache_enabled)  # повторные SELECT-запросы берутся из кэша результатов
+        self.cacheCheck = ttk.Checkbutton(self.sqlButtons, text="Кэш", variable=self.useCache)
+        self.useProfile = BooleanVar(value=False)  # следующий запуск выполняется с cProfile и tracemalloc
+        self.profileCheck = ttk.Checkbutton(self.sqlButtons, text="Профиль", variable=self.useProfile)
+        self.usePaged = BooleanVar(value=False)  # страницы результата запрашиваются у сервера при прокрутке таблицы
+        self.pagedCheck = ttk.Checkbutton(self.sqlButtons, text="Постранично", variable=self.usePaged)
+        self.pagedKey = StringVar()  # уникальный столбец для выборки по ключу (без него - по OFFSET)
+        self.keyEntry = ttk.Entry(self.sqlButtons, textvariable=self.pagedKey, width=12)
+        self.sqlButton = ttk.Button(self.sqlButtons, text="Выполнить запрос", style="Gray.TButton", command=self.beginSQL)
+        self.explainButton = ttk.Button(self.sqlButtons, text="План / Профиль", style="Gray.TButton",
+                                        command=lambda: self.beginSQL(True))
+        self.directButton = ttk.Button(self.sqlButtons, text="Выгрузить в CSV напрямую", style="Gray.TButton",
+                                       command=self.beginDirect)
+        self.cancelButton = ttk.Button(self.sqlButtons, text="Отменить", style="Gray.TButton", command=self.cancelSQL)
+        self.directOptions = ttk.Frame(self.sqlFrame)  # параллельная выгрузка по диапазонам ключа
+        self.partLabel = ttk.Label(self.directOptions, text="Выгрузка по диапазонам столбца:", foreground="#333333")
+        self.partColumn = StringVar()  # пустой столбец - выгрузка одним запросом
+        self.partEntry = ttk.Entry(self.directOptions, textvariable=self.partColumn, width=20)
+        self.degreeLabel = ttk.Label(self.directOptions, text="соединений:", foreground="#333333")
+        self.partDegree = IntVar(value=parallel_degree)
+        self.degreeSpin = ttk.Spinbox(self.directOptions, from_=1, to=32, textvariable=self.partDegree, width=4)
+        self.partOrdered = BooleanVar(value=False)  # строки в файле упорядочены по столбцу
+        self.orderedCheck = ttk.Checkbutton(self.directOptions, text="По порядку", variable=self.partOrdered)
+        self.compressions = {"CSV": "", "CSV.gz": "gzip", "CSV.zst": "zstd"}  # сжатие файла выгрузки
+        self.compressName = StringVar(value=next(name for name, value in self.compressions.items()
+                                                 if value == export_compression))
+        self.compressCombo = ttk.Combobox(self.directOptions, textvariable=self.compressName, state="readonly",
+                                          values=list(self.compressions), width=8)
+        self.dataFrame = ttk.Labelframe(self.pw, text="Данные результата запроса", style="Gray.TLabelframe",
+                                        padding=(10, 10, 10, 0))
+        self.sqlResult = ttk.Treeview(self.dataFrame, height=25, style="Gray.Treeview")
+        self.sqlResult.bind("<Control-Key>", self.selectTree)
+        self.sqlResult.bind("<Button-3>", self.do_popup_tree)
+        self.sbXR = Scrollbar(self.dataFrame, orient=HORIZONTAL, command=self.sqlResult.xview)
+        self.sqlResult.configure(xscrollcommand=self.sbXR.set)
+        self.sbYR = Scrollbar(self.dataFrame, orient=VERTICAL)
+        self.view = VirtualTreeview(self.sqlResult, self.sbYR)
+        self.planText = Text(self.dataFrame, width=60, font="Consolas 10", foreground="#333333", wrap="none")
+        self.sbYP = Scrollbar(self.dataFrame, orient=VERTICAL, command=self.planText.yview)
+        self.planText.configure(yscrollcommand=self.sbYP.set)
+        self.dataButtons = ttk.Frame(self.dataFrame)
+        self.findText = StringVar()  # поиск по мере ввода, Enter - следующая строка
+        self.findText.trace_add("write", lambda *args: self.findRow(0))
+        self.findEntry = ttk.Entry(self.dataButtons, textvariable=self.findText, width=20)
+        self.findEntry.bind("<Return>", lambda event: self.findRow(1))
+        self.csvButton = ttk.Button(self.dataButtons, text="Экспортировать данные", style="Gray.TButton", command=self.beginCSV)
+        self.moreButton = ttk.Button(self.dataButtons, text="Загрузить еще", style="Gray.TButton", command=self.fetchMore)
+        self.allButton = ttk.Button(self.dataButtons, text="Загрузить все", style="Gray.TButton", command=self.fetchAll)
+        self.importButton = ttk.Button(self.dataButtons, text="Загрузить CSV в таблицу", style="Gray.TButton",
+                                       command=self.beginImport)
+        self.footer = ttk.Label(self.content, text=INFO_TEXT, font="Consolas 10", justify="right", foreground="#808080")
+        self.footer.bind("<Button-3>", self.do_popup_label)
+        self.pw.add(self.sqlFrame, weight=1)
+        self.pw.add(self.dataFrame, weight=1)
+
+        notebook.add(self.content, text=title)
+        self.pw.grid(column=0, row=0, sticky=(N, S, E, W))
+        self.sqlText.grid(column=0, row=0, sticky=(N, S, E, W))
+        self.sbX.grid(column=0, row=1, columnspan=2, sticky=(E, W))
+        self.sbY.grid(column=1, row=0, sticky=(N, S))
+        self.sqlButtons.grid(column=0, row=2, columnspan=2, sticky=(E, W), pady=10)
+        self.cacheCheck.grid(column=0, row=0, sticky=(W,), padx=(0, 10))
+        self.profileCheck.grid(column=1, row=0, sticky=(W,), padx=(0, 10))
+        self.pagedCheck.grid(column=2, row=0, sticky=(W,), padx=(0, 5))
+        self.keyEntry.grid(column=3, row=0, sticky=(W,), padx=(0, 10))
+        self.sqlButton.grid(column=4, row=0, sticky=(E, W))
+        self.explainButton.grid(column=5, row=0, sticky=(E, W), padx=(10, 0))
+        self.directButton.grid(column=6, row=0, sticky=(E, W), padx=(10, 0))
+        self.cancelButton.grid(column=7, row=0, sticky=(E, W), padx=(10, 0))
+        self.directOptions.grid(column=0, row=3, columnspan=2, sticky=(E,), pady=(0, 10))
+        self.partLabel.grid(column=0, row=0, sticky=(E,))
+        self.partEntry.grid(column=1, row=0, sticky=(E,), padx=(10, 0))
+        self.degreeLabel.grid(column=2, row=0, sticky=(E,), padx=(10, 0))
+        self.degreeSpin.grid(column=3, row=0, sticky=(E,), padx=(10, 0))
+        self.orderedCheck.grid(column=4, row=0, sticky=(E,), padx=(10, 0))
+        self.compressCombo.grid(column=5, row=0, sticky=(E,), padx=(10, 0))
+        self.sqlResult.grid(column=0, row=0, sticky=(N, S, E, W))
+        self.sbXR.grid(column=0, row=1, columnspan=2, sticky=(E, W))
+        self.sbYR.grid(column=1, row=0, sticky=(N, S))
+        self.planText.grid(column=2, row=0, sticky=(N, S, E, W), padx=(10, 0))
+        self.sbYP.grid(column=3, row=0, sticky=(N, S))
+        self.dataButtons.grid(column=0, row=2, columnspan=2, sticky=(E, W), pady=10)
+        self.findEntry.grid(column=0, row=0, sticky=(W,), padx=(0, 10))
+        self.csvButton.grid(column=1, row=0, sticky=(E, W))
+        self.moreButton.grid(column=2, row=0, sticky=(E, W), padx=(10, 0))
+        self.allButton.grid(column=3, row=0, sticky=(E, W), padx=(10, 0))
+        self.importButton.grid(column=4, row=0, sticky=(E, W), padx=(10, 0))
+        self.footer.grid(column=0, row=1, sticky=(E,), pady=5)
+
+        self.content.columnconfigure(0, weight=1)
+        self.content.rowconfigure(0, weight=1)
+        self.sqlFrame.columnconfigure(0, weight=1)
+        self.sqlFrame.rowconfigure(0, weight=1)
+        self.sqlButtons.columnconfigure(4, weight=1)
+        self.dataFrame.columnconfigure(0, weight=1)
+        self.dataFrame.rowconfigure(0, weight=1)
+        self.dataButtons.columnconfigure(1, weight=1)
+
+        self.csvButton["state"] = "disabled"
+        self.cancelButton["state"] = "disabled"
+        self.moreButton["state"] = "disabled"
+        self.allButton["state"] = "disabled"
+        self.sqlResult.heading("#0", text="№")
+        self.showPlan(None)  # панель плана показывается после запуска "План / Профиль"
+        self.sqlText.insert(1.0, "SELECT SYSDATE FROM DUAL")  # "SELECT CONVERT(VARCHAR, GETDATE(), 20) AS SYSDATE" для MS SQL Server
+
+    def do_popup_label(self, event):
+        # display the popup menu
+        try:
+            self.popup_label.tk_popup(event.x_root, event.y_root, 0)
+        finally:
+            # make sure to release the grab (Tk 8.0a1 only)
+            self.popup_label.grab_release()
+
+    def copy_label(self):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(self.footer["text"])
+        self.root.update()
+
+    def do_popup_tree(self, event):
+        if self.sqlResult.identify_region(event.x, event.y) == "heading":  # фильтр по столбцу
+            column = int(self.sqlResult.identify_column(event.x)[1:]) - 1
+            if column >= 0:
+                self.filterColumn(column)
+            return
+        # display the popup menu
+        try:
+            self.popup_tree.tk_popup(event.x_root, event.y_root, 0)
+        finally:
+            # make sure to release the grab (Tk 8.0a1 only)
+            self.popup_tree.grab_release()
+
+    def copy_tree(self):
+        self.copyRows()
+
+    def view_select_all(self):
+        self.view.selectAll()
+
+    def copyRows(self, headers=False):
+        # выделенные строки в буфер обмена текстом с табуляцией (вставка в Excel)
+        count = self.view.selectedCount()
+        if not count:
+            return
+        if count > clipboard_warn_rows and not messagebox.askyesno(
+                "Копирование", "Скопировать в буфер обмена строк: " + str(count) + "?\n"
+                "Для больших объемов быстрее выгрузка в CSV", parent=self.root):
+            return
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        time_start = time.perf_counter()
+        try:
+            if self.paged is not None:  # только строки загруженных страниц, без запросов к серверу
+                rows = self.paged.loadedRows(sorted(self.view.selected))
+                copied = len(rows)
+            else:
+                rows, copied = self.view.selectedRows(), count
+            text_copy = tsvText(rows, self.headers if headers else None)
+        except Exception as err:
+            text_copy = ""
+            self.footer["text"] = str(err)
+        else:
+            self.footer["text"] = ("Скопировано строк: " + str(copied) +
+                                   (" из " + str(count) + " (только загруженные страницы)" if copied < count else "") +
+                                   " (time = " + str(round(time.perf_counter() - time_start, 3)) + ")")
+        finally:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text_copy)
+            self.root.update()
+            self.root.config(cursor="")
+
+    def do_popup_text(self, event):
+        # display the popup menu
+        try:
+            self.popup_text.tk_popup(event.x_root, event.y_root, 0)
+        finally:
+            # make sure to release the grab (Tk 8.0a1 only)
+            self.popup_text.grab_release()
+
+    def copy_text(self):
+        try:
+            text_copy = self.sqlText.selection_get()
+        except:
+            text_copy = ""
+        finally:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(text_copy)
+            self.root.update()
+
+    def paste_text(self):
+        self.sqlText.insert("insert", self.root.clipboard_get())
+
+    def selectText(self, event):  # для русской раскладки (для английской и так работает)
+        if event.keycode == 67 and event.keysym == "??":  # копирование выделенного текста в буфер обмена
+            try:
+                text_copy = self.sqlText.selection_get()
+            except:
+                text_copy = ""
+            finally:
+                self.root.clipboard_clear()
+                self.root.clipboard_append(text_copy)
+                self.root.update()
+        elif event.keycode == 86 and event.keysym == "??":  # вставка текста из буфера обмена
+            self.sqlText.insert("insert", self.root.clipboard_get())
+
+    def selectTree(self, event):  # для любой раскладки
+        if event.keysym == "c" or (event.keycode == 67 and event.keysym == "??"):  # копирование выделенных строк в буфер обмена
+            self.copyRows()
+        elif event.keysym == "a" or (event.keycode == 65 and event.keysym == "??"):  # выделение всех строк
+            return self.view.selectAll()
+
+    def beginSQL(self, explain=False):
+        if self.job:  # закрытие предыдущего запроса, ожидающего загрузки строк
+            self.job.cancel()
+
+        if isinstance(self.dataset, (ResultSet, PagedQuery)):  # удаление файла подкачки и страниц предыдущего результата
+            self.dataset.close()
+        self.dataset = []
+        self.headers = None
+        self.resultView = None
+        if self.paged is not None:  # просмотр закрывается, даже если первая страница еще не получена
+            self.paged.close()
+        self.paged = None
+        self.footer["text"] = "Ожидание ..."
+        self.showPlan("Получение плана ..." if explain else None)
+
+        # очистка таблицы
+        self.view.setData(self.dataset)
+        self.sqlResult["columns"] = ()
+
+        sql = self.sqlText.get(1.0, "end")
+        if self.usePaged.get() and isSelect(sql) and ":cr" not in sql and not explain:
+            self.beginPaged(sql)
+            return
+
+        # с планом - без кэша, запрос выполняется до конца
+        job = QueryJob(sql, DATABASE_URI, DB, use_cache=self.useCache.get() and not explain, limit=row_limit, session=self.session)
+        job.explain = explain
+        self.startJob(job)
+
+    def showPlan(self, text):
+        # панель плана выполнения и статистики сервера справа от таблицы, None - панель скрыта
+        self.planText["state"] = "normal"
+        self.planText.delete(1.0, "end")
+        if text is None:
+            self.planText.grid_remove()
+            self.sbYP.grid_remove()
+            self.dataFrame.columnconfigure(2, weight=0)
+            return
+        self.planText.insert(1.0, text)
+        self.planText["state"] = "disabled"
+        self.planText.grid()
+        self.sbYP.grid()
+        self.dataFrame.columnconfigure(2, weight=1)
+
+    def beginPaged(self, sql):
+        # постраничный просмотр: в памяти только последние просмотренные страницы, следующая загружается заранее
+        self.footer["text"] = "Ожидание первой страницы ..."
+        messages = queue.Queue()
+        self.paged = PagedQuery(sql, DATABASE_URI, DB, lambda kind, payload: messages.put((kind, payload)),
+                                key=self.pagedKey.get().strip() or None)
+        self.paged.start()
+        self.root.after(100, self.pollPaged, self.paged, messages)
+
+    def pollPaged(self, paged, messages):
+        if paged is not self.paged:  # просмотр закрыт
+            return
+
+        changed = False
+        while not messages.empty():
+            kind, payload = messages.get_nowait()
+            if kind == "error":
+                self.footer["text"] = payload
+            else:
+                changed = True
+        if changed:
+            if self.dataset is not paged or self.headers != paged.headers:  # первая страница
+                self.showHeaders(paged.headers, paged)
+                paged.update()
+                self.view.render()
+                self.sizeColumns()
+            else:
+                paged.update()
+                self.view.render()
+            count = str(paged.count) if paged.count is not None else "?"
+            first = paged.timer.phases.get("first_row")
+            self.footer["text"] = ("Постранично (rows = " + count + ", pages in memory = " + str(paged.loaded()) +
+                                   (", first page = " + str(round(first, 3)) if first is not None else "") + ")")
+        self.root.after(100, self.pollPaged, paged, messages)
+
+    def beginDirect(self):
+        if self.job:  # закрытие предыдущего запроса, ожидающего загрузки строк (загруженные строки остаются в таблице)
+            self.job.cancel()
+
+        # выгрузка результата запроса в CSV-файл в фоновом потоке, минуя таблицу
+        self.footer["text"] = "Выгрузка ..."
+        column = self.partColumn.get().strip()
+        if column:  # диапазоны ключа выгружаются в отдельных соединениях параллельно
+            try:
+                degree = self.partDegree.get()
+            except TclError:
+                degree = parallel_degree
+            self.startJob(ParallelExportJob(self.sqlText.get(1.0, "end"), DATABASE_URI, filename, column, DB,
+                                            degree=degree, ordered=self.partOrdered.get(),
+                                            separator=separator, end_line=end_line, text_codec=text_codec,
+                                            compression=self.compression()))
+        else:
+            self.startJob(ExportJob(self.sqlText.get(1.0, "end"), DATABASE_URI, filename, DB,
+                                    separator=separator, end_line=end_line, text_codec=text_codec, session=self.session,
+                                    compression=self.compression()))
+
+    def compression(self):
+        return self.compressions[self.compressName.get()]
+
+    def beginImport(self):
+        path = filedialog.askopenfilename(parent=self.root, title="CSV-файл для загрузки", initialdir=dirname,
+                                          filetypes=[("CSV", "*.csv"), ("Все файлы", "*")])
+        if not path:
+            return
+        table = simpledialog.askstring("Загрузка CSV", "Таблица (столбцы - по строке заголовков файла):", parent=self.root)
+        if not table or not table.strip():
+            return
+        if self.job:
+            self.job.cancel()
+
+        # загрузка CSV-файла в таблицу в фоновом потоке пакетами executemany
+        self.footer["text"] = "Загрузка ..."
+        self.startJob(ImportJob(path, table.strip(), DATABASE_URI, DB,
+                                separator=separator, end_line=end_line, text_codec=text_codec, session=self.session))
+
+    def startJob(self, job):
+        self.csvButton["state"] = "disabled"
+        self.sqlButton["state"] = "disabled"
+        self.explainButton["state"] = "disabled"
+        self.directButton["state"] = "disabled"
+        self.importButton["state"] = "disabled"
+        self.cancelButton["state"] = "normal"
+        self.moreButton["state"] = "disabled"
+        self.allButton["state"] = "disabled"
+        self.root.config(cursor="watch")
+
+        # запуск запроса в фоновом потоке, сообщения забираются из очереди в pollSQL
+        self.messages = queue.Queue()
+        self.job = job
+        self.job.profile = self.useProfile.get()
+        self.useProfile.set(False)  # профилируется только один запуск
+        self.job.notify = lambda kind, payload, q=self.messages: q.put((kind, payload))
+        self.time_start = time.time()
+        threading.Thread(target=self.job.run, daemon=True).start()
+        self.root.after(100, self.pollSQL, self.job)
+
+    def cancelSQL(self):
+        if self.job:
+            self.cancelButton["state"] = "disabled"
+            self.footer["text"] = "Отмена запроса ..."
+            self.job.cancel()
+
+    def fetchMore(self):
+        self.fetchRows(row_limit)
+
+    def fetchAll(self):
+        self.fetchRows(0)
+
+    def fetchRows(self, count):
+        if self.job:
+            if self.resultView is not None and self.resultView.active():  # новые строки выводятся без сортировки и фильтра
+                self.resultView.reset()
+                self.showHeadings()
+                self.view.setData(self.resultView)
+            self.root.config(cursor="watch")
+            self.sqlButton["state"] = "disabled"
+            self.explainButton["state"] = "disabled"
+            self.directButton["state"] = "disabled"
+            self.moreButton["state"] = "disabled"
+            self.allButton["state"] = "disabled"
+            self.job.fetchMore(count)
+
+    def pollSQL(self, job):
+        if job is not self.job:  # запрос закрыт
+            return
+
+        time_end = time.time() + 0.05  # GUI не блокируется дольше 50 мс за один проход
+        while time.time() < time_end:
+            try:
+                kind, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "headers":
+                self.showHeaders(payload)
+            elif kind == "batch":
+                self.showRows(payload)
+            elif kind == "plan":  # план выполнения и статистика сервера
+                self.showPlan(payload)
+            else:  # запрос завершен или ожидает загрузки строк
+                self.execSQL(kind, payload)
+                if kind != "paused":
+                    return
+
+        if not job.cancelled and not job.paused():
+            delta_time = str(round(time.time() - self.time_start, 1))
+            if isinstance(job, ImportJob):
+                action = "Загрузка ... (rejected = " + str(job.rows_rejected) + ", "
+            else:
+                action = ("Выгрузка ..." if isinstance(job, ExportJob) else "Ожидание ...") + " ("
+            self.footer["text"] = (action + "rows = " + str(job.rows_fetched) + ", round trips = " + str(job.timer.round_trips) +
+                                   ", time = " + delta_time + ")")
+        self.root.after(10 if not self.messages.empty() else 100, self.pollSQL, job)
+
+    def showHeaders(self, headers, dataset=None):
+        self.headers = headers
+        self.dataset = ResultSet(self.headers) if dataset is None else dataset
+        self.resultView = ResultView(self.dataset)
+        self.view.setData(self.resultView)
+        self.sqlResult["columns"] = list(self.headers)
+        self.showHeadings()
+        self.sizeColumns()
+
+    def showRows(self, rows):
+        # вывод очередной порции строк (Treeview перерисовывается только если строки попали в видимую область)
+        self.job.timer.begin("render")
+        is_first = len(self.dataset) < sample_rows
+        self.dataset.extend(rows)
+        self.view.refresh()
+        if is_first or len(str(len(self.dataset))) != len(str(len(self.dataset) - len(rows))):
+            self.sizeColumns()
+        self.job.timer.end("render")
+        self.csvButton["state"] = "normal"
+
+    def showHeadings(self):
+        # заголовки: щелчок - сортировка, правая кнопка - фильтр; отмечены столбцы с сортировкой и фильтром
+        view = self.resultView
+        for j, head in enumerate(self.headers):
+            mark = ""
+            if view is not None and view.sort_column == j:
+                mark += " ▼" if view.descending else " ▲"
+            if view is not None and j in view.filters:
+                mark += " *"
+            self.sqlResult.heading(head, text=head + mark, command=lambda j=j: self.sortColumn(j))
+
+    def viewReady(self):
+        # сортировка и фильтр по загруженным строкам (не во время загрузки и не в постраничном режиме)
+        if self.paged is not None:
+            self.footer["text"] = "В постраничном режиме сортировка и фильтр задаются в SQL-запросе"
+            return False
+        if self.job and not self.job.paused():
+            self.footer["text"] = "Сортировка и фильтр доступны после загрузки строк"
+            return False
+        return self.resultView is not None
+
+    def showView(self, action, time_start):
+        self.showHeadings()
+        self.view.setData(self.resultView)
+        self.footer["text"] = (action + " (rows = " + str(len(self.resultView)) + " из " + str(len(self.dataset)) +
+                               ", time = " + str(round(time.perf_counter() - time_start, 3)) + ")")
+
+    def sortColumn(self, column):
+        if not self.viewReady():
+            return
+        # по возрастанию, по убыванию, исходный порядок
+        time_start = time.perf_counter()
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        if self.resultView.sort_column != column:
+            self.resultView.sort(column)
+        elif not self.resultView.descending:
+            self.resultView.sort(column, True)
+        else:
+            self.resultView.sort(None)
+        self.root.config(cursor="")
+        self.showView("Сортировка", time_start)
+
+    def filterColumn(self, column):
+        if not self.viewReady():
+            return
+        condition = simpledialog.askstring("Фильтр по столбцу " + self.headers[column],
+                                           "Условие: =, <>, >, >=, <, <= значение, a..b, = NULL или подстрока\n(пустое - без фильтра)",
+                                           initialvalue=self.resultView.filters.get(column, ""), parent=self.root)
+        if condition is None:
+            return
+        time_start = time.perf_counter()
+        self.root.config(cursor="watch")
+        self.root.update_idletasks()
+        self.resultView.filter(column, condition)
+        self.root.config(cursor="")
+        self.showView("Фильтр", time_start)
+
+    def findRow(self, step):
+        # поиск по всем столбцам с текущей строки при вводе текста, со следующей - по Enter
+        text = self.findText.get()
+        if not text or self.paged is not None or self.resultView is None or not len(self.resultView):
+            return
+        current = self.view.current()
+        start = current + step if current >= 0 else 0
+        row = self.resultView.find(text, start % len(self.resultView))
+        if row < 0:
+            self.footer["text"] = "Не найдено: " + text
+            return
+        self.view.showRow(row)
+
+    def sizeColumns(self):
+        # ширина столбцов по заголовкам и выборке первых строк (без просмотра всех ячеек)
+        max_first_width = (len(str(len(self.dataset))) * 10) + 40  # ширина первого столбца "#0"
+        max_col_width = [(len(str(w)) * 10) + 10 for w in self.headers]  # ширина основных столбцов
+        for j in range(len(self.headers)):
+            for cell in self.dataset.column(j, 0, sample_rows):
+                word = (len(str(cell)) * 10) + 10
+                if word > max_col_width[j]: max_col_width[j] = word
+
+        # устанавливаем ширину столбцов
+        self.sqlResult.column("#0", width=max(50, max_first_width), anchor="w")
+        for h, header in enumerate(self.headers):
+            self.sqlResult.column(header, width=min(max_col_width[h], max_column_width), anchor="w")
+
+    def execSQL(self, kind, payload):
+        self.root.config(cursor="")
+        self.sqlButton["state"] = "normal"
+        self.explainButton["state"] = "normal"
+        self.directButton["state"] = "normal"
+        self.importButton["state"] = "normal"
+
+        if kind == "paused":  # соединение остается открытым до загрузки остальных строк
+            rows_fetched, delta_time = payload
+            self.footer["text"] = "Загружено строк: " + str(rows_fetched) + ", есть еще данные (time = " + delta_time + ")"
+            self.moreButton["state"] = "normal"
+            self.allButton["state"] = "normal"
+            return
+
+        job, self.job = self.job, None
+        self.cancelButton["state"] = "disabled"
+        self.moreButton["state"] = "disabled"
+        self.allButton["state"] = "disabled"
+
+        if kind == "cached":  # результат из кэша
+            result, age = payload
+            self.showHeaders(result.headers, result)
+            self.sizeColumns()
+            self.footer["text"] = "Успешно (rows = " + str(len(self.dataset)) + ", cache = hit, age = " + str(round(age, 1)) + ")"
+        elif kind == "finished" and isinstance(job, ExportJob):
+            is_query, delta_time, cancelled = payload
+            result = "Выгрузка отменена" if cancelled else "Успешно"
+            self.footer["text"] = (result + " (" + job.filename + ", rows = " + str(job.rows_fetched) + ", size = " + memoryText(job.size) +
+                                   ", time = " + delta_time + ", " + job.timer.summary() + ")")
+        elif kind == "finished" and isinstance(job, ImportJob):
+            is_query, delta_time, cancelled = payload
+            result = "Загрузка отменена" if cancelled else "Успешно"
+            rejected = ", rejected = " + str(job.rows_rejected) + " (" + job.reject_file + ")" if job.rows_rejected else ""
+            self.footer["text"] = (result + " (" + job.table + ", rows = " + str(job.rows_fetched) + rejected + ", time = " + delta_time +
+                                   ", " + job.timer.summary() + ")")
+        elif kind in ("error", "cancelled"):
+            err = payload if kind == "error" else "Запрос отменен (" + payload + ")"
+            self.footer["text"] = err
+            self.root.clipboard_clear()
+            self.root.clipboard_append(err)
+            self.root.update()  # остается в буфере обмена после закрытия приложения
+        else:
+            is_query, delta_time, cancelled = payload
+            times = "time = " + delta_time + ", " + job.timer.summary()  # время по этапам выполнения запроса
+            if job.explain:  # строки сверх загруженных прочитаны для статистики сервера
+                times += ", read = " + str(job.timer.rows)
+            if job.cache_key is not None and is_query and not cancelled:
+                result_cache.put(job.cache_key, self.dataset)
+                times += ", cache = miss"
+            self.footer[
+                "text"] = "Успешно (" + times + ")"  # для SQL-запроса не на выборку (вставка, изменение, удаление)
+
+            if is_query:
+                if not self.dataset:
+                    self.footer["text"] = "Данных по запросу нет (" + times + ")"
+                else:
+                    rows = str(len(self.dataset)) + (", spilled = " + str(self.dataset.spilled()) if self.dataset.spilled() else "")
+                    self.footer["text"] = "Успешно (rows = " + rows + ", " + times + ")"
+                if cancelled:
+                    self.footer["text"] = "Запрос отменен (rows = " + str(len(self.dataset)) + ", " + times + ")"
+
+        job.timer.save("cancelled" if job.cancelled else kind)
+        self.csvButton["state"] = "normal" if self.dataset else "disabled"
+
+    def beginCSV(self):
+        if self.paged is not None:  # постраничный результат выгружается только напрямую
+            self.footer["text"] = "Для постраничного просмотра используйте выгрузку в CSV напрямую"
+            return
+        self.footer["text"] = "Ожидание ..."  # self.footer.update()
+        self.root.config(cursor="wait")  # self.root.update()
+
+        self.root.after(150, self.execCSV)  # обновляется GUI до запуска следующей задачи
+
+    def execCSV(self):
+        timer = QueryTimer(source="grid")
+        timer.begin("export")
+        path = compressedName(filename, self.compression())
+        try:  # Запись CSV-файла (порции кодируются и сжимаются в пуле процессов)
+            with open(path, 'wb') as f:
+                w = ChunkWriter(f, separator, end_line, text_codec, self.compression())
+                if self.headers:
+                    w.write([self.headers])  # для правильного отображения заголовков в одну строку CSV файла
+                if self.dataset:
+                    w.write(self.resultView)  # строки в порядке сортировки, с учетом фильтра
+                w.flush()
+            timer.end("export")
+            timer.rows = len(self.resultView or [])
+            timer.save("finished")
+            self.footer["text"] = "Успешно (" + path + ", size = " + memoryText(w.size) + ", " + timer.summary() + ")"
+        except Exception as err:
+            self.footer["text"] = str(err)
+
+        self.root.config(cursor="")
+
+    def memoryUsage(self):
+        # объем результата вкладки в памяти (строки в файле подкачки не учитываются)
+        return self.dataset.nbytes() if isinstance(self.dataset, (ResultSet, PagedQuery)) else 0
+
+    def closeTab(self):
+        if self.job:  # прерывание выполняемого запроса при закрытии вкладки
+            self.job.cancel()
+        if self.paged:
+            self.paged.close()
+        if isinstance(self.dataset, ResultSet):  # удаление файла подкачки результата
+            self.dataset.close()
+        self.job = self.paged = self.dataset = None  # опрос очередей закрытых запросов прекращается
+        self.session.close()
+
+
+class SQLToolsGUI:
+    """Класс рабочей области: запросы вкладок выполняются одновременно в фоновых потоках!"""
+
+    def __init__(self, root, startup=None):
+        self.root = root
+        self.startup = startup or StartupTimer(time.perf_counter())  # замер времени запуска
+        root.title("SQL tools")
+        root.minsize(width=600, height=375)
+        root.geometry("920x575-10+10")
+
+        self.tab_number = 0  # номер последней открытой вкладки
+        self.tabs = {}  # имя фрейма вкладки -> SQLTab
+
+        self.labelframe_style = ttk.Style()
+        self.labelframe_style.configure("Gray.TLabelframe.Label", font="Consolas 10", foreground="#808080")
+        self.tree_style = ttk.Style()
+        self.tree_style.configure("Gray.Treeview", font="Consolas 12", foreground="#333333")
+        self.btn_style = ttk.Style()
+        self.btn_style.configure("Gray.TButton", font="Consolas 12", foreground="#333333")
+
+        self.notebook = ttk.Notebook(root)
+        self.notebook.bind("<Button-2>", self.middleClick)  # закрытие вкладки средней кнопкой
+        self.tabButtons = ttk.Frame(root, padding=(10, 0, 10, 5))
+        self.newButton = ttk.Button(self.tabButtons, text="Новая вкладка", style="Gray.TButton", command=self.addTab)
+        self.closeButton = ttk.Button(self.tabButtons, text="Закрыть вкладку", style="Gray.TButton",
+                                      command=lambda: self.closeTab(self.notebook.select()))
+        self.memoryLabel = ttk.Label(self.tabButtons, font="Consolas 10", foreground="#808080")
+
+        self.notebook.grid(column=0, row=0, sticky=(N, S, E, W))
+        self.tabButtons.grid(column=0, row=1, sticky=(E, W))
+        self.newButton.grid(column=0, row=0, sticky=(W,))
+        self.closeButton.grid(column=1, row=0, sticky=(W,), padx=(10, 0))
+        self.memoryLabel.grid(column=2, row=0, sticky=(E,), padx=(10, 0))
+
+        root.columnconfigure(0, weight=1)
+        root.rowconfigure(0, weight=1)
+        self.tabButtons.columnconfigure(2, weight=1)
+        root.bind("<Control-t>", lambda event: self.addTab())
+        root.bind("<Control-w>", lambda event: self.closeTab(self.notebook.select()))
+        root.protocol("WM_DELETE_WINDOW", self.closeWindow)
+
+        self.addTab()
+        self.updateMemory()
+        self.startup.mark("window")
+        root.after_idle(lambda: root.after(0, self.startDeferred))  # драйвер загружается после отрисовки окна
+
+    def startDeferred(self):
+        # после первой отрисовки окна: заставка PyInstaller, драйвер БД в фоновом потоке
+        self.startup.mark("paint")
+        try:  # заставка сборки PyInstaller с --splash
+            import pyi_splash
+            pyi_splash.close()
+        except ImportError:
+            pass
+        messages = queue.Queue()
+        loadModules([DB] if isinstance(DB, str) else [], lambda kind, payload: messages.put((kind, payload)))
+        self.root.after(50, self.pollModules, messages)
+
+    def pollModules(self, messages):
+        global INFO_TEXT
+        while not messages.empty():
+            kind, payload = messages.get_nowait()
+            if kind == "loaded":
+                name, seconds, error = payload
+                if error:  # ошибка в строке статуса всех вкладок (и новых) и в буфере обмена
+                    INFO_TEXT = error
+                    for tab in self.tabs.values():
+                        tab.footer["text"] = error
+                    self.root.clipboard_clear()
+                    self.root.clipboard_append(INFO_TEXT)
+                    self.root.update()
+                continue
+            self.startup.mark("driver")
+            if "--startup-report" in sys.argv:
+                print(self.startup.report(["sql_tool_tk"] + ([DB] if isinstance(DB, str) else [])))
+                self.tabs[self.notebook.select()].footer["text"] = "Запуск: " + self.startup.summary()
+            self.startup.save("finished")
+            return
+        self.root.after(50, self.pollModules, messages)
+
+    def addTab(self):
+        self.tab_number += 1
+        tab = SQLTab(self.root, self.notebook, "Запрос " + str(self.tab_number))
+        self.tabs[str(tab.content)] = tab
+        self.notebook.select(tab.content)
+        tab.sqlText.focus()
+
+    def closeTab(self, name):
+        tab = self.tabs.pop(str(name), None)
+        if tab is None:
+            return
+        tab.closeTab()
+        self.notebook.forget(tab.content)
+        tab.content.destroy()
+        if not self.tabs:
+            self.addTab()
+
+    def middleClick(self, event):
+        try:
+            index = self.notebook.index("@" + str(event.x) + "," + str(event.y))
+        except TclError:
+            return
+        self.closeTab(self.notebook.tabs()[index])
+
+    def updateMemory(self):
+        # объем результата каждой вкладки в ее заголовке, * - выполняется запрос
+        total, largest = 0, None
+        for name, tab in self.tabs.items():
+            size = tab.memoryUsage()
+            total += size
+            if size and (largest is None or size > largest.memoryUsage()):
+                largest = tab
+            running = " *" if tab.job is not None and not tab.job.paused() else ""
+            self.notebook.tab(name, text=tab.title + running + (" [" + memoryText(size) + "]" if size else ""))
+        self.memoryLabel["text"] = ("Память результатов: " + memoryText(total) +
+                                    (" (больше всего - " + largest.title + ")" if largest is not None else "") +
+                                    ", кэш: " + memoryText(result_cache.size))
+        self.root.after(1000, self.updateMemory)
+
+    def closeWindow(self):
+        for tab in self.tabs.values():  # прерывание выполняемых запросов при закрытии окна
+            tab.closeTab()
+        self.root.destroy()
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()  # процессы кодирования CSV в собранном PyInstaller приложении
+    startup = StartupTimer(startup_time)
+    startup.mark("import")
+    app = Tk()
+    gui = SQLToolsGUI(app, startup)
+    app.mainloop()
+    closePools()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты кэша результатов: ключ запроса, время жизни, вытеснение по объему"""
+
+import sqlite3, time
+
+import sql_core
+
+
+def result(rows: int):
+    data = sql_core.ResultSet(["ID"])
+    data.extend([(i,) for i in range(rows)])
+    return data
+
+
+def test_key_depends_on_driver_and_normalized_sql():
+    cache = sql_core.ResultCache()
+    key = cache.key("sqlite3", "db", "select *\n  from t", [1])
+    assert key == cache.key(sqlite3, "db", "SELECT * FROM t", (1,))
+    assert key != cache.key("pyodbc", "db", "select * from t", [1])
+    assert key != cache.key("sqlite3", "db", "select * from t", [2])
+
+
+def test_entry_expires_after_ttl():
+    cache = sql_core.ResultCache(ttl=0.05)
+    key = cache.key("sqlite3", "db", "select 1")
+    data = result(10)
+    cache.put(key, data)
+    cached, age = cache.get(key)
+    assert cached is data and age < 0.05
+    time.sleep(0.1)
+    assert cache.get(key) is None
+    assert not cache.entries and cache.size == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    size = result(100).nbytes()
+    cache = sql_core.ResultCache(max_bytes=size * 2)
+    keys = [cache.key("sqlite3", "db", "select " + str(i)) for i in range(3)]
+    cache.put(keys[0], result(100))
+    cache.put(keys[1], result(100))
+    cache.get(keys[0])  # первая запись использована последней
+    cache.put(keys[2], result(100))
+    assert list(cache.entries) == [keys[0], keys[2]]
+    assert cache.size == size * 2
+    cache.put(keys[1], result(100000))  # больше всего кэша - не кэшируется
+    assert keys[1] not in cache.entries
+
+
+def test_spilled_result_is_not_cached():
+    cache = sql_core.ResultCache()
+    data = sql_core.ResultSet(["ID"], budget=1)
+    data.extend([(1,)])
+    data.extend([(2,)])
+    try:
+        cache.put(cache.key("sqlite3", "db", "select 1"), data)
+        assert not cache.entries
+    finally:
+        data.close()
+
+
+def test_query_job_uses_cache(database, run_job, monkeypatch):
+    cache = sql_core.ResultCache()
+    monkeypatch.setattr(sql_core, "result_cache", cache)
+    job = sql_core.QueryJob("select * from t", database, "sqlite3", use_cache=True)
+    data = result(5)
+    cache.put(job.cache_key, data)
+    kind, payload = run_job(job)[-1]
+    assert kind == "cached" and payload[0] is data
+    other = sql_core.QueryJob("select * from t", database, sqlite3, use_cache=True)
+    assert other.cache_key == job.cache_key
+    assert sql_core.QueryJob("update t set s = 1", database, "sqlite3", use_cache=True).cache_key is None
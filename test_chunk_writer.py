@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты записи CSV порциями: сжатие, пул процессов, объединение файлов диапазонов"""
+
+import csv, gzip, io
+
+import sql_core
+
+
+def test_chunk_writer_gzip_matches_plain():
+    rows = [(i, "строка;" + str(i), i / 3) for i in range(5000)]
+    plain, packed = io.BytesIO(), io.BytesIO()
+    writer = sql_core.ChunkWriter(plain, compression="", processes=1)
+    writer.write(rows)
+    writer.flush()
+    writer = sql_core.ChunkWriter(packed, compression="gzip", processes=1, chunk_rows=700)
+    writer.write(iter(rows))
+    writer.flush()
+    assert writer.size == len(packed.getvalue())
+    assert gzip.decompress(packed.getvalue()) == plain.getvalue()
+    with io.TextIOWrapper(io.BytesIO(plain.getvalue()), encoding=sql_core.text_codec, newline="") as f:
+        assert list(csv.reader(f, delimiter=sql_core.separator))[1][1] == "строка;1"
+
+
+def test_chunk_writer_append():
+    first, second = io.BytesIO(), io.BytesIO()
+    writer = sql_core.ChunkWriter(first, compression="gzip", processes=1)
+    other = sql_core.ChunkWriter(second, compression="gzip", processes=1)
+    writer.write([("a",)])
+    other.write([("b",)])
+    writer.append(other)
+    writer.flush()
+    assert gzip.decompress(first.getvalue()).split() == [b"a", b"b"]
+
+
+def test_process_pool_per_size():
+    pool = sql_core.getProcessPool(2)
+    assert sql_core.getProcessPool(2) is pool
+    other = sql_core.getProcessPool(3)
+    assert other is not pool and other._max_workers == 3
+    rows = [(i, "x" * 20) for i in range(3000)]
+    packed = io.BytesIO()
+    writer = sql_core.ChunkWriter(packed, compression="gzip", processes=2, chunk_rows=500)
+    assert writer.pool is pool
+    writer.write(rows)
+    writer.flush()
+    assert gzip.decompress(packed.getvalue()).count(b"\n") == 3000
+    sql_core.closePools()
+    assert not sql_core.process_pools
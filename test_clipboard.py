@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты копирования строк в буфер обмена: текст с табуляцией, строки загруженных страниц"""
+
+import sql_core
+
+
+def test_tsv_text_cleans_values():
+    rows = [(1, "a\tb", None), (2.5, "c\r\nd", "e")]
+    assert sql_core.tsvText(rows) == "1\ta b\t\n2.5\tc  d\te\n"
+
+
+def test_tsv_text_headers_and_columns():
+    rows = [(1, "a", "x"), (2, "b", "y")]
+    assert sql_core.tsvText(rows, ["ID", "S", "T"], [0, 2]) == "ID\tT\n1\tx\n2\ty\n"
+    assert sql_core.tsvText([], ["ID"]) == "ID\n"
+    assert sql_core.tsvText([]) == ""
+
+
+def test_tsv_text_chunks():
+    rows = [(i, "s" + str(i)) for i in range(25)]
+    assert sql_core.tsvText(iter(rows), chunk_size=7) == sql_core.tsvText(rows)
+
+
+def test_paged_copy_uses_loaded_pages_only(database):
+    paged = sql_core.PagedQuery("select id from t", database, "sqlite3", page_size=100, notify=lambda kind, payload: None)
+    requested = []
+    paged.request = requested.append  # запросы страниц к серверу при копировании не выполняются
+    try:
+        paged.load(0)
+        assert paged.loadedRows(range(95, 105)) == [(i,) for i in range(95, 100)]
+        assert paged.loadedRows([1500]) == []
+        assert not requested
+    finally:
+        paged.close()
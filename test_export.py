@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты параллельной выгрузки в CSV по диапазонам ключа"""
+
+import csv, sqlite3
+
+import sql_core
+
+
+def test_parallel_export_trailing_comment(database, tmp_path, run_job):
+    filename = str(tmp_path / "out.csv")
+    job = sql_core.ParallelExportJob("select * from t -- x", database, filename, "id", "sqlite3", degree=4, ordered=True, processes=1)
+    kind, payload = run_job(job)[-1]
+    assert kind == "finished", payload
+    with open(filename, encoding=sql_core.text_codec, newline="") as f:
+        ids = [int(row[0]) for row in list(csv.reader(f, delimiter=sql_core.separator))[1:]]
+    assert ids == list(range(2000))
+
+
+def test_parallel_export_encode_error(database, tmp_path, run_job):
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE t SET s = '日本' WHERE id = 1500")
+    conn.commit()
+    conn.close()
+    job = sql_core.ParallelExportJob("select * from t", database, str(tmp_path / "out.csv"), "id", "sqlite3",
+                                     degree=4, text_codec="cp1251", processes=1)
+    kind, payload = run_job(job)[-1]
+    assert kind == "error"
+    assert "cp1251" in payload or "charmap" in payload
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты подбора размера порции выборки по ширине строки, скорости и профилю соединения"""
+
+import types
+
+import sql_core
+
+
+def cursor(*sizes):
+    # курсор с cursor.description: (имя, тип, display_size, internal_size, ...)
+    return types.SimpleNamespace(description=[("c" + str(i), None, None, size, None, None, None)
+                                              for i, size in enumerate(sizes)], arraysize=1)
+
+
+def test_size_by_row_width():
+    tuner = sql_core.FetchTuner()
+    target = cursor(100, 100, 56)
+    tuner.start(target)
+    assert tuner.size == sql_core.fetch_target_bytes // 256
+    assert target.arraysize == tuner.size
+
+
+def test_size_is_clamped():
+    tuner = sql_core.FetchTuner()
+    tuner.start(cursor(*[sql_core.FetchTuner.max_width] * 200))  # широкие строки и LOB
+    assert tuner.size == sql_core.fetch_min_size
+    tuner.start(cursor(1))
+    assert tuner.size == sql_core.fetch_max_size
+    tuner.start(cursor(None, 0))  # размер столбцов неизвестен
+    assert tuner.size == sql_core.fetch_target_bytes // (2 * sql_core.FetchTuner.default_width)
+
+
+def test_observe_limits_fetch_time():
+    tuner = sql_core.FetchTuner()
+    target = cursor(8)
+    tuner.start(target)
+    rows = [(i, "x" * 10) for i in range(tuner.size)]
+    tuner.observe(target, rows, len(rows) / 1000)  # 1000 строк в секунду
+    assert tuner.size == int(1000 * sql_core.fetch_max_seconds)
+    assert target.arraysize == tuner.size
+    tuner.observe(target, rows[:10], 100)  # неполная порция не учитывается
+    assert tuner.size == int(1000 * sql_core.fetch_max_seconds)
+
+
+def test_profile_arraysize_is_fixed(monkeypatch):
+    monkeypatch.setattr(sql_core, "connection_profiles", {"db": {"arraysize": 777, "prefetchrows": 50}})
+    tuner = sql_core.FetchTuner("db")
+    target = cursor(8)
+    target.prefetchrows = 0
+    tuner.prepare(target)
+    tuner.start(target)
+    tuner.observe(target, [(1,)] * 777, 100)
+    assert tuner.size == 777 and target.arraysize == 777 and target.prefetchrows == 50
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты загрузки CSV в таблицу: типы столбцов, ошибки, фиксация пакетов"""
+
+import sqlite3
+
+import pytest
+
+import sql_core
+
+
+@pytest.mark.parametrize("values, kind", [
+    (["1", "-20", ""], "int"),
+    (["1", "2.5", "-1e3"], "float"),
+    (["", ""], "str"),  # нет значений в образце
+    (["001", "2"], "str"),
+    (["+1", "2"], "str"),
+    (["1_000"], "str"),
+    ([" 1"], "str"),
+    (["0.5", "00.5"], "str"),
+    (["nan", "inf"], "str"),
+])
+def test_infer_types(values, kind):
+    job = sql_core.ImportJob("data.csv", "t", "db", "sqlite3")
+    assert job.inferTypes(["c"], [[value] for value in values], sqlite3) == [kind]
+
+
+def test_import_keeps_codes_and_late_text(database, tmp_path, run_job):
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE c (code, note)")
+    conn.commit()
+    conn.close()
+    path = tmp_path / "data.csv"
+    lines = ["code;note"] + ["%03d;" % i for i in range(sql_core.import_sample_rows)] + ["0099;hello world"]
+    path.write_text("\n".join(lines) + "\n", encoding=sql_core.text_codec)
+    kind, payload = run_job(sql_core.ImportJob(str(path), "c", database, "sqlite3"))[-1]
+    assert kind == "finished", payload
+    conn = sqlite3.connect(database)
+    rows = conn.execute("SELECT code, note FROM c ORDER BY rowid").fetchall()
+    conn.close()
+    assert rows[:2] == [("000", None), ("001", None)]
+    assert rows[-1] == ("0099", "hello world")
+
+
+def test_import_unknown_type(database, tmp_path, run_job):
+    path = tmp_path / "data.csv"
+    path.write_text("id;s\n1;a\n", encoding=sql_core.text_codec)
+    job = sql_core.ImportJob(str(path), "t", database, "sqlite3", types={"id": "integer"})
+    kind, payload = run_job(job)[-1]
+    assert kind == "error" and "integer" in payload
+
+
+def test_import_rolls_back_uncommitted_rows(database, tmp_path, run_job, row_count):
+    # поле длиннее csv.field_size_limit после образца строк: зафиксированными остаются только полные commit_rows
+    path = tmp_path / "data.csv"
+    lines = ["id;s"] + [str(i) + ";x" for i in range(sql_core.import_sample_rows + 500)] + ["1;" + "x" * 200000]
+    path.write_text("\n".join(lines) + "\n", encoding=sql_core.text_codec)
+    before = row_count(database)
+    job = sql_core.ImportJob(str(path), "t", database, "sqlite3", batch_size=250, commit_rows=1000)
+    kind, payload = run_job(job)[-1]
+    assert kind == "error"
+    assert row_count(database) - before == 1000
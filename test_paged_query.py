@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты постраничного просмотра: текст запроса страницы, загрузка страниц"""
+
+import sqlite3, threading, types
+
+import pytest
+
+import sql_core
+
+
+pyodbc = types.SimpleNamespace(__name__="pyodbc")  # для текста запроса модуль драйвера не нужен
+
+
+@pytest.mark.parametrize("sql", [
+    "select * from (select top 5 * from t order by id) q",
+    "select row_number() over (order by id) n from t",
+    "select 'order by' from t -- order by id",
+])
+def test_mssql_page_adds_order_by(sql):
+    paged = sql_core.PagedQuery(sql, "db", pyodbc, page_size=100)
+    page, params = paged.pageSQL(pyodbc, 2)
+    paged.close()
+    assert page == sql_core.trimSQL(sql) + " ORDER BY (SELECT NULL) OFFSET 200 ROWS FETCH NEXT 100 ROWS ONLY"
+    assert params == []
+
+
+def test_mssql_page_keeps_own_order_by():
+    sql = "select * from t where id in (select id from u) order by id"
+    paged = sql_core.PagedQuery(sql, "db", pyodbc, page_size=100)
+    page, params = paged.pageSQL(pyodbc, 0)
+    paged.close()
+    assert page == sql + " OFFSET 0 ROWS FETCH NEXT 100 ROWS ONLY"
+
+
+@pytest.mark.parametrize("sql", ["select * from t -- x", "select * from t;\n-- x\n", "select * from t /* x */ ;"])
+def test_trim_sql(sql):
+    assert sql_core.trimSQL(sql) == "select * from t"
+    assert sql_core.trimSQL("select '--;' from t") == "select '--;' from t"
+
+
+@pytest.mark.parametrize("key", [None, "id"])
+def test_paged_query_trailing_comment(database, key):
+    loaded = threading.Event()
+    paged = sql_core.PagedQuery("select * from t -- x", database, "sqlite3", key=key, page_size=500,
+                                notify=lambda kind, payload: loaded.set() if kind in ("page", "error") else None)
+    sql, params = paged.pageSQL(sqlite3, 1)
+    assert "-- x" not in sql
+    paged.start()
+    assert loaded.wait(10)
+    paged.load(1)  # следующая страница (по ключу - после последнего id первой страницы)
+    pages = {index: [row[0] for row in rows] for index, rows in paged.pages.items()}
+    paged.close()
+    assert pages == {0: list(range(500)), 1: list(range(500, 1000))}
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты плана выполнения: SQLite на временной базе, разбор плана Oracle и MS SQL Server по образцам вывода сервера"""
+
+import types
+
+import sql_core
+
+
+def explain(database, run_job, sql="select * from t where id = 5"):
+    job = sql_core.QueryJob(sql, database, "sqlite3")
+    job.explain = True
+    messages = run_job(job)
+    assert messages[-1][0] == "finished", messages[-1]
+    job.timer.save("finished")  # как GUI после выполнения запроса
+    return job, [payload for kind, payload in messages if kind == "plan"][0]
+
+
+def test_sqlite_plan_and_full_scan(database, run_job):
+    job, text = explain(database, run_job)
+    plan = job.timer.record["plan"]
+    assert plan["dialect"] == "sqlite" and plan["shape"] == plan["plan"]
+    assert any(note.startswith("полный просмотр") for note in plan["notes"])
+    assert text.startswith("План (sqlite):") and "Замечания:" in text
+
+
+def test_plan_compared_with_previous_run(database, run_job, tmp_path, monkeypatch):
+    monkeypatch.setattr(sql_core, "timing_log", str(tmp_path / "timing.jsonl"))
+    text = explain(database, run_job)[1]
+    assert "План не изменился" not in text and "План изменился" not in text  # первый запуск
+    assert "План не изменился" in explain(database, run_job)[1]
+    with sql_core.UseDatabase(database, "sqlite3") as cursor:  # индекс создается в том же соединении пула
+        cursor[0].execute("CREATE INDEX t_id ON t (id)")
+    text = explain(database, run_job, "SELECT * FROM t WHERE id = 5")[1]
+    assert "План изменился" in text and "+" in text.split("План изменился", 1)[1]
+
+
+def capture(driver: str, results: dict = None):
+    # PlanCapture без соединения: служебные запросы возвращают строки results по началу текста запроса
+    plan = sql_core.PlanCapture("select * from t", [], types.SimpleNamespace(__name__=driver), None)
+    plan.execute = lambda sql, params=(): next(rows for prefix, rows in results.items() if sql.startswith(prefix))
+    return plan
+
+
+def test_oracle_plan():
+    lines = ["SQL_ID  abc, child number 0",
+             "-------------------------------------------------------------------",
+             "| Id  | Operation          | Name | Starts | E-Rows | A-Rows |",
+             "-------------------------------------------------------------------",
+             "|   0 | SELECT STATEMENT   |      |      1 |        |   5000 |",
+             "|*  1 |  TABLE ACCESS FULL | T    |      1 |     10 |   5000 |",
+             "-------------------------------------------------------------------"]
+    plan = capture("cx_Oracle", {"SELECT prev_sql_id": [("abc", 0)],
+                                 "SELECT plan_table_output": [(line,) for line in lines],
+                                 "SELECT plan_hash_value": [(123, 1, 500, 400, 100, 0, 5000)]})
+    plan.oraclePlan()
+    assert plan.plan == lines
+    assert plan.shape == ["SELECT STATEMENT", " TABLE ACCESS FULL T"]
+    assert plan.stats["plan_hash_value"] == 123 and plan.stats["sql_id"] == "abc"
+    assert plan.notes == ["полный просмотр: TABLE ACCESS FULL T", "оценка строк 10, факт 5000: TABLE ACCESS FULL T"]
+    assert sql_core.planRows("15K") == 15000 and sql_core.planRows(" ") is None
+
+
+def test_mssql_statistics_and_showplan():
+    plan = capture("pyodbc")
+    plan.messages = ["Table 't'. Scan count 1, logical reads 10, physical reads 2.",
+                     "Table 't'. Scan count 1, logical reads 5, physical reads 0.",
+                     "SQL Server parse and compile time: \n   CPU time = 3 ms, elapsed time = 4 ms.",
+                     "SQL Server Execution Times:\n   CPU time = 15 ms,  elapsed time = 20 ms."]
+    plan.mssqlPlan()
+    assert plan.stats["io"] == {"t": {"scan count": 2, "logical reads": 15, "physical reads": 2}}
+    assert (plan.stats["cpu_ms"], plan.stats["elapsed_ms"], plan.stats["compile_cpu_ms"]) == (15, 20, 3)
+
+    plan.showplan('<?xml version="1.0" encoding="utf-16"?>'
+                  '<ShowPlanXML xmlns="http://schemas.microsoft.com/sqlserver/2004/07/showplan"><BatchSequence><Batch>'
+                  '<Statements><StmtSimple><QueryPlan>'
+                  '<RelOp PhysicalOp="Hash Match" LogicalOp="Inner Join" EstimateRows="100" EstimatedTotalSubtreeCost="1.5">'
+                  '<RunTimeInformation><RunTimeCountersPerThread Thread="0" ActualRows="5000"/></RunTimeInformation>'
+                  '<Hash><RelOp PhysicalOp="Table Scan" LogicalOp="Table Scan" EstimateRows="2000" EstimatedTotalSubtreeCost="0.5">'
+                  '<RunTimeInformation><RunTimeCountersPerThread Thread="0" ActualRows="2000"/></RunTimeInformation>'
+                  '<TableScan><Object Database="[db]" Schema="[dbo]" Table="[t]"/></TableScan></RelOp></Hash>'
+                  '</RelOp></QueryPlan></StmtSimple></Statements></Batch></BatchSequence></ShowPlanXML>')
+    assert plan.shape == ["Hash Match (Inner Join)", "  Table Scan t"]
+    assert plan.plan[0] == "Hash Match (Inner Join)  [оценка 100, факт 5000, стоимость 1.5]"
+    assert plan.notes == ["оценка строк 100, факт 5000: Hash Match (Inner Join)", "полный просмотр: Table Scan t"]
+    assert "Статистика сервера:" in plan.text() and "io t: scan count = 2" in plan.text()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты пула соединений: переиспользование, ограничение размера, проверка и закрытие простаивающих соединений"""
+
+import sqlite3, threading, time
+
+import sql_core
+
+
+def test_connection_is_reused(database):
+    pool = sql_core.ConnectionPool(database, sqlite3)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    assert pool.size == 1
+
+
+def test_acquire_waits_for_free_connection(database):
+    pool = sql_core.ConnectionPool(database, sqlite3, max_size=1)
+    first = pool.acquire()
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(pool.acquire()), daemon=True)
+    thread.start()
+    thread.join(0.3)
+    assert not acquired  # пул заполнен: второй запрос ждет
+    pool.release(first)
+    thread.join(5)
+    assert acquired == [first] and pool.size == 1
+
+
+def test_pinned_connection_does_not_take_pool_place(database):
+    pool = sql_core.ConnectionPool(database, sqlite3, max_size=1)
+    pinned = pool.acquire(pinned=True)
+    conn = pool.acquire()  # место в пуле не занято соединением сеанса
+    assert conn is not pinned and pool.size == 2 and pool.pinned == 1
+    pool.release(pinned, pinned=True)
+    assert pool.pinned == 0
+
+
+def test_broken_connection_is_discarded(database):
+    pool = sql_core.ConnectionPool(database, sqlite3)
+    conn = pool.acquire()
+    conn.close()
+    pool.release(conn, check=True)
+    assert pool.size == 0 and not pool.idle
+    assert pool.isAlive(pool.acquire())
+
+
+def test_idle_connections_are_closed(database):
+    pool = sql_core.ConnectionPool(database, sqlite3, min_size=0, idle_timeout=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    time.sleep(0.01)
+    assert pool.acquire() is not conn
+    assert pool.size == 1
+
+
+def test_use_database_reuses_pooled_connection(database):
+    with sql_core.UseDatabase(database, "sqlite3") as cursor:
+        cursor[0].execute("SELECT COUNT(*) FROM t")
+        assert cursor[0].fetchone()[0] == 2000
+        first = cursor[0].connection
+    with sql_core.UseDatabase(database, "sqlite3") as cursor:
+        assert cursor[0].connection is first
+    assert sql_core.getPool(database, sqlite3).size == 1
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты результата: типы столбцов, числа разных типов, Decimal, сортировка и фильтр, файл подкачки"""
+
+from decimal import Decimal
+
+import sql_core
+
+
+def column(*batches):
+    result = sql_core.ResultColumn()
+    for values in batches:
+        result.extend(list(values))
+    return result
+
+
+def test_int_float_str_columns():
+    assert column([1, None, 3]).kind == "int"
+    assert column([0.5, 1.5]).kind == "float"
+    strings = column(["a", None, "b", "a"])
+    assert strings.kind == "str" and strings.strings == ["a", "b"]
+    assert list(strings.values()) == ["a", None, "b", "a"]
+    assert strings.nullRows() == [1]
+
+
+def test_int_column_receives_float():
+    # NUMBER без масштаба: целые и дробные числа вперемешку
+    numbers = column([1, None, 3], [2.5, 4])
+    assert numbers.kind == "float"
+    assert list(numbers.values()) == [1, None, 3, 2.5, 4]
+
+
+def test_float_column_receives_int():
+    numbers = column([1.5], [2, None])
+    assert numbers.kind == "float"
+    assert list(numbers.values()) == [1.5, 2, None]
+
+
+def test_inexact_int_is_not_converted_to_float():
+    numbers = column([2 ** 60], [0.5])
+    assert numbers.kind == "object"
+    assert list(numbers.values()) == [2 ** 60, 0.5]
+
+
+def test_decimal_column():
+    values = [Decimal("1.25"), None, Decimal("-3.00"), Decimal("0.00")]
+    numbers = column(values[:2], values[2:])
+    assert numbers.kind == "decimal" and numbers.exponent == -2
+    assert list(numbers.values()) == values
+    assert [str(v) for v in numbers.values() if v is not None] == ["1.25", "-3.00", "0.00"]
+    assert numbers.value(2) == Decimal("-3.00") and numbers.value(1) is None
+
+
+def test_decimal_mixed_scale_and_overflow():
+    mixed = column([Decimal("1.25")], [Decimal("1.5")])
+    assert mixed.kind == "object"
+    assert list(mixed.values()) == [Decimal("1.25"), Decimal("1.5")]
+    huge = column([Decimal("1"), Decimal("9" * 25)])
+    assert huge.kind == "object" and huge.value(1) == Decimal("9" * 25)
+    assert column([Decimal("NaN")]).kind == "object"
+
+
+def test_mixed_types_fall_back_to_object():
+    values = column([1, 2], ["a", None])
+    assert values.kind == "object"
+    assert list(values.values()) == [1, 2, "a", None]
+
+
+def test_result_view_sort_and_filter():
+    result = sql_core.ResultSet(["ID", "S", "V"])
+    result.extend([(i, "s" + str(i), None if i % 10 == 0 else i / 2) for i in range(100)])
+    view = sql_core.ResultView(result)
+
+    view.sort(0, descending=True)
+    assert [view.value(i, 0) for i in range(3)] == [99, 98, 97]
+
+    view.filter(0, "10..19")
+    assert [row[0] for row in view] == list(range(19, 9, -1))
+
+    view.filter(1, "s1")  # поиск подстроки
+    view.sort(0)
+    assert [row[0] for row in view] == list(range(10, 20))
+
+    view.reset()
+    assert not view.active() and len(view) == 100
+
+
+def test_decimal_filter():
+    result = sql_core.ResultSet(["N"])
+    result.extend([(Decimal(i).scaleb(-1),) for i in range(100)])
+    view = sql_core.ResultView(result)
+    view.filter(0, ">= 9.5")
+    assert [row[0] for row in view] == [Decimal(i).scaleb(-1) for i in range(95, 100)]
+
+
+def test_spill_file_pages():
+    spill = sql_core.SpillFile(cache_pages=2)
+    pages = [[(i, "s" + str(i)) for i in range(start, start + 100)] for start in range(0, 500, 100)]
+    for rows in pages:
+        spill.append(rows)
+    try:
+        assert spill.count == 500 and len(spill.pages) == 5
+        assert spill.row(0) == (0, "s0") and spill.row(499) == (499, "s499")
+        assert list(spill.rows(150, 260)) == [(i, "s" + str(i)) for i in range(150, 260)]
+        assert len(spill.cache) <= 2
+        spill.append([(500, "s500")])  # файл вырос после создания отображения
+        assert spill.row(500) == (500, "s500")
+    finally:
+        spill.close()
+
+
+def test_result_set_spills_over_budget():
+    rows = [(i, "s" + str(i % 7), None if i % 10 == 0 else i / 2) for i in range(3000)]
+    result = sql_core.ResultSet(["ID", "S", "V"], budget=1024)
+    for start in range(0, len(rows), 500):
+        result.extend(rows[start:start + 500])
+    try:
+        assert result.spilled() == 2500 and result.memory_count == 500
+        assert len(result) == 3000 and list(result) == rows
+        assert result[499] == rows[499] and result[2999] == rows[2999] and result[-1] == rows[-1]
+        assert result[490:510] == rows[490:510]
+        assert result.value(1234, 1) == rows[1234][1]
+        assert list(result.column(2, 495, 505)) == [row[2] for row in rows[495:505]]
+        view = sql_core.ResultView(result)
+        view.sort(0, descending=True)
+        assert view.value(0, 0) == 2999
+    finally:
+        result.close()
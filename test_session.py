@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Тесты сеанса вкладки: закрепленное соединение, состояние между запросами, закрытие во время запроса"""
+
+import sqlite3, threading
+
+import sql_core
+
+
+def test_session_keeps_connection_state(database, run_job):
+    session = sql_core.Session()
+    with sql_core.UseDatabase(database, "sqlite3", session) as cursor:
+        cursor[0].execute("CREATE TEMP TABLE tmp AS SELECT id FROM t WHERE id < 5")
+        first = cursor[0].connection
+    pool = sql_core.getPool(database, sqlite3)
+    assert session.conn is first and pool.pinned == 1
+    kind, payload = run_job(sql_core.QueryJob("select count(*) from tmp", database, "sqlite3", session=session))[-1]
+    assert kind == "finished", payload
+    assert session.conn is first
+    session.close()
+    assert session.conn is None and pool.pinned == 0 and pool.idle[-1][0] is first
+
+
+def test_session_switches_pool(database, tmp_path):
+    other = str(tmp_path / "other.db")
+    session = sql_core.Session()
+    with sql_core.UseDatabase(database, "sqlite3", session):
+        pass
+    with sql_core.UseDatabase(other, "sqlite3", session):
+        pass
+    assert session.pool is sql_core.getPool(other, sqlite3)
+    assert sql_core.getPool(database, sqlite3).pinned == 0
+    session.close()
+
+
+def test_close_during_query_releases_connection_after_it(database):
+    session = sql_core.Session()
+    entered, finish = threading.Event(), threading.Event()
+
+    def query():
+        with sql_core.UseDatabase(database, "sqlite3", session):
+            entered.set()
+            finish.wait(5)
+
+    thread = threading.Thread(target=query, daemon=True)
+    thread.start()
+    assert entered.wait(5)
+    session.close()  # GUI не ждет окончания запроса
+    pool = sql_core.getPool(database, sqlite3)
+    assert session.conn is not None and pool.pinned == 1
+    finish.set()
+    thread.join(5)
+    assert session.conn is None and pool.pinned == 0 and len(pool.idle) == 1